@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks
+~~~~~~~~~~
+
+    Performance benchmarks for circleci.py. These run against a local stand-in
+    for the CircleCI API and never touch circleci.com.
+"""
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_models
+~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the memory used to keep many build summaries as plain dicts
+    against :class:`circleci.models.BuildSummary`.
+
+    Run with ``python -m benchmarks.bench_models``.
+"""
+import argparse
+import json
+import tracemalloc
+
+from circleci.models import BuildSummary
+
+
+def _load_template():
+    with open('tests/mocks/mock_project_build_summary_response', 'r') as f:
+        return json.loads(f.read())[0]
+
+
+def _builds(template, count):
+    text = json.dumps(template)
+    for build_num in range(count):
+        # decode every build separately, as if each came off the wire
+        build = json.loads(text)
+        build['build_num'] = build_num
+        yield build
+
+
+def _measure(name, count, make):
+    tracemalloc.start()
+    kept = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+
+    print('{0:<28} {1:10.1f} MiB {2:8d} bytes/build'.format(
+        name,
+        size / 1024 / 1024,
+        size // count
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    template = _load_template()
+
+    _measure('dict', args.count, lambda: list(_builds(template, args.count)))
+    _measure('BuildSummary', args.count, lambda: [
+        BuildSummary.from_dict(b) for b in _builds(template, args.count)
+    ])
+    _measure('BuildSummary(no extra)', args.count, lambda: [
+        BuildSummary.from_dict(b, keep_extra=False) for b in _builds(template, args.count)
+    ])
+
+
+if __name__ == '__main__':
+    main()
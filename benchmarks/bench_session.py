@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_session
+~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare per-call latency of one-off ``requests.get`` calls (a new
+    connection for every request) against the pooled session used by
+    :class:`circleci.api.Api`.
+
+    Run with ``python -m benchmarks.bench_session``.
+"""
+import argparse
+import statistics
+import time
+
+import requests
+from requests.auth import HTTPBasicAuth
+
+from benchmarks.server import StubServer
+from circleci.api import Api
+
+
+def _timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name, samples):
+    print('{0:<12} mean {1:8.3f} ms   p50 {2:8.3f} ms   max {3:8.3f} ms'.format(
+        name,
+        statistics.mean(samples) * 1000,
+        statistics.median(samples) * 1000,
+        max(samples) * 1000
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        url = '{0}/me'.format(server.url)
+        auth = HTTPBasicAuth('token', '')
+        headers = {'Accept': 'application/json'}
+
+        def unpooled():
+            # module level requests.get builds a throwaway session, and with
+            # it a new connection, for every call
+            resp = requests.get(url, auth=auth, headers=headers)
+            resp.json()
+
+        with Api('token', url=server.url) as api:
+            # warm up both paths before measuring
+            unpooled()
+            api.get_user_info()
+
+            _report('before', _timed(unpooled, args.iterations))
+            _report('after', _timed(api.get_user_info, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_transport
+~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the transports of :mod:`circleci.transport`: the time it takes a
+    fresh interpreter to import the client and make its first request, and
+    the per-call latency of requests over a warm connection pool.
+
+    Run with ``python -m benchmarks.bench_transport``.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.server import StubServer
+from circleci.api import Api
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+TRANSPORTS = ['requests', 'urllib3']
+
+if httpx is not None:
+    # the emulator speaks HTTP/1.1, so this measures the fallback
+    TRANSPORTS.append('http2')
+
+_COLD_START = """
+import time
+started = time.perf_counter()
+from circleci.api import Api
+api = Api('token', url={1!r}, transport={0!r})
+imported = time.perf_counter()
+api.get_user_info()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def _timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name, samples):
+    print('{0:<20} mean {1:8.3f} ms   p50 {2:8.3f} ms   max {3:8.3f} ms'.format(
+        name,
+        statistics.mean(samples) * 1000,
+        statistics.median(samples) * 1000,
+        max(samples) * 1000
+    ))
+
+
+def cold_start(url, transport):
+    """Import the client and make one request in a new interpreter.
+
+    :returns: Seconds spent importing and seconds spent on the first request.
+    """
+    output = subprocess.check_output([
+        sys.executable,
+        '-c',
+        _COLD_START.format(transport, url)
+    ])
+    imported, first = output.split()
+    return float(imported), float(first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--iterations', type=int, default=1000)
+    parser.add_argument('--starts', type=int, default=10,
+                        help='number of fresh interpreters to start per transport')
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        for name in TRANSPORTS:
+            starts = [cold_start(server.url, name) for _ in range(args.starts)]
+            _report('{0} import'.format(name), [s[0] for s in starts])
+            _report('{0} first call'.format(name), [s[1] for s in starts])
+
+        for name in TRANSPORTS:
+            with Api('token', url=server.url, transport=name) as api:
+                api.get_user_info()
+                _report('{0} call'.format(name), _timed(api.get_user_info, args.iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.run
+~~~~~~~~~~~~~~
+
+    Run the benchmark suite against the local API emulator in
+    :mod:`benchmarks.server` and record the results as JSON, so that runs
+    from different releases can be compared.
+
+    ::
+
+        python -m benchmarks.run --output bench.json
+        python -m benchmarks.run --compare bench.json
+
+    Each benchmark reports the number of operations, wall clock seconds,
+    operations per second and, where it makes sense, bytes per second.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.server import StubServer
+from circleci.api import Api
+from circleci.version import VERSION
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """Register a benchmark function.
+
+    A benchmark takes ``(server, args)`` and returns a tuple of
+    ``(operations, bytes)``. It is timed as a whole.
+    """
+    BENCHMARKS.append(func)
+    return func
+
+
+@benchmark
+def request_throughput(server, args):
+    """Sequential get_build_info calls over one pooled session."""
+    with Api('token', url=server.url) as api:
+        for n in range(args.requests):
+            api.get_build_info('bench', 'bench', n + 1)
+    return args.requests, 0
+
+
+@benchmark
+def pagination_walk(server, args):
+    """Walk the whole build history with iter_project_builds."""
+    with Api('token', url=server.url) as api:
+        count = sum(1 for _ in api.iter_project_builds('bench', 'bench'))
+    return count, 0
+
+
+@benchmark
+def bulk_fetch(server, args):
+    """Fetch many builds concurrently with get_build_infos."""
+    with Api('token', url=server.url, pool_maxsize=args.workers) as api:
+        results = api.get_build_infos(
+            'bench',
+            'bench',
+            range(1, args.requests + 1),
+            max_workers=args.workers
+        )
+    return len(results), 0
+
+
+@benchmark
+def artifact_download(server, args):
+    """Download every artifact of a build with download_artifacts."""
+    destdir = tempfile.mkdtemp()
+
+    try:
+        with Api('token', url=server.url, pool_maxsize=args.workers) as api:
+            manifest = api.download_artifacts(
+                'bench',
+                'bench',
+                1,
+                destdir,
+                max_workers=args.workers
+            )
+    finally:
+        shutil.rmtree(destdir)
+
+    return len(manifest), sum(item['size'] or 0 for item in manifest)
+
+
+def run(args):
+    """Run the selected benchmarks and return the results document."""
+    results = []
+
+    with StubServer(
+            latency=args.latency,
+            history=args.history,
+            steps=args.steps,
+            artifacts=args.artifacts,
+            artifact_size=args.artifact_size) as server:
+        for func in BENCHMARKS:
+            if args.only and func.__name__ not in args.only:
+                continue
+
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                ops, nbytes = func(server, args)
+                seconds = time.perf_counter() - start
+                if best is None or seconds < best[2]:
+                    best = (ops, nbytes, seconds)
+
+            ops, nbytes, seconds = best
+            results.append({
+                'name': func.__name__,
+                'operations': ops,
+                'seconds': seconds,
+                'ops_per_sec': ops / seconds,
+                'bytes_per_sec': nbytes / seconds if nbytes else None,
+            })
+
+    return {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': {
+            'latency': args.latency,
+            'history': args.history,
+            'steps': args.steps,
+            'artifacts': args.artifacts,
+            'artifact_size': args.artifact_size,
+            'requests': args.requests,
+            'workers': args.workers,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+
+def report(document, baseline=None):
+    """Print a results document, with changes against a baseline."""
+    previous = {}
+    if baseline:
+        previous = {r['name']: r for r in baseline['results']}
+
+    for result in document['results']:
+        line = '{0:<20} {1:10.1f} ops/s {2:9.3f} s'.format(
+            result['name'],
+            result['ops_per_sec'],
+            result['seconds']
+        )
+        if result['bytes_per_sec']:
+            line += ' {0:9.1f} MiB/s'.format(result['bytes_per_sec'] / 1024 / 1024)
+
+        old = previous.get(result['name'])
+        if old:
+            change = (result['ops_per_sec'] - old['ops_per_sec']) / old['ops_per_sec']
+            line += ' {0:+7.1%} vs {1}'.format(change, baseline['version'])
+
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the circleci.py benchmarks.')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds of emulated server latency per request')
+    parser.add_argument('--history', type=int, default=2000,
+                        help='number of builds in the emulated history')
+    parser.add_argument('--steps', type=int, default=10,
+                        help='number of steps in each emulated build')
+    parser.add_argument('--artifacts', type=int, default=20,
+                        help='number of artifacts in each emulated build')
+    parser.add_argument('--artifact-size', type=int, default=1024 * 1024,
+                        help='size of each emulated artifact in bytes')
+    parser.add_argument('--requests', type=int, default=500,
+                        help='number of requests for request based benchmarks')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='number of workers for concurrent benchmarks')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark, the fastest is kept')
+    parser.add_argument('--only', nargs='*', help='names of benchmarks to run')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results file to compare against')
+    args = parser.parse_args(argv)
+
+    document = run(args)
+
+    baseline = None
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+
+    report(document, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.server
+~~~~~~~~~~~~~~~~~
+
+    A local HTTP server that stands in for the CircleCI v1.1 API while
+    benchmarking. It speaks HTTP/1.1 with keep-alive so that connection reuse
+    can be measured, and serves generated data whose size can be tuned:
+
+    * ``GET /me``, ``/projects``
+    * ``GET /recent-builds`` and ``/project/:vcs/:user/:project`` (optionally
+      ``/tree/:branch``), paginated with ``limit`` and ``offset`` over a
+      history of ``history`` builds
+    * ``GET /project/:vcs/:user/:project/:build_num`` with ``steps`` steps of
+      ``actions`` actions each
+    * ``GET /project/:vcs/:user/:project/:build_num/artifacts`` listing
+      ``artifacts`` artifacts of ``artifact_size`` bytes, served from
+      ``/artifacts/...``
+    * ``GET /project/:vcs/:user/:project/:build_num/tests``
+    * envvar and checkout key endpoints
+
+    Anything else gets ``{"message": "ok"}``.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = '/api/v1.1/'
+
+
+def build_summary(build_num, username='bench', reponame='bench', branch='master'):
+    """A generated build summary."""
+    return {
+        'build_num': build_num,
+        'username': username,
+        'reponame': reponame,
+        'branch': branch,
+        'status': 'success' if build_num % 7 else 'failed',
+        'outcome': 'success' if build_num % 7 else 'failed',
+        'lifecycle': 'finished',
+        'vcs_revision': '{0:040x}'.format(build_num),
+        'vcs_url': 'https://github.com/{0}/{1}'.format(username, reponame),
+        'build_url': 'https://circleci.com/gh/{0}/{1}/{2}'.format(username, reponame, build_num),
+        'queued_at': '2019-03-10T00:00:00.000Z',
+        'start_time': '2019-03-10T00:00:05.000Z',
+        'stop_time': '2019-03-10T00:05:05.000Z',
+        'build_time_millis': 300000 + build_num,
+        'why': 'github',
+        'subject': 'Commit message for build {0}'.format(build_num),
+        'committer_name': 'Bench Mark',
+        'committer_email': 'bench@example.com',
+        'workflows': {
+            'job_name': 'build',
+            'workflow_name': 'main',
+            'workflow_id': '{0:032x}'.format(build_num),
+        },
+    }
+
+
+class EmulatorHandler(BaseHTTPRequestHandler):
+    """Route requests to generated CircleCI responses."""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _send(self, body, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path.startswith('/artifacts/'):
+            return self._send(self.server.artifact_body, 'application/octet-stream')
+
+        if not url.path.startswith(API_PREFIX):
+            self.send_error(404)
+            return None
+
+        body = self.server.route(self.command, url.path[len(API_PREFIX):], query)
+        return self._send(body)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_DELETE = _reply
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Threaded CircleCI API emulator bound to an ephemeral localhost port.
+
+    :param latency: Seconds to sleep before answering each request.
+    :param payload: Optional object returned for every API request, \
+        instead of emulating the API.
+    :param history: Number of builds in each project's history.
+    :param steps: Number of steps in a build.
+    :param actions: Number of actions in each step.
+    :param artifacts: Number of artifacts in a build.
+    :param artifact_size: Size of each artifact in bytes.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+            self,
+            latency=0.0,
+            payload=None,
+            history=1000,
+            steps=10,
+            actions=4,
+            artifacts=10,
+            artifact_size=1024 * 1024):
+        super().__init__(('127.0.0.1', 0), EmulatorHandler)
+        self.latency = latency
+        self.payload = None if payload is None else json.dumps(payload).encode('utf-8')
+        self.history = history
+        self.steps = steps
+        self.actions = actions
+        self.artifacts = artifacts
+        self.artifact_body = b'x' * artifact_size
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to pass to :class:`circleci.api.Api`."""
+        return 'http://{0}:{1}/api/v1.1'.format(*self.server_address)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def route(self, verb, path, query):
+        """Return the encoded response body for an API request."""
+        if self.payload is not None:
+            return self.payload
+
+        segments = path.split('/')
+        result = {'message': 'ok'}
+
+        if verb == 'GET':
+            if path == 'me':
+                result = {'login': 'bench', 'name': 'Bench Mark'}
+            elif path == 'projects':
+                result = [{'username': 'bench', 'reponame': 'bench-{0}'.format(n)} for n in range(10)]
+            elif path == 'recent-builds':
+                result = self._page(query)
+            elif segments[0] == 'project' and len(segments) >= 4:
+                result = self._project(segments[1:4], segments[4:], query)
+
+        return json.dumps(result).encode('utf-8')
+
+    def _page(self, query, username='bench', reponame='bench', branch='master'):
+        limit = int(query.get('limit', 30))
+        offset = int(query.get('offset', 0))
+        newest = self.history - offset
+
+        return [
+            build_summary(n, username, reponame, branch)
+            for n in range(newest, max(0, newest - limit), -1)
+        ]
+
+    def _project(self, coords, rest, query):
+        _, username, reponame = coords
+
+        if not rest:
+            return self._page(query, username, reponame)
+        if rest[0] == 'tree':
+            return self._page(query, username, reponame, '/'.join(rest[1:]))
+        if rest[0] == 'envvar':
+            return [{'name': 'VAR_{0}'.format(n), 'value': 'xxxx{0:04d}'.format(n)} for n in range(20)]
+        if rest[0] == 'checkout-key':
+            return [{'type': 'deploy-key', 'fingerprint': 'aa:bb', 'public_key': 'ssh-rsa AAAA'}]
+        if not rest[0].isdigit():
+            return {'message': 'ok'}
+
+        build_num = int(rest[0])
+
+        if len(rest) == 1:
+            return self._build(build_num, username, reponame)
+        if rest[1] == 'artifacts':
+            return [
+                {
+                    'path': 'reports/{0}/artifact-{1}.bin'.format(n % 3, n),
+                    'url': 'http://{0}:{1}/artifacts/{2}/{3}'.format(
+                        self.server_address[0],
+                        self.server_address[1],
+                        build_num,
+                        n
+                    ),
+                }
+                for n in range(self.artifacts)
+            ]
+        if rest[1] == 'tests':
+            return {
+                'exception': None,
+                'tests': [
+                    {
+                        'classname': 'tests.test_{0}'.format(n % 10),
+                        'name': 'test_case_{0}'.format(n),
+                        'result': 'failure' if (build_num + n) % 13 == 0 else 'success',
+                        'run_time': 0.01 * (n % 50),
+                        'file': 'tests/test_{0}.py'.format(n % 10),
+                    }
+                    for n in range(100)
+                ],
+            }
+
+        return {'message': 'ok'}
+
+    def _build(self, build_num, username, reponame):
+        build = build_summary(build_num, username, reponame)
+        build['steps'] = [
+            {
+                'name': 'step {0}'.format(s),
+                'actions': [
+                    {
+                        'step': s,
+                        'index': a,
+                        'name': 'step {0}'.format(s),
+                        'status': 'success',
+                        'bash_command': 'make step-{0}'.format(s),
+                        'run_time_millis': 1000 * s + a,
+                        'output_url': 'http://{0}:{1}/artifacts/output/{2}/{3}'.format(
+                            self.server_address[0],
+                            self.server_address[1],
+                            s,
+                            a
+                        ),
+                    }
+                    for a in range(self.actions)
+                ],
+            }
+            for s in range(self.steps)
+        ]
+        return build
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.analytics
+~~~~~~~~~~~~~~~~~~
+
+    This module provides flakiness and slowness analytics over the test
+    metadata of many builds.
+
+    Test results are kept in compact columns (one :class:`array.array` per
+    field, with test names interned and stored once), rather than as a dict
+    per result, so hundreds of thousands of results fit in a few megabytes.
+    When `NumPy <https://numpy.org>`_ is installed the statistics are
+    computed with vectorized operations over those columns, otherwise the
+    same statistics are computed in plain Python. Install NumPy with
+    ``pip install circleci[analytics]``.
+
+    ::
+
+        from circleci.analytics import TestHistory
+
+        history = TestHistory.collect(circleci, 'levlaz', 'circleci.py', range(1000, 2000))
+
+        for test in history.flaky(limit=10):
+            print(test.name, test.flips, test.failure_rate)
+
+    .. versionadded:: 2.0.0
+"""
+import math
+import sys
+from array import array
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+PASSED = 0
+FAILED = 1
+SKIPPED = 2
+
+_RESULTS = {
+    'success': PASSED,
+    'failure': FAILED,
+    'error': FAILED,
+    'skipped': SKIPPED,
+}
+
+
+class TestStats(namedtuple('TestStats', [
+        'name',
+        'runs',
+        'failures',
+        'failure_rate',
+        'flips',
+        'p50',
+        'p90',
+        'p99'])):
+    """Statistics of one test.
+
+    :param name: ``classname.name`` of the test.
+    :param runs: Number of times it ran, not counting skips.
+    :param failures: Number of runs which failed or errored.
+    :param failure_rate: ``failures / runs``.
+    :param flips: Number of times its result changed from passing to \
+        failing or back, between consecutive builds.
+    :param p50: Median run time in seconds.
+    :param p90: 90th percentile run time in seconds.
+    :param p99: 99th percentile run time in seconds.
+    """
+    __slots__ = ()
+
+
+class SymbolTable():
+    """Interned strings numbered in the order they are first seen.
+
+    Columns store the small integer of a string instead of the string, and
+    each string is kept once, here.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, symbol):
+        return self.names[symbol]
+
+    def get(self, name):
+        """Return the number of a string, or None if it was never seen."""
+        return self._ids.get(name)
+
+    def symbol(self, name):
+        """Return the number of a string, adding it if it is new."""
+        symbol = self._ids.get(name)
+        if symbol is None:
+            symbol = self._ids[name] = len(self.names)
+            self.names.append(sys.intern(name))
+        return symbol
+
+
+class TestHistory():
+    """Test results of many builds, stored as columns.
+
+    Each row is one result of one test in one build. Results are added with
+    :meth:`add` or collected from the API with :meth:`collect`.
+    """
+
+    def __init__(self):
+        self.names = SymbolTable()
+        self.errors = {}
+
+        self.build_nums = array('l')
+        self.test_ids = array('l')
+        self.results = array('b')
+        self.run_times = array('d')
+
+    @classmethod
+    def collect(cls, api, username, project, build_nums, max_workers=8, vcs_type='github'):
+        """Fetch the test metadata of many builds, concurrently.
+
+        :param api: The :class:`circleci.api.Api` object to use.
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_nums: Iterable of build numbers.
+        :param max_workers: Maximum number of concurrent requests. \
+            Defaults to 8.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :returns: A :class:`TestHistory`. Builds whose metadata could not \
+            be fetched are left out, with their exception in ``errors`` \
+            by build number.
+        """
+        history = cls()
+
+        for item in api.get_test_metadatas(
+                username,
+                project,
+                build_nums,
+                max_workers=max_workers,
+                as_completed=True,
+                vcs_type=vcs_type):
+            if item.ok:
+                history.add(item.item, item.result)
+            else:
+                history.errors[item.item] = item.error
+
+        return history
+
+    def __len__(self):
+        return len(self.results)
+
+    def _test_id(self, test):
+        classname = test.get('classname')
+        name = test.get('name') or ''
+        if classname:
+            name = '{0}.{1}'.format(classname, name)
+        return self.names.symbol(name)
+
+    def add(self, build_num, metadata):
+        """Add the results of one build.
+
+        :param build_num: Build number.
+        :param metadata: Test metadata as returned by \
+            :meth:`circleci.api.Api.get_test_metadata`.
+        """
+        for test in metadata.get('tests') or []:
+            self.build_nums.append(int(build_num))
+            self.test_ids.append(self._test_id(test))
+            self.results.append(_RESULTS.get(test.get('result'), SKIPPED))
+            self.run_times.append(test.get('run_time') or 0.0)
+
+    def stats(self):
+        """Compute the statistics of every test which ran at least once.
+
+        :returns: A list of :class:`TestStats`, in the order tests were \
+            first seen.
+        """
+        if not len(self):
+            return []
+        if numpy is not None:
+            return self._stats_numpy()
+        return self._stats_python()
+
+    def flaky(self, min_runs=2, limit=None):
+        """Rank tests which both passed and failed, most flips first.
+
+        :param min_runs: Ignore tests which ran fewer times. Defaults to 2.
+        :param limit: Optional number of tests to return.
+
+        :returns: A list of :class:`TestStats`.
+        """
+        tests = [
+            t for t in self.stats()
+            if t.runs >= min_runs and 0 < t.failures < t.runs
+        ]
+        tests.sort(key=lambda t: (-t.flips, -t.failure_rate, t.name))
+        return tests[:limit]
+
+    def slowest(self, percentile='p90', limit=None):
+        """Rank tests by run time, slowest first.
+
+        :param percentile: The statistic to rank by, ``p50``, ``p90`` or \
+            ``p99``. Defaults to ``p90``.
+        :param limit: Optional number of tests to return.
+
+        :returns: A list of :class:`TestStats`.
+        """
+        tests = self.stats()
+        tests.sort(key=lambda t: (-getattr(t, percentile), t.name))
+        return tests[:limit]
+
+    def _columns(self):
+        return [
+            numpy.frombuffer(column, dtype=column.typecode)
+            for column in (self.build_nums, self.test_ids, self.results, self.run_times)
+        ]
+
+    def _stats_numpy(self):
+        build_nums, test_ids, results, run_times = self._columns()
+
+        ran = results != SKIPPED
+        build_nums = build_nums[ran]
+        test_ids = test_ids[ran]
+        failed = (results[ran] == FAILED).astype(numpy.int64)
+        run_times = run_times[ran]
+
+        count = len(self.names)
+        runs = numpy.bincount(test_ids, minlength=count)
+        failures = numpy.bincount(test_ids, weights=failed, minlength=count).astype(numpy.int64)
+
+        # results of each test in build order
+        order = numpy.lexsort((build_nums, test_ids))
+        ids = test_ids[order]
+        outcome = failed[order]
+        flipped = (ids[1:] == ids[:-1]) & (outcome[1:] != outcome[:-1])
+        flips = numpy.bincount(ids[1:][flipped], minlength=count)
+
+        # run times of each test in ascending order
+        times = run_times[numpy.lexsort((run_times, test_ids))]
+        starts = numpy.concatenate(([0], numpy.cumsum(runs)[:-1]))
+        present = runs > 0
+
+        percentiles = []
+        for q in (0.5, 0.9, 0.99):
+            position = q * (runs[present] - 1)
+            low = numpy.floor(position).astype(numpy.int64)
+            high = numpy.ceil(position).astype(numpy.int64)
+            base = starts[present]
+            percentiles.append(
+                times[base + low] + (times[base + high] - times[base + low]) * (position - low)
+            )
+
+        tests = numpy.nonzero(present)[0]
+        return [
+            TestStats(
+                self.names[test_id],
+                int(runs[test_id]),
+                int(failures[test_id]),
+                float(failures[test_id]) / runs[test_id],
+                int(flips[test_id]),
+                float(percentiles[0][i]),
+                float(percentiles[1][i]),
+                float(percentiles[2][i])
+            )
+            for i, test_id in enumerate(tests)
+        ]
+
+    def _stats_python(self):
+        rows = {}
+
+        for build_num, test_id, result, run_time in zip(
+                self.build_nums,
+                self.test_ids,
+                self.results,
+                self.run_times):
+            if result != SKIPPED:
+                rows.setdefault(test_id, []).append((build_num, result == FAILED, run_time))
+
+        tests = []
+        for test_id in sorted(rows):
+            results = sorted(rows[test_id], key=lambda row: row[0])
+            outcomes = [row[1] for row in results]
+            times = sorted(row[2] for row in results)
+            failures = sum(outcomes)
+
+            tests.append(TestStats(
+                self.names[test_id],
+                len(results),
+                failures,
+                float(failures) / len(results),
+                sum(1 for a, b in zip(outcomes, outcomes[1:]) if a != b),
+                percentile(times, 0.5),
+                percentile(times, 0.9),
+                percentile(times, 0.99)
+            ))
+
+        return tests
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile of sorted values.
+
+    :param values: Sorted, non-empty sequence of numbers.
+    :param q: The percentile, between 0 and 1.
+
+    :type q: float
+    """
+    position = q * (len(values) - 1)
+    low = int(math.floor(position))
+    high = int(math.ceil(position))
+    return values[low] + (values[high] - values[low]) * (position - low)
@@ -8,28 +8,155 @@ circleci.api
     .. versionchanged:: 2.0.0
        Removed legacy 1.0 endpoints. See CHANGELOG for more details.
 """
+import functools
+import hashlib
+import io
+import json
 import os
+import sys
+import time
 
-import requests
-from requests.auth import HTTPBasicAuth
-
-from circleci.error import BadKeyError, BadVerbError, InvalidFilterError
+from circleci.bulk import run_bulk, stream_bulk
+from circleci.coalesce import canonical_url
+from circleci.envvars import plan as plan_envvars
+from circleci.error import BadKeyError, BadVerbError, BuildTimeoutError, InvalidFilterError
+from circleci.logs import LogLine, iter_log_lines
+from circleci.routes import ROUTES
+from circleci.status import is_terminal
+from circleci.stream import extract, iter_path
+from circleci.transport import RequestsTransport, Urllib3Transport
+from circleci.watcher import poll_interval
 
 
 class Api():
     """A python interface into the CircleCI API"""
 
-    def __init__(self, token, url='https://circleci.com/api/v1.1'):
+    def __init__(
+            self,
+            token,
+            url='https://circleci.com/api/v1.1',
+            pool_connections=10,
+            pool_maxsize=10,
+            keep_alive=True,
+            cache=None,
+            store=None,
+            retry=None,
+            rate_limiter=None,
+            metrics=None,
+            timeout=None,
+            coalescer=None,
+            artifact_cache=None,
+            transport=None):
         """Instantiate a new circleci.Api object.
 
+        All requests made by this object share a single pooled HTTP session,
+        so connections to the API are reused between calls. Call
+        :meth:`close` (or use the object as a context manager) to release
+        them when you are done.
+
         :param url: The URL to the CircleCI instance. Defaults to \
             https://circleci.com/api/v1.1. If you are running CircleCI server, \
             the API is available at the same endpoint of your own \
             installation url. i.e (https://circleci.yourcompany.com/api/v1.1).
         :param token: Your CircleCI API token.
+        :param pool_connections: Number of distinct hosts to keep connection \
+            pools for. Defaults to 10.
+        :param pool_maxsize: Maximum number of connections kept open per \
+            host. Defaults to 10.
+        :param keep_alive: Keep connections open between requests. \
+            Defaults to True.
+        :param cache: Optional cache for ``GET`` responses. Defaults to \
+            None (no caching).
+        :param store: Optional persistent store which finished builds are \
+            served from by :meth:`get_build_info` and \
+            :meth:`get_test_metadata`. Defaults to None.
+        :param retry: Optional policy for retrying failed requests. \
+            Defaults to None (no retries).
+        :param rate_limiter: Optional limiter which every request, including \
+            retries, must pass. Defaults to None.
+        :param metrics: Optional instrumentation which records every \
+            request. Defaults to None.
+        :param timeout: Optional number of seconds to wait for the server \
+            to accept a connection or send data, as used by \
+            :mod:`requests`. Defaults to None (wait forever).
+        :param coalescer: Optional single-flight table which lets identical \
+            ``GET`` requests made concurrently share one request. Defaults \
+            to None.
+        :param artifact_cache: Optional local cache which downloaded \
+            artifacts are kept in and served from. Defaults to None.
+        :param transport: Optional HTTP transport to send requests through, \
+            or the name of one: ``'requests'``, ``'urllib3'`` or ``'http2'``, \
+            which is created with ``pool_connections``, ``pool_maxsize`` \
+            and ``keep_alive``. Defaults to a \
+            :class:`circleci.transport.RequestsTransport`.
+
+        :type pool_connections: int
+        :type pool_maxsize: int
+        :type keep_alive: bool
+        :type cache: :class:`circleci.cache.ResponseCache`
+        :type store: :class:`circleci.store.BuildStore`
+        :type retry: :class:`circleci.retry.Retry`
+        :type rate_limiter: :class:`circleci.retry.RateLimiter`
+        :type metrics: :class:`circleci.metrics.Metrics`
+        :type timeout: float
+        :type coalescer: :class:`circleci.coalesce.RequestCoalescer`
+        :type artifact_cache: :class:`circleci.artifact_cache.ArtifactCache`
+        :type transport: :class:`circleci.transport.Transport` or str
+
+        :raises RuntimeError: when the ``'http2'`` transport is asked for \
+            before Python 3.8, which HTTPX needs.
+
+        .. versionchanged:: 2.0.0
+           Requests are made through a persistent, pooled session.
         """
         self.token = token
         self.url = url
+        self.cache = cache
+        self.store = store
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.timeout = timeout
+        self.coalescer = coalescer
+        self.artifact_cache = artifact_cache
+
+        if transport is None:
+            transport = 'requests'
+        if transport == 'requests':
+            transport = RequestsTransport(pool_connections, pool_maxsize, keep_alive)
+        elif transport == 'urllib3':
+            transport = Urllib3Transport(pool_connections, pool_maxsize, keep_alive)
+        elif transport == 'http2':
+            if sys.version_info < (3, 8):
+                raise RuntimeError("the 'http2' transport requires Python 3.8 or newer")
+            from circleci.http2 import HTTP2Transport
+            transport = HTTP2Transport(pool_maxsize, keep_alive)
+        elif isinstance(transport, str):
+            raise ValueError('unknown transport {0!r}'.format(transport))
+        self.transport = transport
+
+        self._auth = (self.token, '')
+        self._headers = {
+            'Accept': 'application/json',
+        }
+
+    @property
+    def _session(self):
+        """The session of the default transport."""
+        return self.transport.session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close all pooled connections held by this object.
+
+        .. versionadded:: 2.0.0
+        """
+        self.transport.close()
 
     def get_user_info(self):
         """Provides information about the signed in user.
@@ -37,7 +164,7 @@ class Api():
         Endpoint:
             GET: ``/me``
         """
-        resp = self._request('GET', 'me')
+        resp = self._call('get_user_info')
         return resp
 
     def get_projects(self):
@@ -46,7 +173,7 @@ class Api():
         Endpoint:
             GET: ``/projects``
         """
-        resp = self._request('GET', 'projects')
+        resp = self._call('get_projects')
         return resp
 
     def follow_project(self, username, project, vcs_type='github'):
@@ -60,12 +187,12 @@ class Api():
         Endpoint:
             POST: ``/project/:vcs-type/:username/:project/follow``
         """
-        endpoint = 'project/{0}/{1}/{2}/follow'.format(
-            vcs_type,
-            username,
-            project
+        resp = self._call(
+            'follow_project',
+            vcs_type=vcs_type,
+            username=username,
+            project=project
         )
-        resp = self._request('POST', endpoint)
         return resp
 
     def get_project_build_summary(
@@ -105,27 +232,16 @@ class Api():
         if status_filter not in valid_filters:
             raise InvalidFilterError(status_filter, 'status')
 
-        if branch:
-            endpoint = 'project/{0}/{1}/{2}/tree/{3}?limit={4}&offset={5}&filter={6}'.format(
-                vcs_type,
-                username,
-                project,
-                branch,
-                limit,
-                offset,
-                status_filter
-            )
-        else:
-            endpoint = 'project/{0}/{1}/{2}?limit={3}&offset={4}&filter={5}'.format(
-                vcs_type,
-                username,
-                project,
-                limit,
-                offset,
-                status_filter
-            )
-
-        resp = self._request('GET', endpoint)
+        resp = self._call(
+            'get_branch_build_summary' if branch else 'get_project_build_summary',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            branch=branch,
+            limit=limit,
+            offset=offset,
+            filter=status_filter
+        )
         return resp
 
     def get_recent_builds(self, limit=30, offset=0):
@@ -143,11 +259,210 @@ class Api():
         Endpoint:
             GET: ``/recent-builds``
         """
-        endpoint = 'recent-builds?limit={0}&offset={1}'.format(limit, offset)
-
-        resp = self._request('GET', endpoint)
+        resp = self._call('get_recent_builds', limit=limit, offset=offset)
         return resp
 
+    def iter_project_builds(
+            self,
+            username,
+            project,
+            page_size=100,
+            status_filter=None,
+            branch=None,
+            max_builds=None,
+            until=None,
+            vcs_type='github'):
+        """Iterate over the build history of a single git repo, newest first.
+
+        Pages are requested from
+        :meth:`get_project_build_summary` lazily, one at a time, so only a
+        single page is held in memory no matter how long the history is.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param page_size: The number of builds to request per page. \
+            Maximum 100, defaults to 100.
+        :param status_filter: Restricts which builds are returned. \
+            Set to "completed", "successful", "running" or "failed". \
+            Defaults to no filter.
+        :param branch: Narrow returned builds to a single branch.
+        :param max_builds: Stop after this many builds. Defaults to no limit.
+        :param until: Optional callable which is passed each build. \
+            Iteration stops, without yielding that build, as soon as it \
+            returns True.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :type page_size: int
+        :type max_builds: int
+
+        :raises InvalidFilterError: when filter is not a valid filter.
+
+        :returns: A generator of build summaries.
+
+        .. versionadded:: 2.0.0
+        """
+        def fetch(limit, offset):
+            return self.get_project_build_summary(
+                username,
+                project,
+                limit=limit,
+                offset=offset,
+                status_filter=status_filter,
+                branch=branch,
+                vcs_type=vcs_type
+            )
+
+        return self._paginate(fetch, page_size, max_builds, until, ordered=True)
+
+    def iter_recent_builds(self, page_size=100, max_builds=None, until=None):
+        """Iterate over recent builds across all of your projects.
+
+        Pages are requested from :meth:`get_recent_builds` lazily, one at a
+        time, so only a single page is held in memory.
+
+        :param page_size: The number of builds to request per page. \
+            Maximum 100, defaults to 100.
+        :param max_builds: Stop after this many builds. Defaults to no limit.
+        :param until: Optional callable which is passed each build. \
+            Iteration stops, without yielding that build, as soon as it \
+            returns True.
+
+        :type page_size: int
+        :type max_builds: int
+
+        :returns: A generator of build summaries.
+
+        .. versionadded:: 2.0.0
+        """
+        def fetch(limit, offset):
+            return self.get_recent_builds(limit=limit, offset=offset)
+
+        return self._paginate(fetch, page_size, max_builds, until)
+
+    def iter_org_snapshot(
+            self,
+            projects=None,
+            branches=None,
+            limit=30,
+            max_workers=16,
+            timeout=None,
+            vcs_type='github'):
+        """Fetch the latest build of every branch of many projects,
+        concurrently, yielding each project's result as soon as it arrives.
+
+        Without ``branches`` one build summary is requested per project and
+        the latest build of each branch among its last ``limit`` builds is
+        kept. With ``branches`` one request is made per project and branch.
+
+        :param projects: Optional iterable of ``(username, project)`` \
+            tuples. Defaults to every project you follow, as listed by \
+            :meth:`get_projects`.
+        :param branches: Optional list of branch names to look at.
+        :param limit: Number of recent builds to look through per project \
+            when no ``branches`` are given. Maximum 100, defaults to 30.
+        :param max_workers: Maximum number of requests in flight at once, \
+            across all projects. Defaults to 16.
+        :param timeout: Optional timeout in seconds for each request. \
+            Defaults to the ``timeout`` this object was created with.
+        :param vcs_type: VCS type of ``projects``. Defaults to github. \
+            The VCS type of followed projects is taken from their ``vcs_url``.
+
+        :type limit: int
+        :type max_workers: int
+        :type timeout: float
+
+        :returns: A generator of :class:`circleci.bulk.BulkResult`, in the \
+            order they complete. Each ``item`` is a tuple of \
+            ``(vcs_type, username, project, branch)``, with ``branch`` None \
+            without ``branches``, and each ``result`` is a dict of the \
+            latest build by branch name.
+
+        .. versionadded:: 2.0.0
+        """
+        if projects is None:
+            projects = [
+                (_vcs_type_of(project, vcs_type), project['username'], project['reponame'])
+                for project in self.get_projects()
+            ]
+        else:
+            projects = [(vcs_type, username, project) for username, project in projects]
+
+        calls = [
+            (vcs, username, project, branch)
+            for vcs, username, project in projects
+            for branch in (branches or [None])
+        ]
+
+        def fetch(call):
+            vcs, username, project, branch = call
+            route = ROUTES['get_branch_build_summary' if branch else 'get_project_build_summary']
+            endpoint = route.endpoint(
+                vcs_type=vcs,
+                username=username,
+                project=project,
+                branch=branch,
+                limit=1 if branch else min(limit, 100),
+                offset=0
+            )
+            builds = self._request(
+                route.verb,
+                endpoint,
+                template=route.template,
+                timeout=timeout
+            )
+
+            # builds are newest first
+            latest = {}
+            for build in builds:
+                latest.setdefault(build.get('branch'), build)
+            return latest
+
+        return run_bulk(fetch, calls, max_workers, ordered=False)
+
+    def org_snapshot(
+            self,
+            projects=None,
+            branches=None,
+            limit=30,
+            max_workers=16,
+            timeout=None,
+            vcs_type='github'):
+        """The latest build of every branch of many projects, fetched
+        concurrently.
+
+        Takes the same arguments as :meth:`iter_org_snapshot`, which can be
+        used instead to render results as they arrive.
+
+        :returns: A dict with ``projects``, a dict of the latest build by \
+            branch name for each ``"vcs_type/username/project"``, and \
+            ``errors``, a dict for each project which could not be fully \
+            fetched, of the exception raised by branch name (None without \
+            ``branches``).
+
+        .. versionadded:: 2.0.0
+        """
+        snapshot = {
+            'projects': {},
+            'errors': {},
+        }
+
+        for item in self.iter_org_snapshot(
+                projects,
+                branches,
+                limit=limit,
+                max_workers=max_workers,
+                timeout=timeout,
+                vcs_type=vcs_type):
+            vcs, username, project, branch = item.item
+            key = '{0}/{1}/{2}'.format(vcs, username, project)
+            if item.ok:
+                snapshot['projects'].setdefault(key, {}).update(item.result)
+            else:
+                snapshot['errors'].setdefault(key, {})[branch] = item.error
+
+        return snapshot
+
     def get_build_info(self, username, project, build_num, vcs_type='github'):
         """Full details for a single build.
 
@@ -159,15 +474,262 @@ class Api():
 
         Endpoint:
             GET: ``/project/:vcs-type/:username/:project/:build_num``
+
+        .. versionchanged:: 2.0.0
+           Finished builds are served from ``store`` when one is configured.
         """
-        endpoint = 'project/{0}/{1}/{2}/{3}'.format(
-            vcs_type,
+        if self.store is not None:
+            stored = self.store.get('build', vcs_type, username, project, build_num)
+            if stored is not None:
+                return stored
+
+        resp = self._call(
+            'get_build_info',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+
+        if self.store is not None and is_terminal(resp):
+            self.store.put('build', vcs_type, username, project, build_num, resp)
+
+        return resp
+
+    def iter_build_steps(self, username, project, build_num, vcs_type='github'):
+        """Iterate over the steps of a build without loading the whole build.
+
+        The response is parsed incrementally, so only one step (with its
+        actions) is held in memory at a time.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :returns: A generator of steps.
+
+        .. versionadded:: 2.0.0
+        """
+        return self._iter_build_path(username, project, build_num, vcs_type, ('steps', '*'))
+
+    def iter_build_actions(self, username, project, build_num, vcs_type='github'):
+        """Iterate over the actions of every step of a build.
+
+        The response is parsed incrementally, so only one action is held in
+        memory at a time. Each action's ``step`` and ``index`` identify the
+        step and container it belongs to.
+
+        Takes the same arguments as :meth:`iter_build_steps`.
+
+        :returns: A generator of actions.
+
+        .. versionadded:: 2.0.0
+        """
+        return self._iter_build_path(
             username,
             project,
-            build_num
+            build_num,
+            vcs_type,
+            ('steps', '*', 'actions', '*')
         )
-        resp = self._request('GET', endpoint)
-        return resp
+
+    def get_build_fields(self, username, project, build_num, fields, vcs_type='github'):
+        """Get only some top level fields of a build.
+
+        Unwanted fields are skipped without being decoded and the response
+        stops being read once every field has been found.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param fields: Names of the fields to return, i.e. \
+            ``['status', 'build_time_millis']``.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :returns: A dict with the requested fields.
+
+        .. versionadded:: 2.0.0
+        """
+        if self.store is not None:
+            stored = self.store.get('build', vcs_type, username, project, build_num)
+            if stored is not None:
+                return {k: stored[k] for k in fields if k in stored}
+
+        endpoint = ROUTES['get_build_info'].endpoint(
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+
+        with self._stream(endpoint, template=ROUTES['get_build_info'].template) as chunks:
+            return extract(chunks, fields)
+
+    def iter_build_logs(
+            self,
+            username,
+            project,
+            build_num,
+            steps=None,
+            statuses=None,
+            pattern=None,
+            max_workers=4,
+            chunk_size=65536,
+            vcs_type='github'):
+        """Stream the step logs of a build, line by line.
+
+        Logs of the selected actions are fetched concurrently from their
+        ``output_url`` and parsed incrementally, so no log is held in memory
+        as a whole. Lines of one action are yielded in order, lines of
+        different actions are interleaved as they arrive.
+
+        ::
+
+            for line in circleci.iter_build_logs(
+                    'levlaz', 'circleci.py', 1234,
+                    statuses=['failed'], pattern=r'Error|FAIL'):
+                print(line.name, line.lineno, line.text)
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param steps: Optional step names or step numbers to fetch the \
+            logs of. Defaults to every step.
+        :param statuses: Optional action statuses to fetch the logs of, \
+            i.e. ``['failed']``. Defaults to any status.
+        :param pattern: Optional regular expression, as a string or \
+            compiled. Only lines in which it is found are yielded.
+        :param max_workers: Maximum number of logs fetched at once. \
+            Defaults to 4.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 64 KiB.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :type max_workers: int
+        :type chunk_size: int
+
+        :raises requests.exceptions.HTTPError: When a log can not be fetched.
+
+        :returns: A generator of :class:`circleci.logs.LogLine`.
+
+        .. versionadded:: 2.0.0
+        """
+        if steps is not None:
+            steps = set(steps)
+        if statuses is not None:
+            statuses = set(statuses)
+
+        actions = [
+            action
+            for action in self.iter_build_actions(username, project, build_num, vcs_type)
+            if action.get('output_url')
+            and (steps is None or action.get('step') in steps or action.get('name') in steps)
+            and (statuses is None or action.get('status') in statuses)
+        ]
+
+        def fetch(action):
+            # output urls are signed, they must not be sent our credentials
+            with self._stream_url(action['output_url'], action['output_url'], chunk_size, 'log') as chunks:
+                for lineno, text in iter_log_lines(chunks, pattern):
+                    yield LogLine(
+                        action.get('step'),
+                        action.get('index'),
+                        action.get('name'),
+                        lineno,
+                        text
+                    )
+
+        for item in stream_bulk(fetch, actions, max_workers):
+            if not item.ok:
+                raise item.error
+            yield item.result
+
+    def wait_for_build(
+            self,
+            username,
+            project,
+            build_num,
+            timeout=None,
+            typical_duration=None,
+            min_interval=2.0,
+            max_interval=60.0,
+            vcs_type='github'):
+        """Wait for a build to finish.
+
+        The build is polled with :meth:`get_build_info` at intervals chosen
+        by :func:`circleci.watcher.poll_interval`, based on its status, how
+        long it has been queued or running, and its typical duration. To
+        wait on many builds at once use :class:`circleci.watcher.BuildWatcher`.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param timeout: Optional number of seconds to wait for.
+        :param typical_duration: Optional typical build duration in seconds.
+        :param min_interval: Shortest polling interval. Defaults to 2.
+        :param max_interval: Longest polling interval. Defaults to 60.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :type timeout: float
+        :type typical_duration: float
+
+        :raises BuildTimeoutError: when the build has not finished in time.
+
+        :returns: The full details of the finished build.
+
+        .. versionadded:: 2.0.0
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            build = self.get_build_info(username, project, build_num, vcs_type)
+
+            if is_terminal(build):
+                return build
+
+            interval = poll_interval(build, typical_duration, min_interval, max_interval)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BuildTimeoutError(build_num, build)
+                interval = min(interval, remaining)
+
+            time.sleep(interval)
+
+    def get_build_infos(
+            self,
+            username,
+            project,
+            build_nums,
+            max_workers=8,
+            as_completed=False,
+            vcs_type='github'):
+        """Full details for many builds, fetched concurrently.
+
+        See :meth:`_bulk` for how results and errors are returned.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_nums: Iterable of build numbers.
+        :param max_workers: Maximum number of concurrent requests. \
+            Defaults to 8.
+        :param as_completed: Yield results as they complete instead of \
+            returning them in order. Defaults to False.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        .. versionadded:: 2.0.0
+        """
+        def fetch(build_num):
+            return self.get_build_info(username, project, build_num, vcs_type)
+
+        return self._bulk(fetch, build_nums, max_workers, as_completed)
 
     def get_artifacts(self, username, project, build_num, vcs_type='github'):
         """List the artifacts produced by a given build.
@@ -181,15 +743,34 @@ class Api():
         Endpoint:
             GET: ``/project/:vcs-type/:username/:project/:build_num/artifacts``
         """
-        endpoint = 'project/{0}/{1}/{2}/{3}/artifacts'.format(
-            vcs_type,
-            username,
-            project,
-            build_num
+        resp = self._call(
+            'get_artifacts',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
         )
-        resp = self._request('GET', endpoint)
         return resp
 
+    def get_artifact_lists(
+            self,
+            username,
+            project,
+            build_nums,
+            max_workers=8,
+            as_completed=False,
+            vcs_type='github'):
+        """List the artifacts of many builds, fetched concurrently.
+
+        Takes the same arguments as :meth:`get_build_infos`.
+
+        .. versionadded:: 2.0.0
+        """
+        def fetch(build_num):
+            return self.get_artifacts(username, project, build_num, vcs_type)
+
+        return self._bulk(fetch, build_nums, max_workers, as_completed)
+
     def get_latest_artifact(
             self,
             username,
@@ -225,36 +806,182 @@ class Api():
             raise InvalidFilterError(status_filter, 'artifacts')
 
         # passing None makes the API 404
-        if branch:
-            endpoint = 'project/{0}/{1}/{2}/latest/artifacts?branch={3}&filter={4}'.format(
-                vcs_type,
-                username,
-                project,
-                branch,
-                status_filter
-            )
-        else:
-            endpoint = 'project/{0}/{1}/{2}/latest/artifacts?filter={3}'.format(
-                vcs_type,
-                username,
-                project,
-                status_filter
-            )
-
-        resp = self._request('GET', endpoint)
+        resp = self._call(
+            'get_latest_artifact',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            branch=branch or None,
+            filter=status_filter
+        )
         return resp
 
-    def download_artifact(self, url, destdir=None, filename=None):
+    def download_artifact(self, url, destdir=None, filename=None, chunk_size=65536, fileobj=None, size=None):
         """Download an artifact from a url
 
+        With an ``artifact_cache``, an artifact downloaded before is linked or
+        copied from the cache instead, keyed by the build, container index
+        and path its URL names and its ``size``, as by
+        :meth:`download_artifacts`.
+
         :param url: The URL to the artifact.
         :param destdir: The optional destination directory. \
             Defaults to None (curent working directory).
         :param filename: Optional file name. Defaults to the name of the artifact file.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 64 KiB.
+        :param fileobj: Optional binary file object, stream or buffer \
+            (anything with a ``write`` method) to write the artifact to \
+            instead of a file. ``destdir``, ``filename`` and the \
+            ``artifact_cache`` are then not used.
+        :param size: Optional size of the artifact in bytes, as listed by \
+            :meth:`get_artifacts`, to tell it from an artifact uploaded \
+            again at the same path in the ``artifact_cache``.
+
+        :type chunk_size: int
+        :type size: int
+
+        :returns: The path to the downloaded file, or with ``fileobj``, \
+            the number of bytes written.
+
+        .. versionchanged:: 2.0.0
+           Added ``fileobj`` and ``size``.
         """
-        resp = self._download(url, destdir, filename)
+        if fileobj is not None:
+            return self._write_artifact(url, fileobj, chunk_size)
+
+        resp = self._download(url, destdir, filename, chunk_size, size)
         return resp
 
+    def iter_artifact(self, url, chunk_size=65536):
+        """Stream an artifact from a url, without saving it.
+
+        :param url: The URL to the artifact.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 64 KiB.
+
+        :type chunk_size: int
+
+        :raises requests.exceptions.HTTPError: When response code is not successful.
+
+        :returns: A generator of ``bytes`` chunks. The connection is \
+            released when it is exhausted or closed.
+
+        .. versionadded:: 2.0.0
+        """
+        with self._stream_artifact(url, chunk_size) as chunks:
+            yield from chunks
+
+    def open_artifact(self, url, chunk_size=65536):
+        """Open an artifact from a url as a read only binary file object,
+        i.e. to hand it to a parser or upload it elsewhere without saving
+        it first::
+
+            with circleci.open_artifact(url) as f:
+                for line in f:
+                    ...
+
+        :param url: The URL to the artifact.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 64 KiB.
+
+        :type chunk_size: int
+
+        :raises requests.exceptions.HTTPError: When response code is not successful.
+
+        :returns: A buffered, non seekable :class:`io.BufferedReader`. \
+            Close it to release the connection.
+
+        .. versionadded:: 2.0.0
+        """
+        return io.BufferedReader(
+            _ChunkReader(self._stream_artifact(url, chunk_size)),
+            buffer_size=chunk_size
+        )
+
+    def download_artifacts(
+            self,
+            username,
+            project,
+            build_num,
+            destdir=None,
+            max_workers=4,
+            chunk_size=1048576,
+            vcs_type='github'):
+        """Download every artifact produced by a build, in parallel.
+
+        Each artifact is saved under ``destdir`` at its artifact ``path``,
+        so the directory layout of the build is recreated locally. When the
+        artifacts come from more than one container, each container's are
+        saved under a ``<node_index>/`` subdirectory, as parallel containers
+        often upload the same paths. With an ``artifact_cache``, artifacts
+        are cached by build, container index, path and size, as by
+        :meth:`download_artifact`.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param destdir: The optional destination directory. \
+            Defaults to None (curent working directory).
+        :param max_workers: Maximum number of concurrent downloads. \
+            Defaults to 4.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 1 MiB.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :type max_workers: int
+        :type chunk_size: int
+
+        :returns: A manifest with one dict per artifact holding its ``path``, \
+            ``node_index``, ``url``, local ``file``, ``size`` in bytes, download time in \
+            ``seconds`` and ``error``, which is None unless the download failed.
+
+        .. versionadded:: 2.0.0
+        """
+        if not destdir:
+            destdir = os.getcwd()
+
+        artifacts = self.get_artifacts(username, project, build_num, vcs_type)
+        parallel = len(set(a.get('node_index') for a in artifacts) - {None}) > 1
+
+        def fetch(artifact):
+            relpath = os.path.normpath(artifact['path'].lstrip('/'))
+
+            if relpath.startswith(os.pardir):
+                raise ValueError(
+                    'artifact path escapes destdir: {0}'.format(artifact['path'])
+                )
+
+            if parallel and artifact.get('node_index') is not None:
+                relpath = os.path.join(str(artifact['node_index']), relpath)
+
+            subdir, filename = os.path.split(relpath)
+            target = os.path.join(destdir, subdir)
+            os.makedirs(target, exist_ok=True)
+
+            start = time.perf_counter()
+            path = self._download(artifact['url'], target, filename, chunk_size, artifact.get('size'))
+            elapsed = time.perf_counter() - start
+
+            return path, os.path.getsize(path), elapsed
+
+        manifest = []
+
+        for item in run_bulk(fetch, artifacts, max_workers):
+            path, size, elapsed = item.result or (None, None, None)
+            manifest.append({
+                'path': item.item['path'],
+                'node_index': item.item.get('node_index'),
+                'url': item.item['url'],
+                'file': path,
+                'size': size,
+                'seconds': elapsed,
+                'error': item.error,
+            })
+
+        return manifest
+
     def retry_build(self, username, project, build_num, ssh=False, vcs_type='github'):
         """Retries the build.
 
@@ -270,21 +997,13 @@ class Api():
         Endpoint:
             POST: ``/project/:vcs-type/:username/:project/:build_num/retry``
         """
-        if ssh:
-            endpoint = 'project/{0}/{1}/{2}/{3}/ssh'.format(
-                vcs_type,
-                username,
-                project,
-                build_num
-            )
-        else:
-            endpoint = 'project/{0}/{1}/{2}/{3}/retry'.format(
-                vcs_type,
-                username,
-                project,
-                build_num
-            )
-        resp = self._request('POST', endpoint)
+        resp = self._call(
+            'retry_build_ssh' if ssh else 'retry_build',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
         return resp
 
     def cancel_build(self, username, project, build_num, vcs_type='github'):
@@ -299,13 +1018,13 @@ class Api():
         Endpoint:
             POST: ``/project/:vcs-type/:username/:project/:build_num/cancel``
         """
-        endpoint = 'project/{0}/{1}/{2}/{3}/cancel'.format(
-            vcs_type,
-            username,
-            project,
-            build_num
+        resp = self._call(
+            'cancel_build',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
         )
-        resp = self._request('POST', endpoint)
         return resp
 
     def add_ssh_user(self, username, project, build_num, vcs_type='github'):
@@ -320,13 +1039,13 @@ class Api():
         Endpoint:
             POST: ``/project/:vcs-type/:username/:project/:build_num/ssh-users``
         """
-        endpoint = 'project/{0}/{1}/{2}/{3}/ssh-users'.format(
-            vcs_type,
-            username,
-            project,
-            build_num
+        resp = self._call(
+            'add_ssh_user',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
         )
-        resp = self._request('POST', endpoint)
         return resp
 
 
@@ -377,14 +1096,14 @@ class Api():
         if params:
             data.update(params)
 
-        endpoint = 'project/{0}/{1}/{2}/tree/{3}'.format(
-            vcs_type,
-            username,
-            project,
-            branch
+        resp = self._call(
+            'trigger_build',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            branch=branch,
+            data=data
         )
-
-        resp = self._request('POST', endpoint, data=data)
         return resp
 
     def add_ssh_key(
@@ -413,18 +1132,18 @@ class Api():
         Endpoint:
             POST: ``/project/:vcs-type/:username/:project/ssh-key``
         """
-        endpoint = 'project/{0}/{1}/{2}/ssh-key'.format(
-            vcs_type,
-            username,
-            project
-        )
-
         params = {
             "hostname": hostname,
             "private_key": ssh_key
         }
 
-        resp = self._request('POST', endpoint, data=params)
+        resp = self._call(
+            'add_ssh_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            data=params
+        )
         return resp
 
     def list_checkout_keys(self, username, project, vcs_type='github'):
@@ -438,13 +1157,12 @@ class Api():
         Endpoint:
             GET: ``project/:vcs-type/:username/:project/checkout-key``
         """
-        endpoint = 'project/{0}/{1}/{2}/checkout-key'.format(
-            vcs_type,
-            username,
-            project
+        resp = self._call(
+            'list_checkout_keys',
+            vcs_type=vcs_type,
+            username=username,
+            project=project
         )
-
-        resp = self._request('GET', endpoint)
         return resp
 
     def create_checkout_key(self, username, project, key_type, vcs_type='github'):
@@ -471,13 +1189,13 @@ class Api():
             "type": key_type
         }
 
-        endpoint = 'project/{0}/{1}/{2}/checkout-key'.format(
-            vcs_type,
-            username,
-            project
+        resp = self._call(
+            'create_checkout_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            data=params
         )
-
-        resp = self._request('POST', endpoint, data=params)
         return resp
 
     def get_checkout_key(self, username, project, fingerprint, vcs_type='github'):
@@ -492,15 +1210,14 @@ class Api():
         Endpoint:
             GET: ``/project/:vcs-type/:username/:project/checkout-key/:fingerprint``
         """
-        endpoint = 'project/{0}/{1}/{2}/checkout-key/{3}'.format(
-            vcs_type,
-            username,
-            project,
-            fingerprint
+        resp = self._call(
+            'get_checkout_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            fingerprint=fingerprint
         )
 
-        resp = self._request('GET', endpoint)
-
         return resp
 
     def delete_checkout_key(self, username, project, fingerprint, vcs_type='github'):
@@ -515,14 +1232,13 @@ class Api():
         Endpoint:
             DELETE: ``/project/:vcs-type/:username/:project/checkout-key/:fingerprint``
         """
-        endpoint = 'project/{0}/{1}/{2}/checkout-key/{3}'.format(
-            vcs_type,
-            username,
-            project,
-            fingerprint
+        resp = self._call(
+            'delete_checkout_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            fingerprint=fingerprint
         )
-
-        resp = self._request('DELETE', endpoint)
         return resp
 
     def get_test_metadata(self, username, project, build_num, vcs_type='github'):
@@ -536,17 +1252,53 @@ class Api():
 
         Endpoint:
             GET: ``/project/:vcs-type/:username/:project/:build_num/tests``
+
+        .. versionchanged:: 2.0.0
+           When a ``store`` is configured, test metadata of finished \
+           builds is stored and served from there.
         """
-        endpoint = 'project/{0}/{1}/{2}/{3}/tests'.format(
-            vcs_type,
-            username,
-            project,
-            build_num
+        finished = False
+        if self.store is not None:
+            stored = self.store.get('tests', vcs_type, username, project, build_num)
+            if stored is not None:
+                return stored
+
+            # only the status is read, unless the build itself is stored
+            build = self.get_build_fields(username, project, build_num, ['status'], vcs_type)
+            finished = is_terminal(build)
+
+        resp = self._call(
+            'get_test_metadata',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
         )
 
-        resp = self._request('GET', endpoint)
+        if finished:
+            self.store.put('tests', vcs_type, username, project, build_num, resp)
+
         return resp
 
+    def get_test_metadatas(
+            self,
+            username,
+            project,
+            build_nums,
+            max_workers=8,
+            as_completed=False,
+            vcs_type='github'):
+        """Test metadata for many builds, fetched concurrently.
+
+        Takes the same arguments as :meth:`get_build_infos`.
+
+        .. versionadded:: 2.0.0
+        """
+        def fetch(build_num):
+            return self.get_test_metadata(username, project, build_num, vcs_type)
+
+        return self._bulk(fetch, build_nums, max_workers, as_completed)
+
     def list_envvars(self, username, project, vcs_type='github'):
         """Provides list of environment variables for a project
 
@@ -558,13 +1310,12 @@ class Api():
         Endpoint:
             GET: ``/project/:vcs-type/:username/:project/envvar``
         """
-        endpoint = 'project/{0}/{1}/{2}/envvar'.format(
-            vcs_type,
-            username,
-            project
+        resp = self._call(
+            'list_envvars',
+            vcs_type=vcs_type,
+            username=username,
+            project=project
         )
-
-        resp = self._request('GET', endpoint)
         return resp
 
     def add_envvar(self, username, project, name, value, vcs_type='github'):
@@ -585,13 +1336,13 @@ class Api():
             "value": value
         }
 
-        endpoint = 'project/{0}/{1}/{2}/envvar'.format(
-            vcs_type,
-            username,
-            project
+        resp = self._call(
+            'add_envvar',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            data=params
         )
-
-        resp = self._request('POST', endpoint, data=params)
         return resp
 
     def get_envvar(self, username, project, name, vcs_type='github'):
@@ -606,15 +1357,14 @@ class Api():
         Endpoint:
             GET ``/project/:vcs-type/:username/:project/envvar/:name``
         """
-        endpoint = 'project/{0}/{1}/{2}/envvar/{3}'.format(
-            vcs_type,
-            username,
-            project,
-            name
+        resp = self._call(
+            'get_envvar',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            name=name
         )
 
-        resp = self._request('GET', endpoint)
-
         return resp
 
     def delete_envvar(self, username, project, name, vcs_type='github'):
@@ -629,23 +1379,182 @@ class Api():
         Endpoint:
             DELETE ``/project/:vcs-type/:username/:project/envvar/:name``
         """
-        endpoint = 'project/{0}/{1}/{2}/envvar/{3}'.format(
-            vcs_type,
+        resp = self._call(
+            'delete_envvar',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            name=name
+        )
+
+        return resp
+
+    def sync_envvars(
+            self,
             username,
             project,
-            name
-        )
+            desired,
+            prune=False,
+            force=False,
+            dry_run=False,
+            max_workers=8,
+            vcs_type='github'):
+        """Bring a project's environment variables to a desired state.
 
-        resp = self._request('DELETE', endpoint)
+        The current variables are listed once and only the variables which
+        need to change are written, concurrently. See
+        :mod:`circleci.envvars` for how changed values are detected.
 
-        return resp
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param desired: The values wanted, by name.
+        :param prune: Delete variables which are not in ``desired``. \
+            Defaults to False.
+        :param force: Write every variable in ``desired``, even if it \
+            looks up to date. Defaults to False.
+        :param dry_run: Work out the changes without making them. \
+            Defaults to False.
+        :param max_workers: Maximum number of concurrent requests. \
+            Defaults to 8.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :type desired: dict
+        :type prune: bool
+        :type force: bool
+        :type dry_run: bool
+        :type max_workers: int
+
+        :raises requests.exceptions.HTTPError: When the variables can not \
+            be listed.
+
+        :returns: A report of the names ``added``, ``updated``, ``deleted`` \
+            and ``unchanged``, and ``errors``, a dict of the exception \
+            raised by each failed change, by name.
+
+        .. versionadded:: 2.0.0
+        """
+        report = self.sync_projects_envvars(
+            username,
+            [project],
+            desired,
+            prune=prune,
+            force=force,
+            dry_run=dry_run,
+            max_workers=max_workers,
+            vcs_type=vcs_type
+        )[project]
+
+        error = report.pop('error')
+        if error is not None:
+            raise error
+
+        return report
+
+    def sync_projects_envvars(
+            self,
+            username,
+            projects,
+            desired,
+            prune=False,
+            force=False,
+            dry_run=False,
+            max_workers=8,
+            vcs_type='github'):
+        """Bring the environment variables of many projects to the same
+        desired state.
 
-    def _request(self, verb, endpoint, data=None):
+        Projects are listed concurrently, then every change for every
+        project is made on one pool of ``max_workers`` threads, so the
+        number of requests in flight stays bounded however many projects
+        there are.
+
+        Takes the same arguments as :meth:`sync_envvars`, except for
+        ``projects``, an iterable of case sensitive repo names.
+
+        :returns: A dict of reports by project, as returned by \
+            :meth:`sync_envvars`. Each report also has an ``error``, the \
+            exception raised when listing the project's variables, or None.
+
+        .. versionadded:: 2.0.0
+        """
+        projects = list(projects)
+
+        def list_project(project):
+            return self.list_envvars(username, project, vcs_type)
+
+        reports = {}
+        changes = []
+
+        for item in run_bulk(list_project, projects, max_workers):
+            report = reports[item.item] = {
+                'added': [],
+                'updated': [],
+                'deleted': [],
+                'unchanged': [],
+                'errors': {},
+                'error': item.error,
+            }
+
+            if not item.ok:
+                continue
+
+            todo = plan_envvars(item.result, desired, prune=prune, force=force)
+            report['unchanged'] = todo.unchanged
+
+            changes.extend((item.item, 'added', k, v) for k, v in todo.add.items())
+            changes.extend((item.item, 'updated', k, v) for k, v in todo.update.items())
+            changes.extend((item.item, 'deleted', k, None) for k in todo.delete)
+
+        def apply(change):
+            project, kind, name, value = change
+            if kind == 'deleted':
+                return self.delete_envvar(username, project, name, vcs_type)
+            return self.add_envvar(username, project, name, value, vcs_type)
+
+        if dry_run:
+            for project, kind, name, _ in changes:
+                reports[project][kind].append(name)
+            return reports
+
+        for item in run_bulk(apply, changes, max_workers):
+            project, kind, name, _ = item.item
+            if item.ok:
+                reports[project][kind].append(name)
+            else:
+                reports[project]['errors'][name] = item.error
+
+        return reports
+
+    def _call(self, route, data=None, **params):
+        """Request one of the endpoints in :data:`circleci.routes.ROUTES`.
+
+        :param route: The name of the route.
+        :param data: Optional request body.
+        :param params: Path and query parameters of the route.
+
+        :returns: A JSON object with the response from the API.
+        """
+        route = ROUTES[route]
+        return self._request(
+            route.verb,
+            route.endpoint(**params),
+            data=data,
+            template=route.template
+        )
+
+    def _request(self, verb, endpoint, data=None, template=None, timeout=None):
         """Request a url.
 
+        With a ``coalescer``, a ``GET`` identical to one already in flight
+        waits for it and returns its result, or raises its exception.
+
         :param endpoint: The api endpoint we want to call.
         :param verb: POST, GET, or DELETE.
         :param params: Optional build parameters.
+        :param template: Optional endpoint template to record metrics under.
+        :param timeout: Optional timeout for this request. Defaults to the \
+            ``timeout`` this object was created with.
 
         :type params: dict
 
@@ -653,35 +1562,321 @@ class Api():
 
         :returns: A JSON object with the response from the API.
         """
-
-        headers = {
-            'Accept': 'application/json',
-        }
-        auth = HTTPBasicAuth(self.token, '')
-        resp = None
+        if verb not in ('GET', 'POST', 'DELETE'):
+            raise BadVerbError(verb)
 
         request_url = "{0}/{1}".format(self.url, endpoint)
 
-        if verb == 'GET':
-            resp = requests.get(request_url, auth=auth, headers=headers)
-        elif verb == 'POST':
-            resp = requests.post(request_url, auth=auth, headers=headers, json=data)
-        elif verb == 'DELETE':
-            resp = requests.delete(request_url, auth=auth, headers=headers)
-        else:
-            raise BadVerbError(verb)
+        if self.coalescer is not None and verb == 'GET':
+            return self.coalescer.do(
+                (verb, canonical_url(request_url), _token_digest(self.token)),
+                lambda: self._fetch(verb, request_url, endpoint, data, template, timeout)
+            )
+
+        return self._fetch(verb, request_url, endpoint, data, template, timeout)
+
+    def _fetch(self, verb, request_url, endpoint, data, template, timeout):
+        """Make a request for :meth:`_request`, through the cache if any."""
+        headers = self._headers
+        cached = None
+
+        if self.cache is not None and verb == 'GET':
+            cached = self.cache.get(self._cache_key(request_url))
+            if cached is not None:
+                if cached.fresh:
+                    return self.cache.hit(cached)
+                headers = cached.conditional_headers(headers)
+
+        event = None
+        if self.metrics is not None:
+            event = self.metrics.start(verb, endpoint, template)
+
+        try:
+            resp = self._send(
+                verb,
+                request_url,
+                event,
+                auth=self._auth,
+                headers=headers,
+                json=data if verb == 'POST' else None,
+                timeout=self.timeout if timeout is None else timeout
+            )
+
+            if cached is not None and resp.status_code == 304:
+                return self.cache.revalidated(cached, self.cache.ttl_for(endpoint))
+
+            resp.raise_for_status()
+
+            started = time.perf_counter()
+            result = resp.json()
+            if event is not None:
+                event.decode_seconds = time.perf_counter() - started
+        except Exception as e:
+            if event is not None:
+                event.error = e
+            raise
+        finally:
+            if event is not None:
+                self.metrics.finish(event)
+
+        if self.cache is not None:
+            if verb == 'GET':
+                self.cache.set(
+                    self._cache_key(request_url),
+                    result,
+                    resp.headers,
+                    self.cache.ttl_for(endpoint)
+                )
+            else:
+                self._invalidate_project(endpoint)
+
+        return result
+
+    def _send(self, verb, url, event=None, **kwargs):
+        """Send a request, applying the rate limiter and retry policy.
+
+        :param verb: The HTTP verb.
+        :param url: The full URL.
+        :param event: Optional :class:`circleci.metrics.RequestEvent` to \
+            record network time, bytes, status and retries on. Bytes \
+            received are only recorded when the response is not streamed.
+        :param kwargs: Passed on to the ``request`` method of the transport.
+
+        :returns: The final response.
+        """
+        retries = 0
+        started = time.monotonic()
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                sent = time.perf_counter()
+                resp = self.transport.request(verb, url, **kwargs)
+                if event is not None:
+                    self._record_response(event, resp, sent, retries, kwargs.get('stream'))
+            except self.transport.connection_errors:
+                if self.retry is None:
+                    raise
+                delay = self.retry.next_delay(
+                    verb,
+                    retries,
+                    time.monotonic() - started
+                )
+                if delay is None:
+                    raise
+            else:
+                if self.retry is None or resp.ok:
+                    return resp
+                delay = self.retry.next_delay(
+                    verb,
+                    retries,
+                    time.monotonic() - started,
+                    resp.status_code,
+                    resp.headers
+                )
+                if delay is None:
+                    return resp
+                resp.close()
+
+            time.sleep(delay)
+            retries += 1
+
+    @staticmethod
+    def _record_response(event, resp, sent, retries, stream):
+        """Record one attempt of a request on a metrics event."""
+        event.network_seconds += time.perf_counter() - sent
+        event.status = resp.status_code
+        event.retries = retries
+
+        body = resp.request.body
+        event.bytes_out += len(body) if body else 0
+
+        if not stream:
+            event.bytes_in += len(resp.content)
+
+    def _stream(self, endpoint, chunk_size=65536, template=None):
+        """Request a url and stream the response body.
+
+        :param endpoint: The api endpoint we want to call.
+        :param chunk_size: Number of bytes to read at a time.
+        :param template: Optional endpoint template to record metrics under.
+
+        :raises requests.exceptions.HTTPError: When response code is not successful.
+
+        :returns: A context manager giving an iterator of ``bytes`` chunks. \
+            The connection is released when it exits.
+        """
+        return self._stream_url(
+            "{0}/{1}".format(self.url, endpoint),
+            endpoint,
+            chunk_size,
+            template,
+            auth=self._auth,
+            headers=self._headers
+        )
+
+    def _stream_url(self, url, endpoint, chunk_size, template, **kwargs):
+        """Stream the response body of any url.
+
+        :param url: The full URL.
+        :param endpoint: What to record the request as in metrics.
+        :param chunk_size: Number of bytes to read at a time.
+        :param template: Endpoint template to record metrics under.
+        :param kwargs: Passed on to :meth:`_send`.
+
+        :returns: See :meth:`_stream`.
+        """
+        event = None
+        if self.metrics is not None:
+            event = self.metrics.start('GET', endpoint, template)
+
+        try:
+            resp = self._send(
+                'GET',
+                url,
+                event,
+                stream=True,
+                timeout=self.timeout,
+                **kwargs
+            )
+            try:
+                resp.raise_for_status()
+            except Exception:
+                resp.close()
+                raise
+        except Exception as e:
+            if event is not None:
+                event.error = e
+                self.metrics.finish(event)
+            raise
+
+        return _StreamedResponse(resp, chunk_size, self.metrics, event)
+
+    def _iter_build_path(self, username, project, build_num, vcs_type, path):
+        """Yield the values at ``path`` in a build's details.
+
+        Finished builds are read from ``store`` when one is configured.
+        """
+        if self.store is not None:
+            stored = self.store.get('build', vcs_type, username, project, build_num)
+            if stored is not None:
+                yield from iter_path([json.dumps(stored).encode('utf-8')], path)
+                return
+
+        endpoint = ROUTES['get_build_info'].endpoint(
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+
+        with self._stream(endpoint, template=ROUTES['get_build_info'].template) as chunks:
+            yield from iter_path(chunks, path)
+
+    def _cache_key(self, request_url):
+        """Key of a response in ``cache``: the URL and a digest of the
+        token, as objects with different tokens may share one cache, like
+        the key of a flight in ``coalescer``.
+
+        Project writes drop entries by URL prefix, for every token.
+        """
+        return '{0}#{1}'.format(request_url, _token_digest(self.token))
+
+    def _invalidate_project(self, endpoint):
+        """Drop cached responses for the project a write went to.
+
+        :param endpoint: The api endpoint that was written to.
+        """
+        segments = endpoint.split('?', 1)[0].split('/')
+
+        if segments[0] != 'project' or len(segments) < 4:
+            return
 
-        resp.raise_for_status()
+        prefix = "{0}/{1}".format(self.url, '/'.join(segments[:4]))
+        self.cache.invalidate((prefix + '/', prefix + '?'))
 
-        return resp.json()
+    @staticmethod
+    def _bulk(fetch, items, max_workers, as_completed):
+        """Bulk request helper.
 
-    def _download(self, url, destdir=None, filename=None):
+        Requests run on a bounded thread pool and share this object's
+        connection pool. If ``max_workers`` is larger than ``pool_maxsize``
+        the extra connections are not kept alive between requests.
+
+        :param fetch: Callable taking a single item.
+        :param items: Iterable of items.
+        :param max_workers: Maximum number of concurrent requests.
+        :param as_completed: Return a generator yielding results as they \
+            complete, rather than a list in the order of ``items``.
+
+        :returns: :class:`circleci.bulk.BulkResult` objects. A failed \
+            request has its exception stored in ``error`` instead of \
+            being raised.
+        """
+        results = run_bulk(fetch, items, max_workers, ordered=not as_completed)
+
+        if as_completed:
+            return results
+        return list(results)
+
+    @staticmethod
+    def _paginate(fetch, page_size, max_builds, until, ordered=False):
+        """Offset based pagination helper.
+
+        :param fetch: Callable taking ``(limit, offset)`` and returning a page.
+        :param page_size: Builds per page, capped at the API maximum of 100.
+        :param max_builds: Optional total number of builds to yield.
+        :param until: Optional predicate which ends iteration.
+        :param ordered: Pages are ordered by descending ``build_num``. Builds \
+            that are pushed onto a later page by newly started builds are \
+            then skipped rather than yielded twice.
+        """
+        page_size = max(1, min(page_size, 100))
+        offset = 0
+        count = 0
+        lowest = None
+
+        while max_builds is None or count < max_builds:
+            limit = page_size
+            if max_builds is not None:
+                limit = min(limit, max_builds - count)
+
+            page = fetch(limit, offset)
+
+            for build in page:
+                if ordered:
+                    if lowest is not None and build['build_num'] >= lowest:
+                        continue
+                    lowest = build['build_num']
+
+                if until is not None and until(build):
+                    return
+
+                yield build
+                count += 1
+
+                if max_builds is not None and count >= max_builds:
+                    return
+
+            if len(page) < limit:
+                return
+
+            offset += len(page)
+
+    def _download(self, url, destdir=None, filename=None, chunk_size=65536, size=None):
         """File download helper.
 
         :param url: The URL to the artifact.
         :param destdir: The optional destination directory. \
             Defaults to None (curent working directory).
         :param filename: Optional file name. Defaults to the name of the artifact file.
+        :param chunk_size: Number of bytes to read at a time.
+        :param size: Optional size of the artifact, for its \
+            ``artifact_cache`` key.
+
+        :raises requests.exceptions.HTTPError: When response code is not successful.
         """
         if not filename:
             filename = url.split('/')[-1]
@@ -689,15 +1884,138 @@ class Api():
         if not destdir:
             destdir = os.getcwd()
 
-        endpoint = "{0}?circle-token={1}".format(url, self.token)
-
-        resp = requests.get(endpoint, stream=True)
-
         path = "{0}/{1}".format(destdir, filename)
 
-        with open(path, 'wb') as f:
-            for chunk in resp.iter_content(chunk_size=1024):
-                if chunk:
+        if self.artifact_cache is not None:
+            self.artifact_cache.retrieve(
+                self.artifact_cache.url_key(url, size),
+                path,
+                lambda f: self._write_artifact(url, f, chunk_size)
+            )
+            return path
+
+        with self._stream_artifact(url, chunk_size) as chunks:
+            with open(path, 'wb') as f:
+                for chunk in chunks:
                     f.write(chunk)
 
         return path
+
+    def _write_artifact(self, url, fileobj, chunk_size):
+        """Write an artifact to a file object.
+
+        :returns: The number of bytes written.
+        """
+        written = 0
+        with self._stream_artifact(url, chunk_size) as chunks:
+            for chunk in chunks:
+                fileobj.write(chunk)
+                written += len(chunk)
+        return written
+
+    def _stream_artifact(self, url, chunk_size):
+        """Request an artifact and stream its body.
+
+        :param url: The URL to the artifact.
+        :param chunk_size: Number of bytes to read at a time.
+
+        :returns: See :meth:`_stream`.
+        """
+        endpoint = "{0}?circle-token={1}".format(url, self.token)
+        return self._stream_url(endpoint, url, chunk_size, 'artifact')
+
+
+class _ChunkReader(io.RawIOBase):
+    """Raw binary file object over a :class:`_StreamedResponse`.
+
+    Reads are served from the chunks as they arrive, copying each byte once
+    into the caller's buffer.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._chunks = stream.__enter__()
+        self._chunk = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._chunk:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._chunk = memoryview(chunk)
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stream.__exit__(None, None, None)
+        super().close()
+
+
+class _StreamedResponse():
+    """Context manager yielding the body of a streamed response in chunks.
+
+    When metrics are enabled, bytes and time spent reading the body are
+    recorded, and the request is finished when the context exits.
+    """
+
+    def __init__(self, resp, chunk_size, metrics=None, event=None):
+        self._resp = resp
+        self._chunk_size = chunk_size
+        self._metrics = metrics
+        self._event = event
+
+    def __enter__(self):
+        chunks = self._resp.iter_content(chunk_size=self._chunk_size)
+
+        if self._event is None:
+            return chunks
+        return self._count(chunks)
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._resp.close()
+
+        if self._event is not None:
+            self._event.error = exc
+            self._metrics.finish(self._event)
+
+    def _count(self, chunks):
+        chunks = iter(chunks)
+
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            self._event.network_seconds += time.perf_counter() - started
+
+            if chunk is None:
+                return
+
+            self._event.bytes_in += len(chunk)
+
+            # time spent by the consumer is spent decoding
+            started = time.perf_counter()
+            yield chunk
+            self._event.decode_seconds += time.perf_counter() - started
+
+
+@functools.lru_cache(maxsize=16)
+def _token_digest(token):
+    """A short digest standing in for a token in cache keys."""
+    return hashlib.sha256(str(token).encode('utf-8')).hexdigest()[:16]
+
+
+def _vcs_type_of(project, default):
+    """Work out the VCS type of a project listed by :meth:`Api.get_projects`."""
+    vcs_url = project.get('vcs_url') or ''
+
+    if 'bitbucket.org' in vcs_url:
+        return 'bitbucket'
+    if 'github.com' in vcs_url:
+        return 'github'
+    return default
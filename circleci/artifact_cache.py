@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.artifact_cache
+~~~~~~~~~~~~~~~~~~~~~~~
+
+    This module provides a local cache of downloaded artifacts, which can be
+    passed to :class:`circleci.api.Api`.
+
+    Artifacts are stored in a directory under a key derived from the build,
+    container index and path their URL names (and size, when known), so an artifact downloaded
+    once is served again by hard linking it (or copying it, across file
+    systems) to where it is wanted. The least recently used artifacts are
+    removed once the cache grows past its byte budget.
+
+    All the state lives in the cache directory, so several processes on one
+    machine may share it: entries are written to a temporary file and
+    renamed into place, and where :mod:`fcntl` is available, downloads and
+    evictions are serialized with file locks, so that an artifact is only
+    downloaded once.
+
+    .. versionadded:: 2.0.0
+"""
+import contextlib
+import hashlib
+import os
+import shutil
+import threading
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+_LOCK = '.lock'
+_TMP = '.tmp'
+
+
+class ArtifactCache():
+    """A least recently used cache of artifact files.
+
+    .. note::
+        Linked files share their contents with the cache entry, so they
+        must not be modified in place. Pass ``link=False`` to always copy.
+
+    :param path: The cache directory. It is created if missing.
+    :param max_bytes: Total size of the cached files to stay under. \
+        Defaults to 1 GiB.
+    :param link: Hard link cached files where possible rather than copying \
+        them. Defaults to True.
+
+    :type max_bytes: int
+    :type link: bool
+    """
+
+    def __init__(self, path, max_bytes=1 << 30, link=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.link = link
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+        }
+
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(*parts):
+        """Derive a cache key from the parts identifying an artifact.
+
+        :returns: A hex digest.
+        """
+        return hashlib.sha256(
+            '\0'.join(str(part) for part in parts).encode('utf-8')
+        ).hexdigest()
+
+    @classmethod
+    def url_key(cls, url, size=None):
+        """Derive the cache key of an artifact from its URL and size.
+
+        The host and path of an artifact URL name its build, container
+        index and path, i.e. \
+        ``https://4149-48750547-gh.circle-artifacts.com/0/report.txt``, so
+        they make up the key. Query parameters such as the token are left
+        out. As an artifact may be uploaded again at the same path, its
+        size is part of the key too when it is known.
+
+        :param url: The URL to the artifact.
+        :param size: Optional size of the artifact in bytes, as listed by \
+            :meth:`circleci.api.Api.get_artifacts`.
+
+        :type size: int
+
+        :returns: A hex digest.
+        """
+        parsed = urlsplit(url)
+        return cls.key(parsed.netloc.lower(), parsed.path, size)
+
+    def _entry(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    @contextlib.contextmanager
+    def _locked(self, shard, blocking=True):
+        """Hold the lock of a shard directory, yielding False if it is busy
+        and ``blocking`` is False."""
+        if fcntl is None:  # pragma: no cover
+            yield True
+            return
+
+        with open(os.path.join(self.path, shard, _LOCK), 'a') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def __contains__(self, key):
+        return os.path.exists(self._entry(key))
+
+    def retrieve(self, key, dest, fill):
+        """Place the artifact stored under ``key`` at ``dest``, calling
+        ``fill`` to download it first if it is not cached.
+
+        :param key: The cache key, as returned by :meth:`key`.
+        :param dest: The path to place the file at. An existing file is \
+            replaced.
+        :param fill: Callable taking a binary file object to write the \
+            artifact to.
+
+        :returns: True if the artifact was served from the cache.
+        """
+        entry = self._entry(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+
+        with self._locked(key[:2]):
+            hit = os.path.exists(entry)
+
+            if not hit:
+                tmp = '{0}.{1}.{2}{3}'.format(entry, os.getpid(), threading.get_ident(), _TMP)
+                try:
+                    with open(tmp, 'wb') as f:
+                        fill(f)
+                    os.replace(tmp, entry)
+                except BaseException:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(tmp)
+                    raise
+            else:
+                # the modification time orders entries for eviction
+                os.utime(entry)
+
+            self._place(entry, dest)
+
+        with self._lock:
+            self._stats['hits' if hit else 'misses'] += 1
+
+        if not hit:
+            self.evict()
+
+        return hit
+
+    def _place(self, entry, dest):
+        """Link or copy an entry to ``dest``, replacing it atomically."""
+        tmp = '{0}.{1}.{2}{3}'.format(dest, os.getpid(), threading.get_ident(), _TMP)
+
+        try:
+            if self.link:
+                try:
+                    os.link(entry, tmp)
+                except OSError:
+                    shutil.copyfile(entry, tmp)
+            else:
+                shutil.copyfile(entry, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp)
+            raise
+
+    def _entries(self):
+        """Yield ``(mtime, size, shard, path)`` of every cached file."""
+        for shard in os.scandir(self.path):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name == _LOCK or entry.name.endswith(_TMP):
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    stat = entry.stat()
+                    yield stat.st_mtime, stat.st_size, shard.name, entry.path
+
+    def size(self):
+        """The total size in bytes of the cached files."""
+        return sum(size for _, size, _, _ in self._entries())
+
+    def evict(self, max_bytes=None):
+        """Remove the least recently used files until the cache fits in its
+        byte budget. Files which another thread or process is busy with
+        are left for a later eviction.
+
+        :param max_bytes: Optional budget to evict down to. Defaults to \
+            ``max_bytes``.
+
+        :returns: The number of files removed.
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _, _ in entries)
+        removed = 0
+
+        for _, size, shard, path in entries:
+            if total <= max_bytes:
+                break
+            with self._locked(shard, blocking=False) as locked:
+                if not locked:
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                    removed += 1
+                total -= size
+
+        with self._lock:
+            self._stats['evictions'] += removed
+
+        return removed
+
+    def clear(self):
+        """Remove every cached file."""
+        return self.evict(0)
+
+    def stats(self):
+        """Return a snapshot of the statistics of this cache object.
+
+        :returns: A dict with ``hits``, ``misses`` and ``evictions`` made \
+            through this object, and the current ``size`` of the cache in \
+            bytes, shared by every process.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['size'] = self.size()
+        return stats
@@ -0,0 +1,570 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.async_api
+~~~~~~~~~~~~~~~~~~
+
+    This module provides an asyncio version of :class:`circleci.api.Api`.
+    Every API method is a coroutine and all requests share one pooled
+    `aiohttp <https://docs.aiohttp.org>`_ client session.
+
+    aiohttp is an optional dependency. Install it with
+    ``pip install circleci[async]``.
+
+    .. versionadded:: 2.0.0
+"""
+import base64
+import os
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from circleci.error import BadKeyError, BadVerbError, InvalidFilterError
+from circleci.routes import ROUTES
+
+
+class AsyncApi():
+    """An asyncio python interface into the CircleCI API
+
+    Unless otherwise noted, each method takes the same arguments and returns
+    the same data as its counterpart on :class:`circleci.api.Api`.
+    """
+
+    def __init__(
+            self,
+            token,
+            url='https://circleci.com/api/v1.1',
+            limit=100,
+            limit_per_host=0,
+            keep_alive=True):
+        """Instantiate a new circleci.AsyncApi object.
+
+        The underlying client session is created on first use, from within
+        the running event loop. Call :meth:`close` (or use the object as an
+        async context manager) to release its connections.
+
+        :param url: The URL to the CircleCI instance. Defaults to \
+            https://circleci.com/api/v1.1.
+        :param token: Your CircleCI API token.
+        :param limit: Maximum number of simultaneous connections. \
+            Defaults to 100.
+        :param limit_per_host: Maximum number of simultaneous connections \
+            to one host. Defaults to 0 (no limit besides ``limit``).
+        :param keep_alive: Keep connections open between requests. \
+            Defaults to True.
+
+        :type limit: int
+        :type limit_per_host: int
+        :type keep_alive: bool
+
+        :raises ImportError: when aiohttp is not installed.
+        """
+        if aiohttp is None:
+            raise ImportError(
+                "AsyncApi requires aiohttp, install it with "
+                "'pip install circleci[async]'"
+            )
+
+        self.token = token
+        self.url = url
+
+        self._headers = {
+            'Accept': 'application/json',
+        }
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keep_alive = keep_alive
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Close all pooled connections held by this object."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        """Return the shared client session, creating it if needed."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                force_close=not self._keep_alive
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def get_user_info(self):
+        """Provides information about the signed in user."""
+        resp = await self._call('get_user_info')
+        return resp
+
+    async def get_projects(self):
+        """List of all the projects you're following on CircleCI."""
+        resp = await self._call('get_projects')
+        return resp
+
+    async def follow_project(self, username, project, vcs_type='github'):
+        """Follow a new project on CircleCI."""
+        resp = await self._call(
+            'follow_project',
+            vcs_type=vcs_type,
+            username=username,
+            project=project
+        )
+        return resp
+
+    async def get_project_build_summary(
+            self,
+            username,
+            project,
+            limit=30,
+            offset=0,
+            status_filter=None,
+            branch=None,
+            vcs_type='github'):
+        """Build summary for each of the last 30 builds for a single git repo.
+
+        :raises InvalidFilterError: when filter is not a valid filter.
+        """
+        valid_filters = [None, 'completed', 'successful', 'failed', 'running']
+
+        if status_filter not in valid_filters:
+            raise InvalidFilterError(status_filter, 'status')
+
+        resp = await self._call(
+            'get_branch_build_summary' if branch else 'get_project_build_summary',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            branch=branch,
+            limit=limit,
+            offset=offset,
+            filter=status_filter
+        )
+        return resp
+
+    async def get_recent_builds(self, limit=30, offset=0):
+        """Build summary for each of the last 30 recent builds."""
+        resp = await self._call('get_recent_builds', limit=limit, offset=offset)
+        return resp
+
+    async def get_build_info(self, username, project, build_num, vcs_type='github'):
+        """Full details for a single build."""
+        resp = await self._call(
+            'get_build_info',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+        return resp
+
+    async def get_artifacts(self, username, project, build_num, vcs_type='github'):
+        """List the artifacts produced by a given build."""
+        resp = await self._call(
+            'get_artifacts',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+        return resp
+
+    async def get_latest_artifact(
+            self,
+            username,
+            project,
+            branch=None,
+            status_filter='completed',
+            vcs_type='github'):
+        """List the artifacts produced by the latest build on a given branch.
+
+        :raises InvalidFilterError: when filter is not a valid filter.
+        """
+        valid_filters = ['completed', 'successful', 'failed']
+
+        if status_filter not in valid_filters:
+            raise InvalidFilterError(status_filter, 'artifacts')
+
+        # passing None makes the API 404
+        resp = await self._call(
+            'get_latest_artifact',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            branch=branch or None,
+            filter=status_filter
+        )
+        return resp
+
+    async def download_artifact(self, url, destdir=None, filename=None, chunk_size=65536, fileobj=None):
+        """Download an artifact from a url, streaming it to disk.
+
+        :param url: The URL to the artifact.
+        :param destdir: The optional destination directory. \
+            Defaults to None (curent working directory).
+        :param filename: Optional file name. Defaults to the name of the artifact file.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 64 KiB.
+        :param fileobj: Optional binary file object, stream or buffer to \
+            write the artifact to instead of a file.
+
+        :type chunk_size: int
+
+        :returns: The path to the downloaded file, or with ``fileobj``, \
+            the number of bytes written.
+        """
+        if fileobj is not None:
+            written = 0
+            async for chunk in self.iter_artifact(url, chunk_size):
+                fileobj.write(chunk)
+                written += len(chunk)
+            return written
+
+        resp = await self._download(url, destdir, filename, chunk_size)
+        return resp
+
+    def iter_artifact(self, url, chunk_size=65536):
+        """Stream an artifact from a url, without saving it::
+
+            async for chunk in circleci.iter_artifact(url):
+                ...
+
+        :param url: The URL to the artifact.
+        :param chunk_size: Number of bytes to read from the network at a \
+            time. Defaults to 64 KiB.
+
+        :returns: An async iterator of ``bytes`` chunks. The connection \
+            is released when it is exhausted, or by awaiting its \
+            ``aclose()``.
+        """
+        return _ArtifactChunks(
+            self._get_session(),
+            url,
+            {'circle-token': self.token},
+            chunk_size
+        )
+
+    async def retry_build(self, username, project, build_num, ssh=False, vcs_type='github'):
+        """Retries the build."""
+        resp = await self._call(
+            'retry_build_ssh' if ssh else 'retry_build',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+        return resp
+
+    async def cancel_build(self, username, project, build_num, vcs_type='github'):
+        """Cancels the build."""
+        resp = await self._call(
+            'cancel_build',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+        return resp
+
+    async def add_ssh_user(self, username, project, build_num, vcs_type='github'):
+        """Adds a user to the build's SSH permissions."""
+        resp = await self._call(
+            'add_ssh_user',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+        return resp
+
+    async def trigger_build(
+            self,
+            username,
+            project,
+            branch='master',
+            revision=None,
+            tag=None,
+            parallel=None,
+            params=None,
+            vcs_type='github'):
+        """Triggers a new build."""
+        data = {
+            'revision': revision,
+            'tag': tag,
+            'parallel': parallel,
+        }
+
+        if params:
+            data.update(params)
+
+        resp = await self._call(
+            'trigger_build',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            branch=branch,
+            data=data
+        )
+        return resp
+
+    async def add_ssh_key(
+            self,
+            username,
+            project,
+            ssh_key,
+            vcs_type='github',
+            hostname=None):
+        """Create an ssh key"""
+        params = {
+            "hostname": hostname,
+            "private_key": ssh_key
+        }
+
+        resp = await self._call(
+            'add_ssh_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            data=params
+        )
+        return resp
+
+    async def list_checkout_keys(self, username, project, vcs_type='github'):
+        """List checkout keys for a project"""
+        resp = await self._call(
+            'list_checkout_keys',
+            vcs_type=vcs_type,
+            username=username,
+            project=project
+        )
+        return resp
+
+    async def create_checkout_key(self, username, project, key_type, vcs_type='github'):
+        """Create a new checkout keys for a project
+
+        :raises InvalidKeyError: When key_type is not a valid key type.
+        """
+        valid_types = ['deploy-key', 'github-user-key']
+
+        if key_type not in valid_types:
+            raise BadKeyError(key_type)
+
+        params = {
+            "type": key_type
+        }
+
+        resp = await self._call(
+            'create_checkout_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            data=params
+        )
+        return resp
+
+    async def get_checkout_key(self, username, project, fingerprint, vcs_type='github'):
+        """Get a checkout key."""
+        resp = await self._call(
+            'get_checkout_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            fingerprint=fingerprint
+        )
+        return resp
+
+    async def delete_checkout_key(self, username, project, fingerprint, vcs_type='github'):
+        """Delete a checkout key."""
+        resp = await self._call(
+            'delete_checkout_key',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            fingerprint=fingerprint
+        )
+        return resp
+
+    async def get_test_metadata(self, username, project, build_num, vcs_type='github'):
+        """Provides test metadata for a build"""
+        resp = await self._call(
+            'get_test_metadata',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            build_num=build_num
+        )
+        return resp
+
+    async def list_envvars(self, username, project, vcs_type='github'):
+        """Provides list of environment variables for a project"""
+        resp = await self._call(
+            'list_envvars',
+            vcs_type=vcs_type,
+            username=username,
+            project=project
+        )
+        return resp
+
+    async def add_envvar(self, username, project, name, value, vcs_type='github'):
+        """Adds an environment variable to a project"""
+        params = {
+            "name": name,
+            "value": value
+        }
+
+        resp = await self._call(
+            'add_envvar',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            data=params
+        )
+        return resp
+
+    async def get_envvar(self, username, project, name, vcs_type='github'):
+        """Gets the hidden value of an environment variable"""
+        resp = await self._call(
+            'get_envvar',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            name=name
+        )
+        return resp
+
+    async def delete_envvar(self, username, project, name, vcs_type='github'):
+        """Delete an environment variable"""
+        resp = await self._call(
+            'delete_envvar',
+            vcs_type=vcs_type,
+            username=username,
+            project=project,
+            name=name
+        )
+        return resp
+
+    async def _call(self, route, data=None, **params):
+        """Request one of the endpoints in :data:`circleci.routes.ROUTES`."""
+        route = ROUTES[route]
+        resp = await self._request(route.verb, route.endpoint(**params), data=data)
+        return resp
+
+    async def _request(self, verb, endpoint, data=None):
+        """Request a url.
+
+        :param endpoint: The api endpoint we want to call.
+        :param verb: POST, GET, or DELETE.
+        :param params: Optional build parameters.
+
+        :type params: dict
+
+        :raises aiohttp.ClientResponseError: When response code is not successful.
+
+        :returns: A JSON object with the response from the API.
+        """
+        if verb not in ('GET', 'POST', 'DELETE'):
+            raise BadVerbError(verb)
+
+        request_url = "{0}/{1}".format(self.url, endpoint)
+
+        session = self._get_session()
+
+        # only API requests carry the credentials, artifact hosts do not
+        headers = dict(self._headers)
+        headers['Authorization'] = _basic_auth(self.token)
+
+        async with session.request(
+                verb,
+                request_url,
+                headers=headers,
+                json=data if verb == 'POST' else None) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+    async def _download(self, url, destdir=None, filename=None, chunk_size=65536):
+        """File download helper.
+
+        The body is written to disk chunk by chunk as it arrives, so memory
+        use does not grow with the size of the artifact.
+
+        :param url: The URL to the artifact.
+        :param destdir: The optional destination directory. \
+            Defaults to None (curent working directory).
+        :param filename: Optional file name. Defaults to the name of the artifact file.
+        :param chunk_size: Number of bytes to read at a time.
+        """
+        if not filename:
+            filename = url.split('/')[-1]
+
+        if not destdir:
+            destdir = os.getcwd()
+
+        path = "{0}/{1}".format(destdir, filename)
+
+        async with self._get_session().get(
+                url,
+                params={'circle-token': self.token}) as resp:
+            resp.raise_for_status()
+            with open(path, 'wb') as f:
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    f.write(chunk)
+
+        return path
+
+
+class _ArtifactChunks():
+    """Async iterator over the body of an artifact, for
+    :meth:`AsyncApi.iter_artifact`.
+
+    It is a class rather than an async generator, which would need
+    Python 3.6. The request is sent on the first iteration.
+    """
+
+    def __init__(self, session, url, params, chunk_size):
+        self._session = session
+        self._url = url
+        self._params = params
+        self._chunk_size = chunk_size
+        self._resp = None
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._done:
+            raise StopAsyncIteration
+
+        try:
+            if self._resp is None:
+                self._resp = await self._session.get(self._url, params=self._params)
+                self._resp.raise_for_status()
+
+            chunk = await self._resp.content.read(self._chunk_size)
+        except BaseException:
+            await self.aclose()
+            raise
+
+        if not chunk:
+            await self.aclose()
+            raise StopAsyncIteration
+        return chunk
+
+    async def aclose(self):
+        """Release the connection."""
+        self._done = True
+        if self._resp is not None:
+            self._resp.release()
+
+
+def _basic_auth(token):
+    credentials = '{0}:'.format(token).encode('latin1')
+    return 'Basic {0}'.format(base64.b64encode(credentials).decode('ascii'))
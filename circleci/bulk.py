@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.bulk
+~~~~~~~~~~~~~
+
+    This module provides helpers to run many API calls concurrently on a
+    bounded pool of worker threads.
+
+    .. versionadded:: 2.0.0
+"""
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class BulkResult(namedtuple('BulkResult', ['item', 'result', 'error'])):
+    """The outcome of one call in a bulk operation.
+
+    :param item: The input the call was made for, i.e. a build number.
+    :param result: The value returned by the call, or None if it failed.
+    :param error: The exception raised by the call, or None if it succeeded.
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        """True if the call succeeded."""
+        return self.error is None
+
+
+def _call(func, item):
+    try:
+        return BulkResult(item, func(item), None)
+    except Exception as e:  # pylint: disable=broad-except
+        return BulkResult(item, None, e)
+
+
+def run_bulk(func, items, max_workers=8, ordered=True):
+    """Call ``func`` once for every item on a bounded thread pool.
+
+    Failures are captured per item rather than raised, so one bad item does
+    not fail the whole batch.
+
+    :param func: Callable taking a single item.
+    :param items: Iterable of items.
+    :param max_workers: Maximum number of concurrent calls. Defaults to 8.
+    :param ordered: Yield results in the order of ``items``. If False, \
+        results are yielded as soon as each call completes.
+
+    :type max_workers: int
+    :type ordered: bool
+
+    :returns: A generator of :class:`BulkResult`.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_call, func, item) for item in items]
+
+        try:
+            if ordered:
+                for future in futures:
+                    yield future.result()
+            else:
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            # don't keep working on calls nobody is waiting for
+            for future in futures:
+                future.cancel()
+
+
+def stream_bulk(func, items, max_workers=8, buffer=1024):
+    """Call ``func`` once for every item on a bounded thread pool, where
+    ``func`` returns an iterator, and yield its values as they are produced.
+
+    Values from one item are yielded in order, values from different items
+    are interleaved. At most ``buffer`` values are held waiting for the
+    consumer; workers block until there is room, so memory stays bounded
+    however much each item produces. Closing the generator stops the
+    workers at their next value.
+
+    :param func: Callable taking a single item and returning an iterable.
+    :param items: Iterable of items.
+    :param max_workers: Maximum number of concurrent calls. Defaults to 8.
+    :param buffer: Maximum number of values waiting to be consumed. \
+        Defaults to 1024.
+
+    :type max_workers: int
+    :type buffer: int
+
+    :returns: A generator of :class:`BulkResult`, one per value with the \
+        value as ``result``, and one with ``error`` set for each item that \
+        failed.
+    """
+    results = queue.Queue(maxsize=buffer)
+    stopped = threading.Event()
+    done = object()
+
+    def put(result):
+        while not stopped.is_set():
+            try:
+                results.put(result, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(item):
+        try:
+            for value in func(item):
+                if not put(BulkResult(item, value, None)):
+                    return
+        except Exception as e:  # pylint: disable=broad-except
+            put(BulkResult(item, None, e))
+        finally:
+            put(done)
+
+    items = list(items)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run, item) for item in items]
+        remaining = len(futures)
+
+        try:
+            while remaining:
+                result = results.get()
+                if result is done:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            stopped.set()
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.cache
+~~~~~~~~~~~~~~
+
+    This module provides an in memory cache for responses to ``GET``
+    requests, which can be passed to :class:`circleci.api.Api`.
+
+    Fresh entries are served without touching the network. Once an entry
+    expires it is revalidated with ``If-None-Match`` or
+    ``If-Modified-Since`` when the server sent an ``ETag`` or
+    ``Last-Modified`` header, so an unchanged response costs a bodiless
+    ``304 Not Modified`` rather than a full JSON document.
+
+    .. versionadded:: 2.0.0
+"""
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry():
+    """A cached response.
+
+    :param data: The decoded JSON response.
+    :param etag: The ``ETag`` header of the response, if any.
+    :param last_modified: The ``Last-Modified`` header of the response, if any.
+    :param expires: Monotonic time after which the entry must be revalidated.
+    """
+    __slots__ = ('data', 'etag', 'last_modified', 'expires')
+
+    def __init__(self, data, etag, last_modified, expires):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires = expires
+
+    @property
+    def fresh(self):
+        """True if the entry can be used without revalidating it."""
+        return time.monotonic() < self.expires
+
+    def conditional_headers(self, headers):
+        """Return a copy of ``headers`` with revalidation headers added.
+
+        :param headers: The headers the request would otherwise be sent with.
+        """
+        headers = dict(headers)
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache():
+    """A thread safe LRU cache of API responses.
+
+    .. note::
+        Cached responses are shared between callers, treat them as read only.
+
+    :param maxsize: Maximum number of responses to keep. The least recently \
+        used response is evicted when full. Defaults to 256.
+    :param ttl: Seconds a response is served without revalidating it. \
+        Defaults to 60.
+    :param ttls: Optional per endpoint TTLs, mapping a glob pattern for the \
+        endpoint path (i.e. ``project/*/*/*/envvar``) to seconds. The first \
+        matching pattern wins, otherwise ``ttl`` is used.
+
+    :type maxsize: int
+    :type ttl: float
+    :type ttls: dict
+    """
+
+    def __init__(self, maxsize=256, ttl=60, ttls=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = ttls or {}
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'revalidations': 0,
+            'evictions': 0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl_for(self, endpoint):
+        """Return the TTL in seconds for an endpoint.
+
+        :param endpoint: The api endpoint, with or without a query string.
+        """
+        path = endpoint.split('?', 1)[0]
+        for pattern, ttl in self.ttls.items():
+            if fnmatch.fnmatchcase(path, pattern):
+                return ttl
+        return self.ttl
+
+    def get(self, key):
+        """Look up an entry, fresh or not, and mark it as recently used.
+
+        :param key: The cache key, normally the request URL and a \
+            digest of the token.
+
+        :returns: A :class:`CacheEntry` or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def hit(self, entry):
+        """Record that a fresh entry was served and return its data."""
+        with self._lock:
+            self._stats['hits'] += 1
+        return entry.data
+
+    def revalidated(self, entry, ttl):
+        """Record a ``304 Not Modified`` for an entry and return its data.
+
+        :param entry: The :class:`CacheEntry` that was revalidated.
+        :param ttl: Seconds until the entry must be revalidated again.
+        """
+        with self._lock:
+            self._stats['revalidations'] += 1
+            entry.expires = time.monotonic() + ttl
+        return entry.data
+
+    def set(self, key, data, headers, ttl):
+        """Store a full response, evicting the least recently used entry \
+        if the cache is full.
+
+        :param key: The cache key, normally the request URL and a \
+            digest of the token.
+        :param data: The decoded JSON response.
+        :param headers: The response headers.
+        :param ttl: Seconds the response may be served without revalidating.
+        """
+        entry = CacheEntry(
+            data,
+            headers.get('ETag'),
+            headers.get('Last-Modified'),
+            time.monotonic() + ttl
+        )
+
+        with self._lock:
+            self._stats['misses'] += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, prefix=''):
+        """Drop every entry whose key starts with ``prefix``.
+
+        :param prefix: Key prefix, or a tuple of prefixes. Defaults to \
+            dropping everything.
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def stats(self):
+        """Return a snapshot of the cache statistics.
+
+        :returns: A dict with ``hits``, ``misses``, ``revalidations``, \
+            ``evictions`` and the current ``size``.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        return stats
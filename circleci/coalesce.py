@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.coalesce
+~~~~~~~~~~~~~~~~~
+
+    This module provides single-flight coalescing of ``GET`` requests, which
+    can be passed to :class:`circleci.api.Api`.
+
+    While a ``GET`` is in flight, identical ``GET`` requests made by other
+    threads do not go to the network. They wait for the first one and share
+    its decoded response, or its exception. Unlike a cache nothing is kept
+    once the request is done, so the next request always sees fresh data.
+
+    .. versionadded:: 2.0.0
+"""
+import threading
+from concurrent.futures import Future
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def canonical_url(url):
+    """Return a URL with its query parameters in a canonical order, so that
+    equivalent URLs are coalesced.
+
+    :param url: The full request URL.
+    """
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(parts._replace(query=query))
+
+
+class RequestCoalescer():
+    """Thread safe single-flight table of in flight requests.
+
+    .. note::
+        Coalesced callers share the same response object, treat it as read
+        only. Likewise they all raise the same exception object.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'calls': 0,
+            'flights': 0,
+            'collapsed': 0,
+        }
+
+    def __len__(self):
+        return len(self._flights)
+
+    def do(self, key, func):
+        """Call ``func()``, unless a call for the same key is in flight, in
+        which case wait for that call and return its result instead.
+
+        :param key: The request key, normally the verb, canonical URL and \
+            a digest of the token.
+        :param func: Callable making the request.
+
+        :returns: The result of ``func()``, or of the call in flight.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                self._stats['flights'] += 1
+                flight = self._flights[key] = Future()
+            else:
+                self._stats['collapsed'] += 1
+
+        if not leader:
+            return flight.result()
+
+        # the flight is removed before waiters are woken, so later calls
+        # never get a finished result
+        try:
+            result = func()
+        except BaseException as e:
+            self._land(key)
+            flight.set_exception(e)
+            raise
+
+        self._land(key)
+        flight.set_result(result)
+        return result
+
+    def _land(self, key):
+        with self._lock:
+            del self._flights[key]
+
+    def stats(self):
+        """Return a snapshot of the coalescing statistics.
+
+        :returns: A dict with ``calls``, the number of calls made, \
+            ``flights``, the number of them which went to the network, \
+            ``collapsed``, the number which waited for another call instead, \
+            and the number of requests currently ``in_flight``.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._flights)
+        return stats
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.envvars
+~~~~~~~~~~~~~~~~
+
+    This module provides the diffing used by
+    :meth:`circleci.api.Api.sync_envvars` to work out which environment
+    variables of a project need to change.
+
+    The API never returns the values of environment variables, only a masked
+    form holding their last four characters (i.e. ``xxxx1234``). A variable
+    is treated as up to date when its masked value matches the masked form of
+    the desired value, so a change which keeps the last four characters is
+    not detected. Pass ``force=True`` to :func:`plan` to write every desired
+    variable regardless.
+
+    .. versionadded:: 2.0.0
+"""
+from collections import namedtuple
+
+
+def masked(value):
+    """Return a value the way the API masks it.
+
+    :param value: The plain value of an environment variable.
+    """
+    return 'xxxx' + str(value)[-4:]
+
+
+class EnvvarPlan(namedtuple('EnvvarPlan', ['add', 'update', 'delete', 'unchanged'])):
+    """The changes needed to bring a project's environment variables to a
+    desired state.
+
+    :param add: Dict of variables to create, by name.
+    :param update: Dict of variables whose value changed, by name.
+    :param delete: List of names of variables to delete.
+    :param unchanged: List of names of variables which are up to date.
+    """
+    __slots__ = ()
+
+    @property
+    def changes(self):
+        """Number of API calls needed to apply the plan."""
+        return len(self.add) + len(self.update) + len(self.delete)
+
+
+def plan(current, desired, prune=False, force=False):
+    """Diff a project's environment variables against a desired state.
+
+    :param current: The list returned by \
+        :meth:`circleci.api.Api.list_envvars`.
+    :param desired: Dict of the values wanted, by name.
+    :param prune: Delete variables which are not in ``desired``. \
+        Defaults to False.
+    :param force: Update every variable in ``desired``, even if its masked \
+        value matches. Defaults to False.
+
+    :type desired: dict
+    :type prune: bool
+    :type force: bool
+
+    :returns: An :class:`EnvvarPlan`.
+    """
+    existing = {envvar['name']: envvar.get('value') for envvar in current}
+
+    add = {}
+    update = {}
+    unchanged = []
+
+    for name, value in desired.items():
+        if name not in existing:
+            add[name] = value
+        elif force or existing[name] != masked(value):
+            update[name] = value
+        else:
+            unchanged.append(name)
+
+    delete = []
+    if prune:
+        delete = [name for name in existing if name not in desired]
+
+    return EnvvarPlan(add, update, delete, unchanged)
@@ -62,3 +62,19 @@ class InvalidFilterError(CircleCIException):
             self.message = InvalidFilterError.filter_message
         if filter_type == 'artifacts':
             self.message = InvalidFilterError.artifacts_message
+
+
+class BuildTimeoutError(CircleCIException):
+    """Exception raised when a build does not finish in time
+
+    :param argument: The build number that was being waited on.
+    :param build: The last known state of the build.
+
+    .. versionadded:: 2.0.0
+    """
+    message = "build did not finish before the timeout expired"
+
+    def __init__(self, argument, build=None):
+        super().__init__(argument)
+        self.message = BuildTimeoutError.message
+        self.build = build
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.http2
+~~~~~~~~~~~~~~
+
+    This module provides :class:`HTTP2Transport`, which uses
+    `HTTPX <https://www.python-httpx.org>`_ to speak HTTP/2, so that many
+    concurrent requests to one host, i.e. from
+    :meth:`circleci.api.Api.get_build_infos`, are multiplexed over a single
+    connection instead of one connection each. Install it with
+    ``pip install circleci[http2]`` and select it with::
+
+        from circleci.api import Api
+
+        circleci = Api(token, transport='http2')
+
+    HTTPX, and so this transport, needs Python 3.8 or newer. The module is
+    kept apart from :mod:`circleci.transport`, which works on every Python
+    the package supports, and is only imported when asked for.
+
+    .. versionadded:: 2.0.0
+"""
+import importlib.util
+import json
+import threading
+from collections import namedtuple
+
+from circleci.transport import Transport
+
+_Sent = namedtuple('_Sent', ['body'])
+
+
+class HTTP2Transport(Transport):
+    """A transport using an :class:`httpx.AsyncClient` with HTTP/2 enabled.
+
+    HTTP/2 is negotiated with the server (over TLS, with ALPN), and requests
+    fall back to HTTP/1.1 when the server does not support it, or when the
+    ``h2`` package is not installed. Unsuccessful responses raise
+    :class:`httpx.HTTPStatusError`. Redirects are followed.
+
+    The client runs on an event loop in a thread of its own, which the
+    calling threads hand their requests to, so that streams of a shared
+    connection are always opened in order.
+
+    :param pool_maxsize: Maximum number of connections kept open. With \
+        HTTP/2 a single connection per host is normally enough. Defaults \
+        to 10.
+    :param keep_alive: Keep connections open between requests. \
+        Defaults to True.
+    :param prior_knowledge: Speak HTTP/2 straight away without negotiating \
+        it, for plain ``http://`` servers known to support it. Defaults \
+        to False.
+
+    :type pool_maxsize: int
+    :type keep_alive: bool
+    :type prior_knowledge: bool
+
+    :raises ImportError: when httpx is not installed.
+    """
+
+    def __init__(self, pool_maxsize=10, keep_alive=True, prior_knowledge=False):
+        if importlib.util.find_spec('httpx') is None:
+            raise ImportError(
+                "HTTP2Transport requires httpx, install it with "
+                "'pip install circleci[http2]'"
+            )
+
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.prior_knowledge = prior_knowledge
+
+        self._client = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The :class:`httpx.AsyncClient`, created on first use."""
+        with self._lock:
+            if self._client is None:
+                import asyncio
+
+                import httpx
+
+                try:
+                    import h2  # noqa: F401 pylint: disable=unused-import
+                    http2 = True
+                except ImportError:  # pragma: no cover
+                    http2 = False
+
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name='circleci-http2',
+                    daemon=True
+                )
+                self._thread.start()
+
+                self._client = httpx.AsyncClient(
+                    http1=not (http2 and self.prior_knowledge),
+                    http2=http2,
+                    limits=httpx.Limits(
+                        max_connections=self.pool_maxsize,
+                        max_keepalive_connections=self.pool_maxsize if self.keep_alive else 0
+                    ),
+                    follow_redirects=True
+                )
+        return self._client
+
+    def _run(self, coro):
+        """Run a coroutine on the event loop of the client and wait for it."""
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    @property
+    def connection_errors(self):
+        import httpx
+
+        return (httpx.TransportError,)
+
+    def request(self, verb, url, headers=None, auth=None, json=None, stream=False, timeout=None):
+        client = self.client
+        request = client.build_request(verb, url, headers=headers, json=json, timeout=timeout)
+        resp = self._run(client.send(request, auth=auth, stream=stream))
+        return HTTPXResponse(resp, self._run, request.content)
+
+    def close(self):
+        with self._lock:
+            if self._client is None:
+                return
+            self._run(self._client.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._client = self._loop = self._thread = None
+
+
+class HTTPXResponse():
+    """Adapts an :class:`httpx.Response` of an :class:`httpx.AsyncClient` to
+    the response interface of :class:`Transport`.
+
+    :param resp: The httpx response.
+    :param run: Callable running a coroutine on the loop of the client and \
+        returning its result.
+    :param body: The request body sent, if any.
+    """
+
+    def __init__(self, resp, run, body=None):
+        self.raw = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.http_version = resp.http_version
+        self.request = _Sent(body)
+
+        self._run = run
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        """The whole body, read on first access."""
+        return self._run(self.raw.aread())
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def iter_content(self, chunk_size=1):
+        """Yield the body in chunks as it is read."""
+        chunks = self.raw.aiter_bytes(chunk_size)
+
+        while True:
+            try:
+                yield self._run(_anext(chunks))
+            except StopAsyncIteration:
+                return
+
+    def raise_for_status(self):
+        self.raw.raise_for_status()
+
+    def close(self):
+        self._run(self.raw.aclose())
+
+
+async def _anext(iterator):
+    return await iterator.__anext__()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.logs
+~~~~~~~~~~~~~
+
+    This module provides streaming readers for step logs, as linked from
+    the ``output_url`` of each action of a build.
+
+    A step log is a JSON array of output messages, often served gzip
+    compressed. It is decompressed and parsed incrementally and handed out
+    one line at a time, so a log never has to fit in memory, and lines can
+    be filtered with a regular expression as they are read.
+
+    .. versionadded:: 2.0.0
+"""
+import re
+import zlib
+from collections import namedtuple
+
+from circleci.stream import iter_path
+
+_GZIP_MAGIC = b'\x1f\x8b'
+_NEWLINE = re.compile(r'\r\n|\r|\n')
+
+
+class LogLine(namedtuple('LogLine', ['step', 'index', 'name', 'lineno', 'text'])):
+    """One line of a step log.
+
+    :param step: The step number of the action the line belongs to.
+    :param index: The container index of the action.
+    :param name: The name of the step.
+    :param lineno: The line number within the log, starting at 1.
+    :param text: The line, without its line ending.
+    """
+    __slots__ = ()
+
+
+def gunzip(chunks):
+    """Decompress a stream of chunks if it is gzip compressed.
+
+    Logs served with ``Content-Encoding: gzip`` are already decompressed by
+    :mod:`requests`, but some are stored compressed without saying so. Those
+    are recognised by their first bytes.
+
+    :param chunks: Iterable of ``bytes`` chunks.
+
+    :returns: A generator of decompressed ``bytes`` chunks.
+    """
+    chunks = iter(chunks)
+    first = b''
+
+    for chunk in chunks:
+        first += chunk
+        if len(first) >= 2:
+            break
+
+    if not first.startswith(_GZIP_MAGIC):
+        if first:
+            yield first
+        yield from chunks
+        return
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    yield decompressor.decompress(first)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    yield decompressor.flush()
+
+
+def iter_log_lines(chunks, pattern=None):
+    """Yield the lines of a step log.
+
+    :param chunks: Iterable of ``bytes`` chunks of the log, compressed or not.
+    :param pattern: Optional regular expression, as a string or compiled. \
+        Only lines in which it is found are yielded.
+
+    :returns: A generator of ``(lineno, text)`` tuples.
+    """
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern)
+    search = pattern.search if pattern is not None else None
+
+    lineno = 0
+    partial = ''
+
+    for message in iter_path(gunzip(chunks), ('*', 'message')):
+        if not message:
+            continue
+
+        lines = _NEWLINE.split(partial + message)
+        # a message may stop part way through a line
+        partial = lines.pop()
+
+        for line in lines:
+            lineno += 1
+            if search is None or search(line):
+                yield lineno, line
+
+    if partial:
+        lineno += 1
+        if search is None or search(partial):
+            yield lineno, partial
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.metrics
+~~~~~~~~~~~~~~~~
+
+    This module provides request instrumentation which can be passed to
+    :class:`circleci.api.Api`.
+
+    Every request made through the API object is recorded under its verb and
+    endpoint template (i.e. ``GET project/:vcs-type/:username/:project/:build_num``),
+    with counters for requests, errors, retries and bytes transferred, and
+    latency histograms which split time spent on the network from time spent
+    decoding JSON. Hooks can be registered to see each request as it starts
+    and finishes.
+
+    .. versionadded:: 2.0.0
+"""
+import bisect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Default histogram bucket upper bounds, in seconds."""
+
+_PROJECT_SUBPATHS = {
+    'tree': ':branch',
+    'checkout-key': ':fingerprint',
+    'envvar': ':name',
+}
+
+
+def endpoint_template(endpoint):
+    """Turn a concrete api endpoint into its template.
+
+    :param endpoint: An api endpoint, i.e. ``project/github/levlaz/circleci.py/12``.
+
+    :returns: The template, i.e. ``project/:vcs-type/:username/:project/:build_num``.
+    """
+    segments = endpoint.split('?', 1)[0].split('/')
+
+    if segments[0] != 'project' or len(segments) < 4:
+        return '/'.join(segments)
+
+    template = ['project', ':vcs-type', ':username', ':project']
+    rest = segments[4:]
+
+    if rest and rest[0].isdigit():
+        template.append(':build_num')
+        rest = rest[1:]
+
+    if rest and rest[0] in _PROJECT_SUBPATHS:
+        template.append(rest[0])
+        if len(rest) > 1:
+            template.append(_PROJECT_SUBPATHS[rest[0]])
+        rest = []
+
+    return '/'.join(template + rest)
+
+
+class Histogram():
+    """A fixed bucket histogram.
+
+    :param buckets: Sorted bucket upper bounds. Values above the last bound \
+        are counted in an overflow bucket.
+    """
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """Return the histogram as a dict of plain values."""
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+
+class RequestEvent():
+    """What is known about one request, passed to hooks.
+
+    Request hooks see the event before it is sent, response hooks see it
+    once it has finished, successfully or not.
+    """
+    __slots__ = (
+        'verb',
+        'endpoint',
+        'template',
+        'started',
+        'status',
+        'bytes_in',
+        'bytes_out',
+        'retries',
+        'network_seconds',
+        'decode_seconds',
+        'error',
+    )
+
+    def __init__(self, verb, endpoint, template):
+        self.verb = verb
+        self.endpoint = endpoint
+        self.template = template
+        self.started = time.perf_counter()
+        self.status = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.retries = 0
+        self.network_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.error = None
+
+
+class Metrics():
+    """Thread safe request counters and latency histograms.
+
+    :param buckets: Histogram bucket upper bounds in seconds. Defaults to \
+        :data:`DEFAULT_BUCKETS`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.request_hooks = []
+        self.response_hooks = []
+
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def add_request_hook(self, hook):
+        """Call ``hook(event)`` before every request is sent.
+
+        :param hook: Callable taking a :class:`RequestEvent`.
+        """
+        self.request_hooks.append(hook)
+
+    def add_response_hook(self, hook):
+        """Call ``hook(event)`` after every request has finished.
+
+        :param hook: Callable taking a :class:`RequestEvent`.
+        """
+        self.response_hooks.append(hook)
+
+    def start(self, verb, endpoint, template=None):
+        """Begin recording a request.
+
+        :param verb: The HTTP verb.
+        :param endpoint: The api endpoint.
+        :param template: The endpoint template. Defaults to the result of \
+            :func:`endpoint_template`.
+
+        :returns: A :class:`RequestEvent` to fill in and pass to :meth:`finish`.
+        """
+        if template is None:
+            template = endpoint_template(endpoint)
+
+        event = RequestEvent(verb, endpoint, template)
+
+        for hook in self.request_hooks:
+            hook(event)
+
+        return event
+
+    def finish(self, event):
+        """Record a finished request and call the response hooks.
+
+        :param event: The :class:`RequestEvent` returned by :meth:`start`.
+        """
+        key = '{0} {1}'.format(event.verb, event.template)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'retries': 0,
+                    'bytes_in': 0,
+                    'bytes_out': 0,
+                    'status': {},
+                    'network_seconds': Histogram(self.buckets),
+                    'decode_seconds': Histogram(self.buckets),
+                }
+
+            series['requests'] += 1
+            series['retries'] += event.retries
+            series['bytes_in'] += event.bytes_in
+            series['bytes_out'] += event.bytes_out
+            series['network_seconds'].observe(event.network_seconds)
+            series['decode_seconds'].observe(event.decode_seconds)
+
+            if event.error is not None or (event.status or 0) >= 400:
+                series['errors'] += 1
+            if event.status is not None:
+                series['status'][event.status] = series['status'].get(event.status, 0) + 1
+
+        for hook in self.response_hooks:
+            hook(event)
+
+    def snapshot(self):
+        """Return all recorded numbers as plain, JSON serializable values.
+
+        :returns: A dict keyed by ``"<verb> <template>"``.
+        """
+        with self._lock:
+            return {
+                key: {
+                    name: (value.snapshot() if isinstance(value, Histogram) else
+                           dict(value) if isinstance(value, dict) else value)
+                    for name, value in series.items()
+                }
+                for key, series in self._series.items()
+            }
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._series = {}
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.models
+~~~~~~~~~~~~~~~
+
+    This module provides compact, read only models for API responses, for
+    when many of them are kept in memory at once.
+
+    ::
+
+        from circleci.models import BuildSummary
+
+        builds = [
+            BuildSummary.from_dict(build)
+            for build in circleci.iter_project_builds('levlaz', 'circleci.py')
+        ]
+
+    .. versionadded:: 2.0.0
+"""
+import json
+import sys
+
+
+class BuildSummary():
+    """A build summary holding only its commonly used fields.
+
+    Commonly used fields are stored in ``__slots__``. Every other field of
+    the API response is kept as compact JSON and only decoded when it is
+    asked for, through :meth:`get`, item access or :attr:`raw`. Item access
+    works for both kinds of field, so a ``BuildSummary`` can stand in for the
+    dict it was made from in most read only code.
+
+    Repeated strings such as ``status`` and ``branch`` are interned, so they
+    are shared between builds.
+    """
+    __slots__ = (
+        'build_num',
+        'username',
+        'reponame',
+        'status',
+        'outcome',
+        'lifecycle',
+        'branch',
+        'vcs_revision',
+        'queued_at',
+        'start_time',
+        'stop_time',
+        'build_time_millis',
+        'workflow_id',
+        'workflow_name',
+        'job_name',
+        '_extra',
+    )
+
+    _fields = __slots__[:-4]
+    _interned = frozenset(['username', 'reponame', 'status', 'outcome', 'lifecycle', 'branch'])
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, build, keep_extra=True):
+        """Make a summary from a build as returned by the API.
+
+        :param build: A build or build summary.
+        :param keep_extra: Keep the remaining fields so they can be decoded \
+            later. Defaults to True.
+
+        :type build: dict
+        :type keep_extra: bool
+        """
+        self = cls.__new__(cls)
+
+        for name in cls._fields:
+            value = build.get(name)
+            if value is not None and name in cls._interned:
+                value = sys.intern(value)
+            setattr(self, name, value)
+
+        workflows = build.get('workflows') or {}
+        self.workflow_id = workflows.get('workflow_id')
+        self.workflow_name = workflows.get('workflow_name')
+        self.job_name = workflows.get('job_name')
+
+        self._extra = None
+        if keep_extra:
+            extra = {k: v for k, v in build.items() if k not in cls._fields}
+            if extra:
+                self._extra = json.dumps(extra, separators=(',', ':')).encode('utf-8')
+
+        return self
+
+    @property
+    def raw(self):
+        """The full build as a dict, decoded on every access."""
+        build = json.loads(self._extra.decode('utf-8')) if self._extra else {}
+        for name in self._fields:
+            build[name] = getattr(self, name)
+        return build
+
+    def get(self, key, default=None):
+        """Return a field, like :meth:`dict.get`."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+
+        if self._extra:
+            extra = json.loads(self._extra.decode('utf-8'))
+            if key in extra:
+                return extra[key]
+
+        raise KeyError(key)
+
+    def __eq__(self, other):
+        if not isinstance(other, BuildSummary):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __hash__(self):
+        return hash((self.username, self.reponame, self.build_num))
+
+    def __repr__(self):
+        return '<BuildSummary {0}/{1} #{2} {3}>'.format(
+            self.username,
+            self.reponame,
+            self.build_num,
+            self.status
+        )
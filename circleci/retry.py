@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.retry
+~~~~~~~~~~~~~~
+
+    This module provides a retry policy and a client side rate limiter, both
+    of which can be passed to :class:`circleci.api.Api`.
+
+    .. versionadded:: 2.0.0
+"""
+import email.utils
+import random
+import threading
+import time
+
+
+class Retry():
+    """Retry policy with exponential backoff and jitter.
+
+    Only requests using one of ``methods`` are retried, since retrying a
+    request that is not idempotent may repeat its side effects. A request is
+    retried when it fails to connect, times out, or gets one of the status
+    codes in ``status_forcelist``.
+
+    :param total: Maximum number of retries. Defaults to 5.
+    :param backoff_factor: Base delay in seconds. The delay before retry \
+        ``n`` is drawn uniformly from ``[0, backoff_factor * 2 ** n]``. \
+        Defaults to 0.5.
+    :param max_backoff: Upper bound on a single delay. Defaults to 30.
+    :param deadline: Optional total number of seconds to keep retrying for, \
+        measured from the first attempt. Defaults to no deadline.
+    :param status_forcelist: Status codes which are retried. Defaults to \
+        429, 500, 502, 503 and 504.
+    :param methods: HTTP verbs which are retried. Defaults to GET and DELETE.
+    :param respect_retry_after: Wait as long as the server asks for in a \
+        ``Retry-After`` header. Defaults to True.
+    :param max_retry_after: Upper bound on a delay asked for in a \
+        ``Retry-After`` header. Defaults to 120.
+
+    :type total: int
+    :type backoff_factor: float
+    :type max_backoff: float
+    :type deadline: float
+    :type max_retry_after: float
+    """
+
+    def __init__(
+            self,
+            total=5,
+            backoff_factor=0.5,
+            max_backoff=30,
+            deadline=None,
+            status_forcelist=(429, 500, 502, 503, 504),
+            methods=('GET', 'DELETE'),
+            respect_retry_after=True,
+            max_retry_after=120):
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.status_forcelist = frozenset(status_forcelist)
+        self.methods = frozenset(methods)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, retries):
+        """Return a jittered exponential delay for a retry.
+
+        :param retries: Number of retries made so far.
+        """
+        ceiling = min(self.max_backoff, self.backoff_factor * (2 ** retries))
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def parse_retry_after(value):
+        """Parse a ``Retry-After`` header.
+
+        :param value: Either a number of seconds or an HTTP date.
+
+        :returns: Seconds to wait, or None if the value cannot be parsed.
+        """
+        if value is None:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if when is None:
+            return None
+
+        return max(0.0, when.timestamp() - time.time())
+
+    def next_delay(self, verb, retries, elapsed, status_code=None, headers=None):
+        """Decide whether and when a failed request should be retried.
+
+        :param verb: The HTTP verb of the request.
+        :param retries: Number of retries made so far.
+        :param elapsed: Seconds since the first attempt.
+        :param status_code: Status code of the response, or None if the \
+            request failed without one.
+        :param headers: Headers of the response, if any.
+
+        :returns: Seconds to wait before retrying, or None to give up.
+        """
+        if verb not in self.methods or retries >= self.total:
+            return None
+
+        if status_code is not None and status_code not in self.status_forcelist:
+            return None
+
+        delay = None
+        if self.respect_retry_after and headers:
+            delay = self.parse_retry_after(headers.get('Retry-After'))
+            if delay is not None:
+                delay = min(delay, self.max_retry_after)
+        if delay is None:
+            delay = self.backoff(retries)
+
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return None
+
+        return delay
+
+
+class RateLimiter():
+    """Thread safe token bucket rate limiter.
+
+    Every request takes one token. Tokens are added at ``rate`` per second up
+    to ``burst``; a request which finds the bucket empty waits for its token.
+    Share one limiter between :class:`circleci.api.Api` objects to enforce a
+    single limit across all of them.
+
+    :param rate: Sustained requests per second.
+    :param burst: Maximum number of requests which may be made at once \
+        after a quiet period. Defaults to ``rate``, but at least 1.
+
+    :type rate: float
+    :type burst: int
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1, int(rate))
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available.
+
+        :returns: The number of seconds spent waiting.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            # reserve the token now, even if it only becomes available
+            # later, so that waiting threads are served in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+
+        return wait
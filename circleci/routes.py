@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.routes
+~~~~~~~~~~~~~~~
+
+    This module provides the table of API endpoints which
+    :class:`circleci.api.Api` and :class:`circleci.async_api.AsyncApi` build
+    their requests from.
+
+    Each :class:`Route` is compiled once, when this module is imported.
+    Path parameters are percent-encoded, so branch names such as
+    ``feature/foo`` stay a single path segment, and query parameters which
+    are None are left out. The same arguments always give the same endpoint,
+    so endpoints can be used as cache keys.
+
+    ::
+
+        >>> ROUTES['get_project_build_summary'].endpoint(
+        ...     vcs_type='github', username='levlaz', project='circleci.py',
+        ...     limit=30, offset=0, filter=None)
+        'project/github/levlaz/circleci.py?limit=30&offset=0'
+
+    .. versionadded:: 2.0.0
+"""
+import functools
+from urllib.parse import quote, urlencode
+
+
+@functools.lru_cache(maxsize=1024)
+def _quote(value):
+    """Percent-encode one path parameter, including any ``/``."""
+    return quote(str(value), safe='')
+
+
+class Route():
+    """One API endpoint.
+
+    :param verb: The HTTP verb.
+    :param template: The endpoint relative to the API url, with path \
+        parameters written as ``:name``, i.e. \
+        ``project/:vcs-type/:username/:project``. A ``-`` in a parameter \
+        name is passed as ``_``, so ``:vcs-type`` is filled from ``vcs_type``.
+    :param query: Names of the query parameters the endpoint takes, in the \
+        order they are sent.
+
+    :type query: tuple
+    """
+    __slots__ = ('verb', 'template', 'query', '_format', '_names')
+
+    def __init__(self, verb, template, query=()):
+        self.verb = verb
+        self.template = template
+        self.query = tuple(query)
+
+        parts = []
+        names = []
+        for segment in template.split('/'):
+            if segment.startswith(':'):
+                parts.append('{' + str(len(names)) + '}')
+                names.append(segment[1:].replace('-', '_'))
+            else:
+                parts.append(segment.replace('{', '{{').replace('}', '}}'))
+
+        self._format = '/'.join(parts)
+        self._names = tuple(names)
+
+    def endpoint(self, **params):
+        """Build the endpoint for a request.
+
+        :param params: Path and query parameters by name.
+
+        :raises TypeError: when a path parameter is missing.
+
+        :returns: The endpoint relative to the API url, with its query string.
+        """
+        try:
+            path = self._format.format(*[_quote(params[name]) for name in self._names])
+        except KeyError as e:
+            raise TypeError('{0} is missing path parameter {1}'.format(self.template, e))
+
+        query = [
+            (name, params[name]) for name in self.query
+            if params.get(name) is not None
+        ]
+        if query:
+            path += '?' + urlencode(query)
+
+        return path
+
+    def __repr__(self):
+        return '<Route {0} {1}>'.format(self.verb, self.template)
+
+
+_PROJECT = 'project/:vcs-type/:username/:project'
+_BUILD = _PROJECT + '/:build_num'
+
+ROUTES = {
+    'get_user_info': Route('GET', 'me'),
+    'get_projects': Route('GET', 'projects'),
+    'follow_project': Route('POST', _PROJECT + '/follow'),
+    'get_project_build_summary': Route('GET', _PROJECT, ('limit', 'offset', 'filter')),
+    'get_branch_build_summary': Route(
+        'GET',
+        _PROJECT + '/tree/:branch',
+        ('limit', 'offset', 'filter')
+    ),
+    'get_recent_builds': Route('GET', 'recent-builds', ('limit', 'offset')),
+    'get_build_info': Route('GET', _BUILD),
+    'get_artifacts': Route('GET', _BUILD + '/artifacts'),
+    'get_latest_artifact': Route('GET', _PROJECT + '/latest/artifacts', ('branch', 'filter')),
+    'retry_build': Route('POST', _BUILD + '/retry'),
+    'retry_build_ssh': Route('POST', _BUILD + '/ssh'),
+    'cancel_build': Route('POST', _BUILD + '/cancel'),
+    'add_ssh_user': Route('POST', _BUILD + '/ssh-users'),
+    'trigger_build': Route('POST', _PROJECT + '/tree/:branch'),
+    'add_ssh_key': Route('POST', _PROJECT + '/ssh-key'),
+    'list_checkout_keys': Route('GET', _PROJECT + '/checkout-key'),
+    'create_checkout_key': Route('POST', _PROJECT + '/checkout-key'),
+    'get_checkout_key': Route('GET', _PROJECT + '/checkout-key/:fingerprint'),
+    'delete_checkout_key': Route('DELETE', _PROJECT + '/checkout-key/:fingerprint'),
+    'get_test_metadata': Route('GET', _BUILD + '/tests'),
+    'list_envvars': Route('GET', _PROJECT + '/envvar'),
+    'add_envvar': Route('POST', _PROJECT + '/envvar'),
+    'get_envvar': Route('GET', _PROJECT + '/envvar/:name'),
+    'delete_envvar': Route('DELETE', _PROJECT + '/envvar/:name'),
+}
+"""Every endpoint used by this library, by name."""
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.stats
+~~~~~~~~~~~~~~
+
+    This module provides build and queue time statistics over build
+    histories.
+
+    Build summaries are loaded into columns (timestamps, a status code and
+    interned branch, job and workflow names), so a history can be added to
+    page by page, straight from the pagination iterators, without keeping
+    the summaries around::
+
+        from circleci.stats import BuildHistory
+
+        history = BuildHistory()
+        history.extend(circleci.iter_project_builds('levlaz', 'circleci.py', max_builds=5000))
+
+        history.percentiles('build', by='branch', statuses=['success'])
+        history.rolling('queue', window=50, by='job')
+        history.trend('build', by='workflow')
+
+    Queries are vectorized with NumPy when it is installed, like
+    :mod:`circleci.analytics`, and computed in plain Python otherwise.
+
+    .. versionadded:: 2.0.0
+"""
+import math
+from array import array
+
+from circleci import analytics
+from circleci.analytics import SymbolTable, percentile
+from circleci.watcher import parse_time
+
+# grouping column and symbol table of each ``by``
+_GROUPS = {
+    'branch': ('branch', 'branches'),
+    'job': ('job', 'jobs'),
+    'workflow': ('workflow', 'workflows'),
+}
+
+
+class BuildHistory():
+    """Timings of many builds, stored as columns.
+
+    Adding a build which is already in the history (i.e. a build that was
+    still running the last time it was added) replaces it.
+    """
+
+    def __init__(self):
+        self.statuses = SymbolTable()
+        self.branches = SymbolTable()
+        self.jobs = SymbolTable()
+        self.workflows = SymbolTable()
+
+        self.build_nums = array('l')
+        self.queued_at = array('d')
+        self.start_time = array('d')
+        self.stop_time = array('d')
+        self.status = array('l')
+        self.branch = array('l')
+        self.job = array('l')
+        self.workflow = array('l')
+
+        self._rows = {}
+
+    def __len__(self):
+        return len(self.build_nums)
+
+    def add(self, build):
+        """Add one build or build summary.
+
+        :param build: A build or build summary as returned by the API.
+        """
+        workflows = build.get('workflows') or {}
+        row = (
+            build['build_num'],
+            _timestamp(build.get('queued_at') or build.get('usage_queued_at')),
+            _timestamp(build.get('start_time')),
+            _timestamp(build.get('stop_time')),
+            self.statuses.symbol(build.get('status') or ''),
+            self.branches.symbol(build.get('branch') or ''),
+            self.jobs.symbol(workflows.get('job_name') or ''),
+            self.workflows.symbol(workflows.get('workflow_name') or ''),
+        )
+        columns = (
+            self.build_nums,
+            self.queued_at,
+            self.start_time,
+            self.stop_time,
+            self.status,
+            self.branch,
+            self.job,
+            self.workflow,
+        )
+
+        key = (build.get('username'), build.get('reponame'), build['build_num'])
+        index = self._rows.get(key)
+
+        if index is None:
+            self._rows[key] = len(self.build_nums)
+            for column, value in zip(columns, row):
+                column.append(value)
+        else:
+            for column, value in zip(columns, row):
+                column[index] = value
+
+    def extend(self, builds):
+        """Add many builds, i.e. a page or a pagination iterator.
+
+        :param builds: Iterable of builds or build summaries.
+        """
+        for build in builds:
+            self.add(build)
+
+    def _select(self, metric, by, statuses):
+        """Return ``{group: (build_nums, values)}`` in build order."""
+        if metric == 'build':
+            begin, end = self.start_time, self.stop_time
+        elif metric == 'queue':
+            begin, end = self.queued_at, self.start_time
+        else:
+            raise ValueError('metric must be build or queue, not {0!r}'.format(metric))
+
+        if by is None:
+            groups, names = None, None
+        elif by in _GROUPS:
+            column, table = _GROUPS[by]
+            groups, names = getattr(self, column), getattr(self, table)
+        else:
+            raise ValueError('by must be branch, job or workflow, not {0!r}'.format(by))
+
+        wanted = None
+        if statuses is not None:
+            # statuses never seen match nothing, and are not added
+            wanted = set(self.statuses.get(s) for s in statuses) - {None}
+
+        if analytics.numpy is not None:
+            return self._select_numpy(begin, end, groups, names, wanted)
+        return self._select_python(begin, end, groups, names, wanted)
+
+    def _select_numpy(self, begin, end, groups, names, wanted):
+        numpy = analytics.numpy
+
+        def column(values):
+            return numpy.frombuffer(values, dtype=values.typecode)
+
+        build_nums = column(self.build_nums)
+        values = column(end) - column(begin)
+        keep = ~numpy.isnan(values)
+        if wanted is not None:
+            keep &= numpy.isin(column(self.status), list(wanted))
+
+        build_nums = build_nums[keep]
+        values = values[keep]
+
+        if not len(build_nums):
+            return {}
+
+        if groups is None:
+            order = numpy.argsort(build_nums, kind='stable')
+            return {None: (build_nums[order], values[order])}
+
+        group_ids = column(groups)[keep]
+        order = numpy.lexsort((build_nums, group_ids))
+        group_ids = group_ids[order]
+        splits = numpy.flatnonzero(numpy.diff(group_ids)) + 1
+
+        return {
+            names[int(ids[0])]: (nums, vals)
+            for ids, nums, vals in zip(
+                numpy.split(group_ids, splits),
+                numpy.split(build_nums[order], splits),
+                numpy.split(values[order], splits))
+            if len(ids)
+        }
+
+    def _select_python(self, begin, end, groups, names, wanted):
+        selected = {}
+
+        for i, build_num in enumerate(self.build_nums):
+            value = end[i] - begin[i]
+            if math.isnan(value) or (wanted is not None and self.status[i] not in wanted):
+                continue
+            group = None if groups is None else names[groups[i]]
+            selected.setdefault(group, []).append((build_num, value))
+
+        result = {}
+        for group, rows in selected.items():
+            rows.sort(key=lambda row: row[0])
+            result[group] = ([row[0] for row in rows], [row[1] for row in rows])
+        return result
+
+    def percentiles(self, metric='build', q=(50, 95), by=None, statuses=None):
+        """Duration percentiles.
+
+        :param metric: ``build`` for time from start to stop, or ``queue`` \
+            for time from queued to start. Defaults to ``build``.
+        :param q: Percentiles to compute, between 0 and 100. Defaults to \
+            ``(50, 95)``.
+        :param by: Optional grouping, ``branch``, ``job`` or ``workflow``.
+        :param statuses: Optional statuses of the builds to include, \
+            i.e. ``['success', 'fixed']``. Defaults to any status.
+
+        :returns: A dict by group (None without ``by``) of dicts holding \
+            ``count`` and each percentile as ``p<q>``, in seconds.
+        """
+        result = {}
+
+        for group, (_, values) in self._select(metric, by, statuses).items():
+            if analytics.numpy is not None:
+                found = analytics.numpy.percentile(values, q).tolist()
+            else:
+                ordered = sorted(values)
+                found = [percentile(ordered, p / 100.0) for p in q]
+
+            result[group] = dict(
+                [('count', len(values))] +
+                [('p{0}'.format(p), v) for p, v in zip(q, found)]
+            )
+
+        return result
+
+    def rolling(self, metric='build', window=20, q=50, by=None, statuses=None):
+        """A percentile over a moving window of builds, in build order.
+
+        Takes the same arguments as :meth:`percentiles`, except for:
+
+        :param window: Number of builds in the window. Defaults to 20.
+        :param q: The percentile to compute. Defaults to 50.
+
+        :type window: int
+
+        :returns: A dict by group of lists of ``(build_num, value)``, with \
+            one entry per build which completes a window.
+        """
+        result = {}
+
+        for group, (build_nums, values) in self._select(metric, by, statuses).items():
+            if len(values) < window:
+                result[group] = []
+                continue
+
+            if analytics.numpy is not None:
+                numpy = analytics.numpy
+                windows = numpy.lib.stride_tricks.sliding_window_view(values, window)
+                found = numpy.percentile(windows, q, axis=1).tolist()
+            else:
+                found = [
+                    percentile(sorted(values[i - window:i]), q / 100.0)
+                    for i in range(window, len(values) + 1)
+                ]
+
+            result[group] = list(zip([int(n) for n in build_nums[window - 1:]], found))
+
+        return result
+
+    def trend(self, metric='build', by=None, statuses=None, last=None):
+        """How durations are changing, as the least squares slope of duration
+        against build order.
+
+        Takes the same arguments as :meth:`percentiles`, except for:
+
+        :param last: Optional number of most recent builds per group to \
+            look at.
+
+        :type last: int
+
+        :returns: A dict by group of dicts holding ``count``, ``mean`` \
+            and ``slope``, the change in seconds per build. The slope is \
+            None for groups of fewer than two builds.
+        """
+        result = {}
+
+        for group, (_, values) in self._select(metric, by, statuses).items():
+            if last is not None:
+                values = values[-last:]
+
+            count = len(values)
+            if analytics.numpy is not None:
+                numpy = analytics.numpy
+                mean = float(numpy.mean(values))
+                x = numpy.arange(count) - (count - 1) / 2.0
+                denominator = float(numpy.dot(x, x))
+                slope = float(numpy.dot(x, values - mean)) / denominator if count > 1 else None
+            else:
+                mean = sum(values) / count
+                x = [i - (count - 1) / 2.0 for i in range(count)]
+                denominator = sum(v * v for v in x)
+                slope = sum(a * (b - mean) for a, b in zip(x, values)) / denominator \
+                    if count > 1 else None
+
+            result[group] = {'count': count, 'mean': mean, 'slope': slope}
+
+        return result
+
+
+def _timestamp(value):
+    """An API timestamp as a POSIX timestamp, or NaN."""
+    parsed = parse_time(value)
+    return float('nan') if parsed is None else parsed
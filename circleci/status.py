@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.status
+~~~~~~~~~~~~~~~
+
+    This module tells finished builds from those that may still change.
+
+    .. versionadded:: 2.0.0
+"""
+
+TERMINAL_STATUSES = frozenset([
+    'success',
+    'fixed',
+    'failed',
+    'canceled',
+    'infrastructure_fail',
+    'timedout',
+    'not_run',
+    'no_tests',
+    'retried',
+])
+"""Build statuses after which a build never changes."""
+
+
+def is_terminal(build):
+    """Return True if a build has finished and will never change.
+
+    :param build: A build or build summary as returned by the API.
+
+    :type build: dict
+    """
+    return build.get('status') in TERMINAL_STATUSES
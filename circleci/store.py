@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.store
+~~~~~~~~~~~~~~
+
+    This module provides a persistent, SQLite backed store for builds that
+    have finished, which can be passed to :class:`circleci.api.Api`.
+
+    A build that has reached a terminal status never changes again, so once
+    its details are stored they are served locally forever instead of being
+    downloaded again. The database runs in WAL mode so that several processes
+    can share one store file.
+
+    .. versionadded:: 2.0.0
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from circleci.status import TERMINAL_STATUSES, is_terminal  # noqa: F401 pylint: disable=unused-import
+
+
+class BuildStore():
+    """A SQLite store of finished builds, keyed by \
+    ``(vcs_type, username, project, build_num)``.
+
+    Each thread uses its own connection, so one store may be shared by an
+    :class:`circleci.api.Api` object used from several threads.
+
+    :param path: Path to the database file. It is created if missing.
+    :param timeout: Seconds to wait for another process to release a lock. \
+        Defaults to 30.
+
+    :type timeout: float
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS builds (
+            vcs_type TEXT NOT NULL,
+            username TEXT NOT NULL,
+            project TEXT NOT NULL,
+            build_num INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (vcs_type, username, project, build_num, kind)
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        self._connect().execute(self._schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _connect(self):
+        """Return this thread's connection, opening it if needed."""
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+
+        return conn
+
+    def close(self):
+        """Close this thread's connection to the database."""
+        conn = getattr(self._local, 'conn', None)
+
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get(self, kind, vcs_type, username, project, build_num):
+        """Look up a stored payload.
+
+        :param kind: What was stored, i.e. ``build`` or ``tests``.
+        :param vcs_type: The vcs type of the project.
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+
+        :returns: The decoded payload, or None if it is not stored.
+        """
+        key = (vcs_type, username, project, int(build_num), kind)
+        conn = self._connect()
+
+        row = conn.execute(
+            'SELECT payload FROM builds WHERE vcs_type = ? AND username = ? '
+            'AND project = ? AND build_num = ? AND kind = ?',
+            key
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        conn.execute(
+            'UPDATE builds SET accessed_at = ? WHERE vcs_type = ? AND '
+            'username = ? AND project = ? AND build_num = ? AND kind = ?',
+            (time.time(),) + key
+        )
+
+        return json.loads(row[0])
+
+    def put(self, kind, vcs_type, username, project, build_num, payload):
+        """Store a payload, replacing any previous one.
+
+        :param kind: What is stored, i.e. ``build`` or ``tests``.
+        :param vcs_type: The vcs type of the project.
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param payload: The decoded API response.
+        """
+        self._connect().execute(
+            'INSERT OR REPLACE INTO builds VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                vcs_type,
+                username,
+                project,
+                int(build_num),
+                kind,
+                json.dumps(payload, separators=(',', ':')),
+                time.time(),
+            )
+        )
+
+    def __contains__(self, key):
+        """Check for a payload with ``(kind, vcs_type, username, project, \
+        build_num)`` without marking it as accessed."""
+        kind, vcs_type, username, project, build_num = key
+
+        row = self._connect().execute(
+            'SELECT 1 FROM builds WHERE vcs_type = ? AND username = ? '
+            'AND project = ? AND build_num = ? AND kind = ?',
+            (vcs_type, username, project, int(build_num), kind)
+        ).fetchone()
+
+        return row is not None
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM builds').fetchone()[0]
+
+    def compact(self, max_entries=None, max_age=None):
+        """Evict old payloads and reclaim disk space.
+
+        :param max_entries: Keep at most this many payloads, evicting the \
+            least recently accessed first.
+        :param max_age: Evict payloads which have not been accessed for this \
+            many seconds.
+
+        :type max_entries: int
+        :type max_age: float
+
+        :returns: The number of payloads evicted.
+        """
+        conn = self._connect()
+        evicted = 0
+
+        if max_age is not None:
+            evicted += conn.execute(
+                'DELETE FROM builds WHERE accessed_at < ?',
+                (time.time() - max_age,)
+            ).rowcount
+
+        if max_entries is not None:
+            evicted += conn.execute(
+                'DELETE FROM builds WHERE (vcs_type, username, project, '
+                'build_num, kind) IN (SELECT vcs_type, username, project, '
+                'build_num, kind FROM builds ORDER BY accessed_at DESC '
+                'LIMIT -1 OFFSET ?)',
+                (max_entries,)
+            ).rowcount
+
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.execute('VACUUM')
+
+        return evicted
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.stream
+~~~~~~~~~~~~~~~
+
+    This module provides an incremental JSON reader for large API responses.
+
+    The response body is read chunk by chunk. Parts of the document which
+    are not needed are skipped without being decoded, and the parts which
+    are needed are decoded one element at a time, so peak memory is bounded
+    by the largest element rather than by the whole document.
+
+    .. versionadded:: 2.0.0
+"""
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r'\s*')
+_SPECIAL = re.compile(r'[\[\]{}"]')
+_STRING_END = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR_END = re.compile(r'[,\]}\s]')
+_DECODER = json.JSONDecoder()
+
+
+class JSONStream():
+    """A pull based reader over a JSON document arriving in chunks.
+
+    :param chunks: Iterable of ``bytes`` chunks, i.e. \
+        :meth:`requests.Response.iter_content`.
+    :param encoding: Encoding of the document. Defaults to utf-8.
+    """
+
+    def __init__(self, chunks, encoding='utf-8'):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buf = ''
+        self._pos = 0
+        self._mark = None
+        self._eof = False
+
+    def _fill(self):
+        """Read the next chunk into the buffer.
+
+        Text before the read position (or the mark, while a value is being
+        captured) is dropped.
+
+        :returns: False at the end of the document.
+        """
+        text = ''
+
+        while not text and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                text = self._decoder.decode(b'', True)
+                self._eof = True
+            else:
+                text = self._decoder.decode(chunk)
+
+        if not text:
+            return False
+
+        start = self._pos if self._mark is None else self._mark
+        self._buf = self._buf[start:] + text
+        self._pos -= start
+        if self._mark is not None:
+            self._mark = 0
+
+        return True
+
+    def _error(self, expected):
+        return ValueError('expected {0} at {1!r}'.format(
+            expected,
+            self._buf[self._pos:self._pos + 20]
+        ))
+
+    def peek(self):
+        """Skip whitespace and return the next character.
+
+        :returns: The next character, or an empty string at the end of \
+            the document.
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _skip_string(self):
+        self._pos += 1
+
+        while True:
+            match = _STRING_END.match(self._buf, self._pos)
+            if match:
+                self._pos = match.end()
+                return
+            if not self._fill():
+                raise self._error('end of string')
+
+    def skip_value(self):
+        """Skip over the next value without decoding it."""
+        char = self.peek()
+
+        if char == '"':
+            self._skip_string()
+        elif char in ('[', '{'):
+            depth = 0
+            while True:
+                match = _SPECIAL.search(self._buf, self._pos)
+                if match is None:
+                    self._pos = len(self._buf)
+                    if not self._fill():
+                        raise self._error('end of container')
+                    continue
+
+                char = match.group()
+                self._pos = match.start()
+
+                if char == '"':
+                    self._skip_string()
+                    continue
+
+                self._pos += 1
+                depth += 1 if char in ('[', '{') else -1
+                if depth == 0:
+                    return
+        elif char:
+            while True:
+                match = _SCALAR_END.search(self._buf, self._pos)
+                if match:
+                    self._pos = match.start()
+                    return
+                self._pos = len(self._buf)
+                if not self._fill():
+                    return
+        else:
+            raise self._error('a value')
+
+    def read_value(self):
+        """Decode and return the next value."""
+        char = self.peek()
+
+        # fast path for values which are already buffered in full. A number
+        # or literal is only known to be whole once a delimiter follows it,
+        # as i.e. ``1e`` decodes as ``1`` before the rest of ``1e3`` arrives.
+        try:
+            value, end = _DECODER.raw_decode(self._buf, self._pos)
+        except ValueError:
+            pass
+        else:
+            if char in ('"', '[', '{') or \
+                    _SCALAR_END.match(self._buf, end):
+                self._pos = end
+                return value
+
+        self._mark = self._pos
+
+        try:
+            self.skip_value()
+            text = self._buf[self._mark:self._pos]
+        finally:
+            self._mark = None
+
+        return json.loads(text)
+
+    def begin(self, char):
+        """Enter the next object (``{``) or array (``[``).
+
+        :param char: The opening character expected.
+
+        :returns: False if the value is ``null`` instead, which is skipped.
+        """
+        found = self.peek()
+
+        if found == 'n':
+            self.skip_value()
+            return False
+        if found != char:
+            raise self._error(repr(char))
+
+        self._pos += 1
+        return True
+
+    def next_key(self):
+        """Read the next key of the current object.
+
+        The value of the key must be consumed before calling this again.
+
+        :returns: The key, or None at the end of the object.
+        """
+        char = self.peek()
+        if char == ',':
+            self._pos += 1
+            char = self.peek()
+
+        if char == '}':
+            self._pos += 1
+            return None
+        if char != '"':
+            raise self._error('a key')
+
+        key = self.read_value()
+
+        if self.peek() != ':':
+            raise self._error("':'")
+        self._pos += 1
+
+        return key
+
+    def has_next(self):
+        """Check for another element in the current array.
+
+        The element must be consumed before calling this again.
+
+        :returns: False at the end of the array.
+        """
+        char = self.peek()
+        if char == ',':
+            self._pos += 1
+            char = self.peek()
+
+        if char == ']':
+            self._pos += 1
+            return False
+        if not char:
+            raise self._error("']'")
+
+        return True
+
+
+def _walk(stream, path):
+    if not path:
+        yield stream.read_value()
+        return
+
+    head, rest = path[0], path[1:]
+
+    if head == '*':
+        if stream.begin('['):
+            while stream.has_next():
+                yield from _walk(stream, rest)
+    elif stream.begin('{'):
+        while True:
+            key = stream.next_key()
+            if key is None:
+                break
+            if key == head:
+                yield from _walk(stream, rest)
+            else:
+                stream.skip_value()
+
+
+def iter_path(chunks, path):
+    """Yield every value found at ``path`` in a JSON document.
+
+    A path is a sequence of object keys, where ``*`` stands for every element
+    of an array. For example ``('steps', '*', 'actions', '*')`` yields every
+    action of every step of a build, one at a time.
+
+    :param chunks: Iterable of ``bytes`` chunks.
+    :param path: Sequence of keys.
+
+    :returns: A generator of decoded values.
+    """
+    return _walk(JSONStream(chunks), tuple(path))
+
+
+def extract(chunks, fields):
+    """Decode only some top level fields of a JSON object.
+
+    Other fields are skipped without being decoded, and reading stops as soon
+    as every requested field has been found.
+
+    :param chunks: Iterable of ``bytes`` chunks.
+    :param fields: Iterable of field names.
+
+    :returns: A dict of the requested fields which were present.
+    """
+    stream = JSONStream(chunks)
+    wanted = set(fields)
+    found = {}
+
+    if not stream.begin('{'):
+        return found
+
+    while wanted:
+        key = stream.next_key()
+        if key is None:
+            break
+        if key in wanted:
+            found[key] = stream.read_value()
+            wanted.discard(key)
+        else:
+            stream.skip_value()
+
+    return found
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.sync
+~~~~~~~~~~~~~
+
+    This module provides incremental syncing of build histories.
+
+    For each project the highest ``build_num`` seen so far (its high-water
+    mark) and the builds which had not finished yet are remembered in a
+    small JSON state file. The next sync only pages through builds newer
+    than the mark, then checks on the builds that were still pending, so a
+    sync usually costs one or two requests per project no matter how long
+    its history is.
+
+    ::
+
+        from circleci.sync import HistorySync
+
+        history = HistorySync(circleci, 'builds.state')
+        changes = history.sync('levlaz', 'circleci.py')
+
+        for build in changes['new'] + changes['finished']:
+            ...
+
+    .. versionadded:: 2.0.0
+"""
+import json
+import os
+import threading
+import time
+
+from circleci.status import is_terminal
+
+
+class HistorySync():
+    """Sync the build history of projects incrementally.
+
+    :param api: The :class:`circleci.api.Api` object to use.
+    :param path: Path to the state file. It is created on the first sync.
+    :param page_size: The number of builds to request per page. \
+        Maximum 100, defaults to 100.
+
+    :type page_size: int
+    """
+
+    def __init__(self, api, path, page_size=100):
+        self.api = api
+        self.path = path
+        self.page_size = page_size
+
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f).get('projects', {})
+        except FileNotFoundError:
+            return {}
+
+    def _save(self):
+        """Write the state file, replacing it atomically."""
+        tmp = '{0}.{1}.tmp'.format(self.path, os.getpid())
+
+        with open(tmp, 'w') as f:
+            json.dump({'version': 1, 'projects': self._state}, f, indent=1, sort_keys=True)
+
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _key(username, project, vcs_type):
+        return '{0}/{1}/{2}'.format(vcs_type, username, project)
+
+    def high_water(self, username, project, vcs_type='github'):
+        """The highest build number synced for a project, or None."""
+        with self._lock:
+            return self._state.get(self._key(username, project, vcs_type), {}).get('high_water')
+
+    def pending(self, username, project, vcs_type='github'):
+        """The numbers of builds which had not finished at the last sync."""
+        with self._lock:
+            return list(self._state.get(self._key(username, project, vcs_type), {}).get('pending', []))
+
+    def reset(self, username, project, vcs_type='github'):
+        """Forget a project, so that its next sync starts from scratch."""
+        with self._lock:
+            self._state.pop(self._key(username, project, vcs_type), None)
+            self._save()
+
+    def sync(self, username, project, max_builds=None, max_workers=8, vcs_type='github'):
+        """Fetch what changed in a project since its last sync.
+
+        Build summaries newer than the high-water mark are requested, newest
+        first, until the mark is reached. Builds which were pending last
+        time are checked again: those close enough to the mark are picked
+        up by the same pages, any others are fetched with
+        :meth:`circleci.api.Api.get_build_infos`. Pending builds which no
+        longer exist (the API answers 404) are dropped.
+
+        The state file is only updated once everything was fetched, so a
+        failed sync is simply repeated by the next one.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param max_builds: Optional limit on the number of builds fetched \
+            by the first sync of a project. Defaults to the whole history.
+        :param max_workers: Maximum number of concurrent requests used to \
+            check on pending builds. Defaults to 8.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+
+        :type max_builds: int
+        :type max_workers: int
+
+        :returns: A dict with ``new``, the builds started since the last \
+            sync, newest first, ``finished``, the builds pending last time \
+            which have finished since, ``pending``, the numbers of \
+            builds which have still not finished, and ``deleted``, the \
+            numbers of pending builds which were not found any more.
+        """
+        key = self._key(username, project, vcs_type)
+
+        with self._lock:
+            state = dict(self._state.get(key, {}))
+
+        mark = state.get('high_water')
+        pending = set(state.get('pending', []))
+
+        # pending builds just below the mark are on the pages read anyway
+        floor = mark
+        if mark is not None and pending and mark - min(pending) < self.page_size:
+            floor = min(pending) - 1
+
+        new = []
+        rechecked = {}
+        deleted = []
+
+        for build in self.api.iter_project_builds(
+                username,
+                project,
+                page_size=self.page_size,
+                max_builds=max_builds if mark is None else None,
+                until=None if floor is None else (lambda b: b['build_num'] <= floor),
+                vcs_type=vcs_type):
+            if mark is None or build['build_num'] > mark:
+                new.append(build)
+            elif build['build_num'] in pending:
+                rechecked[build['build_num']] = build
+
+        missing = sorted(pending - set(rechecked))
+        if missing:
+            for item in self.api.get_build_infos(
+                    username,
+                    project,
+                    missing,
+                    max_workers=max_workers,
+                    vcs_type=vcs_type):
+                if item.ok:
+                    rechecked[item.item] = item.result
+                elif _not_found(item.error):
+                    deleted.append(item.item)
+                else:
+                    raise item.error
+
+        finished = [
+            rechecked[num] for num in sorted(rechecked, reverse=True)
+            if is_terminal(rechecked[num])
+        ]
+        still_pending = sorted(
+            [num for num in rechecked if not is_terminal(rechecked[num])] +
+            [build['build_num'] for build in new if not is_terminal(build)]
+        )
+
+        if new:
+            mark = max(mark or 0, new[0]['build_num'])
+
+        with self._lock:
+            self._state[key] = {
+                'high_water': mark,
+                'pending': still_pending,
+                'synced_at': time.time(),
+            }
+            self._save()
+
+        return {
+            'new': new,
+            'finished': finished,
+            'pending': still_pending,
+            'deleted': deleted,
+        }
+
+
+def _not_found(error):
+    """Return True if a request failed because the API answered 404."""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 404
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.transport
+~~~~~~~~~~~~~~~~~~
+
+    This module provides the HTTP transports :class:`circleci.api.Api` sends
+    its requests through.
+
+    :class:`RequestsTransport`, the default, uses a pooled
+    :class:`requests.Session`. :class:`Urllib3Transport` talks to
+    :mod:`urllib3` directly, skipping the session, adapter and hook machinery
+    of :mod:`requests`, which makes each request cheaper and, as
+    :mod:`requests` is then never imported, short lived processes start
+    faster::
+
+        from circleci.api import Api
+        from circleci.transport import Urllib3Transport
+
+        circleci = Api(token, transport=Urllib3Transport())
+
+    :class:`circleci.http2.HTTP2Transport` lives in a module of its own, as
+    it needs a newer Python than the rest of the package.
+
+    Each library is only imported once its transport sends its first
+    request.
+
+    .. versionadded:: 2.0.0
+"""
+import base64
+import json
+from collections import namedtuple
+
+
+class HTTPError(IOError):
+    """Raised by responses of :class:`Urllib3Transport` when the response
+    code is not successful, like :class:`requests.exceptions.HTTPError`.
+
+    :param message: The error message.
+    :param response: The response.
+    """
+
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class Transport():
+    """Interface of a transport.
+
+    Responses need to provide the subset of :class:`requests.Response` the
+    API object uses: ``status_code``, ``ok``, ``headers``, ``content``,
+    ``json()``, ``iter_content(chunk_size)``, ``raise_for_status()``,
+    ``close()`` and ``request.body``.
+    """
+
+    @property
+    def connection_errors(self):
+        """Exception types raised when a request could not be completed,
+        which the retry policy may retry."""
+        raise NotImplementedError
+
+    def request(self, verb, url, headers=None, auth=None, json=None, stream=False, timeout=None):
+        """Send a request.
+
+        :param verb: The HTTP verb.
+        :param url: The full URL.
+        :param headers: Optional headers.
+        :param auth: Optional ``(username, password)`` for basic auth.
+        :param json: Optional body, sent as JSON.
+        :param stream: Read the body only as it is iterated over.
+        :param timeout: Optional seconds to wait for the server.
+
+        :returns: The response.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Close all pooled connections."""
+        raise NotImplementedError
+
+
+class RequestsTransport(Transport):
+    """A transport using a pooled :class:`requests.Session`.
+
+    :param pool_connections: Number of distinct hosts to keep connection \
+        pools for. Defaults to 10.
+    :param pool_maxsize: Maximum number of connections kept open per \
+        host. Defaults to 10.
+    :param keep_alive: Keep connections open between requests. \
+        Defaults to True.
+
+    :type pool_connections: int
+    :type pool_maxsize: int
+    :type keep_alive: bool
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+
+        self._session = None
+
+    @property
+    def session(self):
+        """The :class:`requests.Session`, created on first use."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=self.pool_maxsize
+            )
+
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+            if not self.keep_alive:
+                session.headers['Connection'] = 'close'
+
+            self._session = session
+        return self._session
+
+    @property
+    def connection_errors(self):
+        import requests
+
+        return (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    def request(self, verb, url, **kwargs):
+        return self.session.request(verb, url, **kwargs)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+_Sent = namedtuple('_Sent', ['body'])
+
+
+class Urllib3Transport(Transport):
+    """A transport using a :class:`urllib3.PoolManager` directly.
+
+    Unsuccessful responses raise :class:`HTTPError` from this module rather
+    than :class:`requests.exceptions.HTTPError`. Redirects are followed.
+
+    Takes the same arguments as :class:`RequestsTransport`.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=True):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+
+        self._pool = None
+        self._retries = None
+
+    @property
+    def pool(self):
+        """The :class:`urllib3.PoolManager`, created on first use."""
+        if self._pool is None:
+            import urllib3
+
+            # retries are left to the retry policy of the API object
+            self._retries = urllib3.Retry(
+                total=None,
+                connect=0,
+                read=0,
+                status=0,
+                redirect=10
+            )
+            self._pool = urllib3.PoolManager(
+                num_pools=self.pool_connections,
+                maxsize=self.pool_maxsize,
+                block=False
+            )
+        return self._pool
+
+    @property
+    def connection_errors(self):
+        import urllib3
+
+        return (urllib3.exceptions.HTTPError,)
+
+    def request(self, verb, url, headers=None, auth=None, json=None, stream=False, timeout=None):
+        pool = self.pool
+        headers = dict(headers or {})
+        body = None
+
+        if auth is not None:
+            credentials = '{0}:{1}'.format(*auth).encode('utf-8')
+            headers['Authorization'] = 'Basic {0}'.format(
+                base64.b64encode(credentials).decode('ascii'))
+        if json is not None:
+            body = _dumps(json)
+            headers['Content-Type'] = 'application/json'
+        if not self.keep_alive:
+            headers['Connection'] = 'close'
+
+        resp = pool.request(
+            verb,
+            url,
+            body=body,
+            headers=headers,
+            timeout=timeout,
+            retries=self._retries,
+            preload_content=not stream,
+            decode_content=True
+        )
+        return Urllib3Response(resp, url, body)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.clear()
+
+
+class Urllib3Response():
+    """Adapts a :class:`urllib3.response.HTTPResponse` to the response
+    interface of :class:`Transport`.
+
+    :param resp: The urllib3 response.
+    :param url: The URL requested.
+    :param body: The request body sent, if any.
+    """
+
+    def __init__(self, resp, url, body=None):
+        self.raw = resp
+        self.url = url
+        self.status_code = resp.status
+        self.headers = resp.headers
+        self.request = _Sent(body)
+
+        self._content = None
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        """The whole body, read on first access."""
+        if self._content is None:
+            self._content = self.raw.data
+        return self._content
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def iter_content(self, chunk_size=1):
+        """Yield the body in chunks as it is read."""
+        if self._content is not None:
+            yield self._content
+            return
+        for chunk in self.raw.stream(chunk_size, decode_content=True):
+            if chunk:
+                yield chunk
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPError(
+                '{0} Error: {1} for url: {2}'.format(self.status_code, self.raw.reason, self.url),
+                response=self
+            )
+
+    def close(self):
+        """Release the connection, dropping it if the body was not read."""
+        if not self.raw.isclosed():
+            self.raw.close()
+        self.raw.release_conn()
+
+
+def _dumps(data):
+    return json.dumps(data).encode('utf-8')
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+circleci.watcher
+~~~~~~~~~~~~~~~~
+
+    This module provides helpers to wait for builds to finish without
+    hammering the API.
+
+    Polling intervals adapt to the state of each build: queued builds are
+    checked rarely, running builds are checked more often as they approach
+    their typical duration, and every watched build of a project is checked
+    with as few :meth:`circleci.api.Api.get_project_build_summary` calls as
+    possible.
+
+    .. versionadded:: 2.0.0
+"""
+import datetime
+import statistics
+import time
+
+from circleci.error import BuildTimeoutError
+from circleci.status import is_terminal
+
+QUEUED_STATUSES = frozenset(['queued', 'scheduled', 'not_running'])
+"""Build statuses of builds which have not started running yet."""
+
+
+def parse_time(value):
+    """Parse an API timestamp into a POSIX timestamp, or None.
+
+    :param value: A timestamp such as ``2017-10-23T03:00:10.000Z``.
+
+    :type value: str
+    """
+    if not value:
+        return None
+
+    try:
+        when = datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ')
+    except ValueError:
+        try:
+            when = datetime.datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+        except ValueError:
+            return None
+
+    return when.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def poll_interval(build, typical_duration=None, min_interval=2.0, max_interval=60.0, now=None):
+    """Choose how long to wait before checking on a build again.
+
+    * Queued builds are checked at a quarter of the time they have been
+      waiting so far.
+    * Running builds with a known ``typical_duration`` are checked at half
+      the expected remaining time, then often once they are overdue.
+    * Other running builds are checked at a tenth of their elapsed time.
+
+    :param build: A build or build summary as returned by the API.
+    :param typical_duration: Optional typical build duration in seconds.
+    :param min_interval: Shortest interval to return. Defaults to 2.
+    :param max_interval: Longest interval to return. Defaults to 60.
+    :param now: Current POSIX time. Defaults to :func:`time.time`.
+
+    :returns: Seconds to wait.
+    """
+    if now is None:
+        now = time.time()
+
+    if build.get('status') in QUEUED_STATUSES:
+        queued_at = parse_time(build.get('queued_at') or build.get('usage_queued_at'))
+        interval = (now - queued_at) / 4 if queued_at else max_interval / 4
+    else:
+        started = parse_time(build.get('start_time'))
+        elapsed = now - started if started else 0
+
+        if typical_duration:
+            remaining = typical_duration - elapsed
+            interval = remaining / 2 if remaining > 0 else min_interval
+        else:
+            interval = elapsed / 10
+
+    return max(min_interval, min(max_interval, interval))
+
+
+class BuildWatcher():
+    """Watch many builds and fire callbacks when their status changes.
+
+    Builds are grouped by project and each due project is refreshed with a
+    single walk over its newest builds, which costs one request per 100
+    builds between the newest build and the oldest watched one. A build is
+    forgotten once it reaches a terminal status, or once it was missing from
+    ``max_misses`` polls in a row, i.e. because it was deleted or never
+    existed, which :meth:`poll` raises as a
+    :class:`circleci.error.BuildTimeoutError`.
+
+    The typical duration of a project's builds is estimated from the
+    finished builds seen along the way, and used to pick polling intervals
+    with :func:`poll_interval`.
+
+    :param api: The :class:`circleci.api.Api` object to poll with.
+    :param min_interval: Shortest polling interval in seconds. Defaults to 2.
+    :param max_interval: Longest polling interval in seconds. Defaults to 60.
+    :param on_change: Optional callable ``(build, old_status)`` which is \
+        called for every status change of every watched build.
+    :param max_misses: Number of polls in a row a build may be missing \
+        from before it is given up on. Defaults to 5.
+
+    :type max_misses: int
+    """
+
+    def __init__(self, api, min_interval=2.0, max_interval=60.0, on_change=None, max_misses=5):
+        self.api = api
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.on_change = on_change
+        self.max_misses = max_misses
+
+        # (vcs_type, username, project) -> {build_num: [status, callback, misses]}
+        self._watched = {}
+        # (vcs_type, username, project) -> monotonic time of next poll
+        self._due = {}
+        # (vcs_type, username, project) -> {build_num: duration in seconds}
+        self._durations = {}
+        # build numbers given up on, not raised yet
+        self._lost = []
+
+    def __len__(self):
+        return sum(len(builds) for builds in self._watched.values())
+
+    def watch(self, username, project, build_num, callback=None, vcs_type='github'):
+        """Start watching a build.
+
+        :param username: Org or user name.
+        :param project: Case sensitive repo name.
+        :param build_num: Build number.
+        :param callback: Optional callable ``(build, old_status)`` which is \
+            called when this build changes status.
+        :param vcs_type: Defaults to github. On circleci.com you can \
+            also pass in ``bitbucket``.
+        """
+        key = (vcs_type, username, project)
+        self._watched.setdefault(key, {})[int(build_num)] = [None, callback, 0]
+        self._due[key] = time.monotonic()
+
+    def unwatch(self, username, project, build_num, vcs_type='github'):
+        """Stop watching a build."""
+        key = (vcs_type, username, project)
+        builds = self._watched.get(key, {})
+        builds.pop(int(build_num), None)
+
+        if not builds:
+            self._watched.pop(key, None)
+            self._due.pop(key, None)
+
+    def typical_duration(self, username, project, vcs_type='github'):
+        """Median duration in seconds of recently seen finished builds.
+
+        :returns: Seconds, or None if no finished builds were seen yet.
+        """
+        durations = self._durations.get((vcs_type, username, project))
+        return statistics.median(durations.values()) if durations else None
+
+    def poll(self):
+        """Refresh every project which is due to be checked.
+
+        :raises circleci.error.BuildTimeoutError: When a build was missing \
+            from ``max_misses`` polls in a row. It is no longer watched. \
+            Should several builds be given up on at once, the others are \
+            raised by the following calls.
+
+        :returns: A list of ``(build, old_status)`` for every status change.
+        """
+        if not self._lost:
+            now = time.monotonic()
+            changes = []
+
+            for key in [k for k, due in self._due.items() if due <= now]:
+                changes.extend(self._poll_project(key))
+
+            if not self._lost:
+                return changes
+
+        build_num, build = self._lost.pop(0)
+        raise BuildTimeoutError(build_num, build)
+
+    def next_poll(self):
+        """Seconds until the next project is due, or None if idle."""
+        if not self._due:
+            return None
+        return max(0.0, min(self._due.values()) - time.monotonic())
+
+    def run(self, timeout=None):
+        """Poll until every watched build has finished.
+
+        :param timeout: Optional number of seconds to give up after.
+
+        :raises circleci.error.BuildTimeoutError: When a build was given \
+            up on, see :meth:`poll`.
+
+        :returns: True if every build finished, False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while self._watched:
+            self.poll()
+
+            wait = self.next_poll()
+            if wait is None:
+                break
+            if deadline is not None:
+                if time.monotonic() + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+        return True
+
+    def _poll_project(self, key):
+        vcs_type, username, project = key
+        watched = self._watched[key]
+        lowest = min(watched)
+        seen = {}
+
+        builds = self.api.iter_project_builds(
+            username,
+            project,
+            until=lambda b: b['build_num'] < lowest,
+            vcs_type=vcs_type
+        )
+
+        durations = self._durations.setdefault(key, {})
+
+        for build in builds:
+            if build['build_num'] in watched:
+                seen[build['build_num']] = build
+            if is_terminal(build) and build.get('build_time_millis'):
+                durations[build['build_num']] = build['build_time_millis'] / 1000.0
+
+        # only remember the most recent durations
+        for build_num in sorted(durations)[:-50]:
+            del durations[build_num]
+
+        changes = []
+        typical = self.typical_duration(username, project, vcs_type)
+        interval = self.max_interval
+
+        for build_num in [n for n in watched if n not in seen]:
+            watched[build_num][2] += 1
+            if watched[build_num][2] >= self.max_misses:
+                status = watched[build_num][0]
+                last_seen = None if status is None else {'build_num': build_num, 'status': status}
+                self._lost.append((build_num, last_seen))
+                self.unwatch(username, project, build_num, vcs_type)
+
+        for build_num, build in seen.items():
+            status, callback, _ = watched[build_num]
+            watched[build_num][2] = 0
+
+            if build.get('status') != status:
+                watched[build_num][0] = build.get('status')
+                changes.append((build, status))
+
+                if callback is not None:
+                    callback(build, status)
+                if self.on_change is not None:
+                    self.on_change(build, status)
+
+            if is_terminal(build):
+                self.unwatch(username, project, build_num, vcs_type)
+            else:
+                interval = min(interval, poll_interval(
+                    build,
+                    typical,
+                    self.min_interval,
+                    self.max_interval
+                ))
+
+        if key in self._due:
+            self._due[key] = time.monotonic() + interval
+
+        return changes
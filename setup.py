@@ -58,6 +58,11 @@ setup(
     install_requires=[
         'requests',
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'analytics': ['numpy'],
+        'http2': ['httpx[http2]; python_version >= "3.8"'],
+    },
     python_requires='>=3',
     cmdclass={
         'verify': VerifyVersionCommand,
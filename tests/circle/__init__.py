@@ -0,0 +1,25 @@
+# pylint: disable-all
+import json
+from unittest.mock import MagicMock
+
+import requests
+
+
+def mock_response(status_code=200, data=None, body=None, headers=None, request_body=None):
+    """A response of the default transport, with ``body`` or else ``data``
+    encoded as JSON as its body."""
+    if body is None:
+        body = json.dumps(data).encode('utf-8')
+
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.ok = status_code < 400
+    resp.headers = headers or {}
+    resp.content = body
+    resp.json.side_effect = lambda: json.loads(body.decode('utf-8'))
+    resp.request.body = request_body
+    resp.iter_content.side_effect = lambda chunk_size: iter([body[:4], body[4:]])
+    resp.__enter__.return_value = resp
+    if status_code >= 400:
+        resp.raise_for_status.side_effect = requests.exceptions.HTTPError(str(status_code))
+    return resp
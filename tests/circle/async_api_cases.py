@@ -0,0 +1,127 @@
+# pylint: disable-all
+# The coroutine tests of test_async_api, kept apart as they are a
+# SyntaxError before Python 3.5 and need Python 3.8 to run.
+import inspect
+import io
+import json
+import os
+import tempfile
+import unittest
+import warnings
+from unittest.mock import AsyncMock
+
+try:
+    import aiohttp
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:
+    aiohttp = None
+
+from circleci.error import BadKeyError, BadVerbError, InvalidFilterError
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestCircleCIAsyncApi(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        from circleci.async_api import AsyncApi
+        self.c = AsyncApi(os.getenv('CIRCLE_TOKEN'))
+
+    async def asyncTearDown(self):
+        await self.c.close()
+
+    def loadMock(self, filename):
+        """helper function to open mock responses"""
+        filename = 'tests/mocks/{0}'.format(filename)
+
+        with open(filename, 'r') as f:
+            self.c._request = AsyncMock(return_value=json.loads(f.read()))
+
+    async def test_bad_verb(self):
+
+        with self.assertRaises(BadVerbError):
+            await self.c._request('BAD', 'dummy')
+
+    async def test_get_build_info(self):
+        self.loadMock('mock_get_build_info_response')
+        resp = await self.c.get_build_info('ccie-tester', 'testing', '1')
+
+        self.assertEqual(resp['reponame'], 'MOCK+testing')
+        self.c._request.assert_awaited_once_with(
+            'GET',
+            'project/github/ccie-tester/testing/1',
+            data=None
+        )
+
+    async def test_get_project_build_summary(self):
+        self.loadMock('mock_project_build_summary_response')
+        resp = await self.c.get_project_build_summary('ccie-tester', 'testing', branch='master')
+
+        self.assertEqual(len(resp), 6)
+
+        with self.assertRaises(InvalidFilterError):
+            await self.c.get_project_build_summary('ccie-tester', 'testing', status_filter='dummy')
+
+    async def test_add_envvar(self):
+        self.loadMock('mock_add_envvar_response')
+        resp = await self.c.add_envvar('levlaz', 'circleci-sandbox', 'foo', 'bar')
+
+        self.assertEqual(resp['name'], 'foo')
+        self.c._request.assert_awaited_once_with(
+            'POST',
+            'project/github/levlaz/circleci-sandbox/envvar',
+            data={'name': 'foo', 'value': 'bar'}
+        )
+
+    async def test_create_checkout_key(self):
+
+        with self.assertRaises(BadKeyError):
+            await self.c.create_checkout_key('levlaz', 'test', 'bad')
+
+    async def test_request_and_download(self):
+
+        async def me(request):
+            return web.json_response({'login': request.headers['Authorization']})
+
+        artifact_auth = []
+
+        async def artifact(request):
+            artifact_auth.append(request.headers.get('Authorization'))
+            return web.Response(body=b'x' * 200000)
+
+        app = web.Application()
+        app.router.add_get('/api/v1.1/me', me)
+        app.router.add_get('/0/report.txt', artifact)
+
+        async with TestServer(app) as server:
+            self.c.token = 'token'
+            self.c.url = str(server.make_url('/api/v1.1'))
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                resp = await self.c.get_user_info()
+            self.assertEqual(resp['login'], 'Basic dG9rZW46')
+
+            with tempfile.TemporaryDirectory() as destdir:
+                path = await self.c.download_artifact(
+                    str(server.make_url('/0/report.txt')), destdir, chunk_size=1024)
+                self.assertEqual(os.path.getsize(path), 200000)
+
+            buffer = io.BytesIO()
+            written = await self.c.download_artifact(str(server.make_url('/0/report.txt')), fileobj=buffer)
+            self.assertEqual(written, 200000)
+            self.assertEqual(buffer.getvalue(), b'x' * 200000)
+
+            # an async iterator, not an async generator, runs on Python 3.5
+            self.assertFalse(inspect.isasyncgenfunction(self.c.iter_artifact))
+            chunks = self.c.iter_artifact(str(server.make_url('/0/report.txt')), chunk_size=10)
+            self.assertEqual(await chunks.__anext__(), b'x' * 10)
+            await chunks.aclose()
+            with self.assertRaises(StopAsyncIteration):
+                await chunks.__anext__()
+
+            with self.assertRaises(aiohttp.ClientResponseError):
+                async for chunk in self.c.iter_artifact(str(server.make_url('/0/missing.txt'))):
+                    pass
+
+        # the token is not sent along to artifact hosts
+        self.assertEqual(artifact_auth, [None, None, None])
@@ -0,0 +1,94 @@
+# pylint: disable-all
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+
+from circleci import analytics
+from circleci.api import Api
+from circleci.bulk import BulkResult
+
+
+def metadata(*tests):
+    return {'exception': None, 'tests': [
+        {'classname': c, 'name': n, 'result': r, 'run_time': t} for c, n, r, t in tests
+    ]}
+
+
+class TestCircleCIAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.history = analytics.TestHistory()
+        self.history.add(3, metadata(('a', 'flaky', 'failure', 1.0), ('a', 'slow', 'success', 9.0)))
+        self.history.add(1, metadata(('a', 'flaky', 'success', 2.0), ('a', 'slow', 'success', 7.0)))
+        self.history.add(2, metadata(('a', 'flaky', 'success', 3.0), ('a', 'slow', 'skipped', 0.0)))
+        self.history.add(4, metadata(('a', 'flaky', 'success', 4.0), ('', 'broken', 'error', 0.5)))
+
+    def check_stats(self):
+        stats = {t.name: t for t in self.history.stats()}
+
+        self.assertEqual(stats['a.flaky'].runs, 4)
+        self.assertEqual(stats['a.flaky'].failures, 1)
+        self.assertEqual(stats['a.flaky'].failure_rate, 0.25)
+        # builds 1, 2 pass, 3 fails, 4 passes
+        self.assertEqual(stats['a.flaky'].flips, 2)
+        self.assertEqual(stats['a.flaky'].p50, 2.5)
+        self.assertAlmostEqual(stats['a.flaky'].p90, 3.7)
+
+        self.assertEqual(stats['a.slow'].runs, 2)
+        self.assertEqual(stats['a.slow'].flips, 0)
+        self.assertEqual(stats['a.slow'].p50, 8.0)
+
+        self.assertEqual(stats['broken'].failure_rate, 1.0)
+
+        self.assertEqual([t.name for t in self.history.flaky()], ['a.flaky'])
+        self.assertEqual([t.name for t in self.history.slowest(limit=2)], ['a.slow', 'a.flaky'])
+
+    @unittest.skipIf(analytics.numpy is None, 'numpy is not installed')
+    def test_stats_numpy(self):
+        self.check_stats()
+
+    def test_stats_python(self):
+        with patch.object(analytics, 'numpy', None):
+            self.check_stats()
+
+    @unittest.skipIf(analytics.numpy is None, 'numpy is not installed')
+    def test_numpy_matches_python(self):
+        rng = random.Random(4)
+        history = analytics.TestHistory()
+        for build_num in rng.sample(range(1000), 200):
+            history.add(build_num, metadata(*[
+                ('c{0}'.format(n % 3), 't{0}'.format(n), rng.choice(['success', 'success', 'failure', 'skipped']), rng.random())
+                for n in range(30)
+            ]))
+
+        fast = history.stats()
+        with patch.object(analytics, 'numpy', None):
+            slow = history.stats()
+
+        self.assertEqual(len(fast), 30)
+        for a, b in zip(fast, slow):
+            self.assertEqual(a[:5], b[:5])
+            for x, y in zip(a[5:], b[5:]):
+                self.assertAlmostEqual(x, y)
+
+    def test_names_are_stored_once(self):
+        self.assertEqual(len(self.history), 8)
+        self.assertEqual(self.history.names.names, ['a.flaky', 'a.slow', 'broken'])
+        self.assertEqual(list(self.history.test_ids), [0, 1, 0, 1, 0, 1, 0, 2])
+
+    def test_empty(self):
+        self.assertEqual(analytics.TestHistory().stats(), [])
+
+    def test_collect(self):
+        c = Api('token')
+        c.get_test_metadatas = MagicMock(return_value=iter([
+            BulkResult(1, metadata(('a', 'b', 'success', 1.0)), None),
+            BulkResult(2, None, Exception('boom')),
+        ]))
+
+        history = analytics.TestHistory.collect(c, 'levlaz', 'circleci.py', [1, 2])
+
+        self.assertEqual(len(history), 1)
+        self.assertEqual(str(history.errors[2]), 'boom')
+        c.get_test_metadatas.assert_called_once_with(
+            'levlaz', 'circleci.py', [1, 2], max_workers=8, as_completed=True, vcs_type='github')
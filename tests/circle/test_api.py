@@ -1,10 +1,14 @@
 # pylint: disable-all
+import io
 import json
 import os
 import pprint
+import tempfile
 import unittest
 from unittest.mock import MagicMock
 
+import requests
+
 from circleci.api import Api
 from circleci.error import BadKeyError, BadVerbError, InvalidFilterError
 
@@ -29,6 +33,34 @@ class TestCircleCIApi(unittest.TestCase):
         self.assertEqual('BAD', e.exception.argument)
         self.assertIn('DELETE', e.exception.message)
 
+    def test_session_pool(self):
+        c = Api('token', pool_connections=4, pool_maxsize=25)
+        adapter = c._session.get_adapter('https://circleci.com')
+
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 25)
+        self.assertEqual(c._session.headers['Connection'], 'keep-alive')
+
+        c = Api('token', keep_alive=False)
+        self.assertEqual(c._session.headers['Connection'], 'close')
+
+    def test_request_uses_session(self):
+        self.c._session.request = MagicMock()
+        self.c._session.request.return_value.json.return_value = {'login': 'mock'}
+
+        resp = self.c._request('GET', 'me')
+
+        self.assertEqual(resp['login'], 'mock')
+        args, kwargs = self.c._session.request.call_args
+        self.assertEqual(args, ('GET', 'https://circleci.com/api/v1.1/me'))
+        self.assertIs(kwargs['auth'], self.c._auth)
+
+    def test_close(self):
+        with Api('token') as c:
+            c._session.close = MagicMock()
+
+        c._session.close.assert_called_once_with()
+
     def test_get_user_info(self):
         self.loadMock('mock_user_info_response')
         resp = json.loads(self.c.get_user_info())
@@ -74,18 +106,166 @@ class TestCircleCIApi(unittest.TestCase):
         self.assertEqual(len(resp), 7)
         self.assertEqual(resp[0]['reponame'], 'MOCK+testing')
 
+    def test_iter_project_builds(self):
+        pages = [
+            [{'build_num': n} for n in range(10, 7, -1)],
+            # build 8 was pushed down by a new build and must not repeat
+            [{'build_num': n} for n in range(8, 5, -1)],
+            [{'build_num': 5}],
+        ]
+        self.c.get_project_build_summary = MagicMock(side_effect=pages)
+
+        builds = self.c.iter_project_builds('ccie-tester', 'testing', page_size=3)
+        self.assertEqual([b['build_num'] for b in builds], [10, 9, 8, 7, 6, 5])
+
+        _, kwargs = self.c.get_project_build_summary.call_args
+        self.assertEqual(kwargs['offset'], 6)
+        self.assertEqual(kwargs['limit'], 3)
+
+    def test_iter_project_builds_stops_early(self):
+        page = [{'build_num': n} for n in range(100, 0, -1)]
+        self.c.get_project_build_summary = MagicMock(return_value=page)
+
+        builds = self.c.iter_project_builds('ccie-tester', 'testing', until=lambda b: b['build_num'] == 95)
+        self.assertEqual(len(list(builds)), 5)
+
+        self.c.get_project_build_summary.reset_mock()
+        builds = self.c.iter_project_builds('ccie-tester', 'testing', max_builds=7)
+        self.assertEqual(len(list(builds)), 7)
+        _, kwargs = self.c.get_project_build_summary.call_args
+        self.assertEqual(kwargs['limit'], 7)
+
+    def test_iter_recent_builds(self):
+        self.loadMock('mock_get_recent_builds_response')
+        self.c.get_recent_builds = MagicMock(return_value=json.loads(self.c._request()))
+
+        builds = list(self.c.iter_recent_builds(page_size=30))
+
+        self.assertEqual(len(builds), 7)
+        self.c.get_recent_builds.assert_called_once_with(limit=30, offset=0)
+
     def test_get_build_info(self):
         self.loadMock('mock_get_build_info_response')
         resp = json.loads(self.c.get_build_info('ccie-tester', 'testing', '1'))
 
         self.assertEqual(resp['reponame'], 'MOCK+testing')
 
+    def test_get_build_infos(self):
+        self.c.get_build_info = MagicMock(side_effect=lambda u, p, n, v: {'build_num': n})
+
+        results = self.c.get_build_infos('ccie-tester', 'testing', [3, 1, 2], max_workers=2)
+
+        self.assertEqual([r.result['build_num'] for r in results], [3, 1, 2])
+        self.c.get_build_info.assert_any_call('ccie-tester', 'testing', 1, 'github')
+
+        results = self.c.get_build_infos('ccie-tester', 'testing', [3, 1, 2], as_completed=True)
+        self.assertEqual(sorted(r.item for r in results), [1, 2, 3])
+
+    def test_get_test_metadatas(self):
+        self.loadMock('mock_get_test_metadata_response')
+        results = self.c.get_test_metadatas('levlaz', 'circleci-demo-javascript-express', [127, 128])
+
+        self.assertEqual(len(results), 2)
+        self.assertIn('tests', json.loads(results[1].result))
+
+    def test_get_artifact_lists(self):
+        self.c._request = MagicMock(side_effect=[[], Exception('boom')])
+        results = self.c.get_artifact_lists('ccie-tester', 'testing', [1, 2], max_workers=1)
+
+        self.assertTrue(results[0].ok)
+        self.assertEqual(str(results[1].error), 'boom')
+
     def test_get_artifacts(self):
         self.loadMock('mock_get_artifacts_response')
         resp = json.loads(self.c.get_artifacts('ccie-tester', 'testing', '1'))
 
         self.assertEqual(resp[0]['path'], 'MOCK+raw-test-output/go-test-report.xml')
 
+    def test_download_artifacts(self):
+        self.loadMock('mock_get_artifacts_response')
+        artifacts = json.loads(self.c._request())
+        artifacts.append({'path': '../outside.txt', 'url': 'https://example.com/outside.txt'})
+        self.c.get_artifacts = MagicMock(return_value=artifacts)
+
+        def download(url, destdir, filename, chunk_size, size=None):
+            path = os.path.join(destdir, filename)
+            with open(path, 'wb') as f:
+                f.write(b'mock')
+            return path
+
+        self.c._download = MagicMock(side_effect=download)
+
+        with tempfile.TemporaryDirectory() as destdir:
+            manifest = self.c.download_artifacts('ccie-tester', 'testing', '1', destdir, chunk_size=4096)
+
+            self.assertEqual(manifest[0]['path'], 'MOCK+raw-test-output/go-test-report.xml')
+            self.assertEqual(manifest[0]['file'], os.path.join(destdir, 'MOCK+raw-test-output', 'go-test-report.xml'))
+            self.assertEqual(manifest[0]['size'], 4)
+            self.assertIsNone(manifest[0]['error'])
+            self.assertTrue(os.path.exists(manifest[0]['file']))
+
+            self.assertIsInstance(manifest[-1]['error'], ValueError)
+            self.assertIsNone(manifest[-1]['file'])
+
+    def test_download_artifacts_parallel_containers(self):
+        self.c.get_artifacts = MagicMock(return_value=[
+            {'path': 'test-results/junit.xml', 'node_index': 0, 'url': 'https://example.com/0/test-results/junit.xml'},
+            {'path': 'test-results/junit.xml', 'node_index': 1, 'url': 'https://example.com/1/test-results/junit.xml'},
+        ])
+
+        def download(url, destdir, filename, chunk_size, size=None):
+            path = os.path.join(destdir, filename)
+            with open(path, 'w') as f:
+                f.write(url)
+            return path
+
+        self.c._download = MagicMock(side_effect=download)
+
+        with tempfile.TemporaryDirectory() as destdir:
+            manifest = self.c.download_artifacts('levlaz', 'circleci.py', 1, destdir)
+
+            self.assertEqual([m['node_index'] for m in manifest], [0, 1])
+            for m in manifest:
+                self.assertIsNone(m['error'])
+                self.assertEqual(m['file'], os.path.join(
+                    destdir, str(m['node_index']), 'test-results', 'junit.xml'))
+                with open(m['file']) as f:
+                    self.assertEqual(f.read(), m['url'])
+
+    def mock_artifact(self, body, chunks=3):
+        resp = MagicMock()
+        resp.status_code = 200
+        size = len(body) // chunks + 1
+        resp.iter_content.side_effect = lambda chunk_size: iter(
+            [body[i:i + size] for i in range(0, len(body), size)])
+        self.c._session.request = MagicMock(return_value=resp)
+        return resp
+
+    def test_stream_artifacts(self):
+        body = b'line one\nline two\n' * 100
+        resp = self.mock_artifact(body)
+        url = 'https://example.com/0/report.txt'
+
+        self.assertEqual(b''.join(self.c.iter_artifact(url, chunk_size=1024)), body)
+        resp.close.assert_called_once_with()
+
+        with self.c.open_artifact(url, chunk_size=16) as f:
+            self.assertEqual(f.readline(), b'line one\n')
+            self.assertEqual(f.read(4), b'line')
+            self.assertEqual(f.read(), body[13:])
+        self.assertEqual(resp.close.call_count, 2)
+
+        buffer = io.BytesIO()
+        self.assertEqual(self.c.download_artifact(url, fileobj=buffer), len(body))
+        self.assertEqual(buffer.getvalue(), body)
+
+    def test_open_artifact_error(self):
+        self.mock_artifact(b'')
+        self.c._session.request.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError()
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.c.open_artifact('https://example.com/0/report.txt')
+
     def test_retry_build(self):
         self.loadMock('mock_retry_build_response')
         resp = json.loads(self.c.retry_build('ccie-tester', 'testing', '1'))
@@ -199,6 +379,92 @@ class TestCircleCIApi(unittest.TestCase):
         with self.assertRaises(InvalidFilterError):
             self.c.get_latest_artifact('levlaz', 'circleci-sandbox', 'master', 'invalid')
 
+    def test_timeout(self):
+        c = Api('token', timeout=5)
+        c._session.request = MagicMock()
+        c._session.request.return_value.json.return_value = {}
+
+        c.get_user_info()
+        self.assertEqual(c._session.request.call_args[1]['timeout'], 5)
+
+        c._request('GET', 'me', timeout=1)
+        self.assertEqual(c._session.request.call_args[1]['timeout'], 1)
+
+    def test_org_snapshot(self):
+        projects = [
+            {'username': 'levlaz', 'reponame': 'a', 'vcs_url': 'https://github.com/levlaz/a'},
+            {'username': 'levlaz', 'reponame': 'b', 'vcs_url': 'https://bitbucket.org/levlaz/b'},
+            {'username': 'levlaz', 'reponame': 'c', 'vcs_url': 'https://github.com/levlaz/c'},
+        ]
+
+        def request(verb, endpoint, data=None, template=None, timeout=None):
+            self.assertEqual(timeout, 2)
+            if endpoint == 'projects':
+                return projects
+            if '/c?' in endpoint:
+                raise requests.exceptions.Timeout()
+            return [
+                {'build_num': 3, 'branch': 'master'},
+                {'build_num': 2, 'branch': 'dev'},
+                {'build_num': 1, 'branch': 'master'},
+            ]
+
+        self.c._request = MagicMock(side_effect=request)
+        self.c.get_projects = MagicMock(return_value=projects)
+
+        snapshot = self.c.org_snapshot(timeout=2)
+
+        self.assertEqual(sorted(snapshot['projects']), ['bitbucket/levlaz/b', 'github/levlaz/a'])
+        self.assertEqual(snapshot['projects']['github/levlaz/a']['master']['build_num'], 3)
+        self.assertEqual(snapshot['projects']['github/levlaz/a']['dev']['build_num'], 2)
+        self.assertIsInstance(snapshot['errors']['github/levlaz/c'][None], requests.exceptions.Timeout)
+
+        endpoints = [call[0][1] for call in self.c._request.call_args_list]
+        self.assertIn('project/bitbucket/levlaz/b?limit=30&offset=0', endpoints)
+
+    def test_org_snapshot_same_name_and_failed_branches(self):
+        self.c.get_projects = MagicMock(return_value=[
+            {'username': 'levlaz', 'reponame': 'a', 'vcs_url': 'https://github.com/levlaz/a'},
+            {'username': 'levlaz', 'reponame': 'a', 'vcs_url': 'https://bitbucket.org/levlaz/a'},
+        ])
+
+        def request(verb, endpoint, data=None, template=None, timeout=None):
+            if endpoint.startswith('project/bitbucket/'):
+                raise requests.exceptions.Timeout(endpoint)
+            return [{'build_num': 1, 'branch': endpoint.split('/')[5].split('?')[0]}]
+
+        self.c._request = MagicMock(side_effect=request)
+
+        snapshot = self.c.org_snapshot(branches=['master', 'dev'])
+
+        self.assertEqual(list(snapshot['projects']), ['github/levlaz/a'])
+        self.assertEqual(sorted(snapshot['projects']['github/levlaz/a']), ['dev', 'master'])
+        errors = snapshot['errors']['bitbucket/levlaz/a']
+        self.assertEqual(sorted(errors), ['dev', 'master'])
+        self.assertIn('tree/dev', str(errors['dev']))
+
+    def test_iter_org_snapshot_branches(self):
+        self.c._request = MagicMock(return_value=[{'build_num': 7, 'branch': 'feature/x'}])
+
+        results = list(self.c.iter_org_snapshot(
+            projects=[('levlaz', 'a'), ('levlaz', 'b')],
+            branches=['master', 'feature/x'],
+            max_workers=2
+        ))
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(
+            sorted(r.item for r in results),
+            [
+                ('github', 'levlaz', 'a', 'feature/x'),
+                ('github', 'levlaz', 'a', 'master'),
+                ('github', 'levlaz', 'b', 'feature/x'),
+                ('github', 'levlaz', 'b', 'master'),
+            ]
+        )
+        endpoints = [call[0][1] for call in self.c._request.call_args_list]
+        self.assertIn('project/github/levlaz/a/tree/feature%2Fx?limit=1&offset=0', endpoints)
+
     # def test_helper(self):
     #     resp = self.c.get_latest_artifact('circleci', 'circleci-docs')
     #     print(resp)
@@ -0,0 +1,147 @@
+# pylint: disable-all
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import requests
+
+from circleci.api import Api
+from circleci.artifact_cache import ArtifactCache
+from tests.circle import mock_response
+
+
+class TestCircleCIArtifactCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.destdir = os.path.join(self.dir, 'dest')
+        os.makedirs(self.destdir)
+
+        self.cache = ArtifactCache(os.path.join(self.dir, 'cache'), max_bytes=100)
+        self.c = Api('token', artifact_cache=self.cache)
+        self.c._session.request = MagicMock(side_effect=lambda *args, **kwargs: mock_response(body=b'artifact body'))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_repeat_downloads_are_linked_from_the_cache(self):
+        url = 'https://example.com/0/report.txt'
+
+        first = self.c.download_artifact(url, self.destdir)
+        second = self.c.download_artifact(url, self.destdir, 'copy.txt')
+
+        self.assertEqual(self.c._session.request.call_count, 1)
+        self.assertEqual(self.read(first), b'artifact body')
+        self.assertEqual(self.read(second), b'artifact body')
+        self.assertEqual(os.stat(second).st_ino, os.stat(first).st_ino)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 13})
+
+    def test_copy(self):
+        self.cache.link = False
+        self.c.download_artifact('https://example.com/0/report.txt', self.destdir)
+        path = self.c.download_artifact('https://example.com/0/report.txt', self.destdir, 'copy.txt')
+
+        self.assertNotEqual(os.stat(path).st_nlink, 2)
+        self.assertEqual(self.read(path), b'artifact body')
+
+    def test_download_artifacts_keys(self):
+        sizes = {1: 13, 2: 13, 3: 13}
+
+        def get_artifacts(username, project, build_num, vcs_type):
+            url = 'https://{0}-48750547-gh.circle-artifacts.com/0/a/report.txt'.format(build_num)
+            return [{'path': 'a/report.txt', 'node_index': 0, 'url': url, 'size': sizes[build_num]}]
+
+        self.c.get_artifacts = MagicMock(side_effect=get_artifacts)
+
+        self.c.download_artifacts('levlaz', 'circleci.py', 1, self.destdir)
+        self.c.download_artifacts('levlaz', 'circleci.py', 1, self.destdir)
+        self.c.download_artifacts('levlaz', 'circleci.py', 2, self.destdir)
+        self.assertEqual(self.c._session.request.call_count, 2)
+
+        # the same artifact, fetched by URL, is served from the cache too
+        url = 'https://1-48750547-gh.circle-artifacts.com/0/a/report.txt'
+        self.c.download_artifact(url, self.destdir, 'copy.txt', size=13)
+        self.assertEqual(self.c._session.request.call_count, 2)
+        self.assertIn(self.cache.url_key(url, 13), self.cache)
+
+        # uploaded again with another size, it is downloaded again
+        sizes[1] = 20
+        self.c.download_artifacts('levlaz', 'circleci.py', 1, self.destdir)
+        self.assertEqual(self.c._session.request.call_count, 3)
+
+    def test_url_key(self):
+        url = 'https://1-48750547-gh.circle-artifacts.com/0/a/report.txt'
+        self.assertEqual(self.cache.url_key(url + '?circle-token=x'), self.cache.url_key(url))
+        self.assertNotEqual(self.cache.url_key(url, 13), self.cache.url_key(url, 20))
+        self.assertNotEqual(
+            self.cache.url_key(url),
+            self.cache.url_key('https://1-48750547-gh.circle-artifacts.com/1/a/report.txt'))
+
+    def test_url_key_hosts_do_not_collide(self):
+        for first, second in [
+                ('https://a.example.com/0/report.txt', 'https://b.example.com/0/report.txt'),
+                ('https://example.com:8080/0/report.txt', 'https://example.com:8081/0/report.txt'),
+                ('https://a.example.com/output/job/f00/artifacts/0/report.txt',
+                 'https://b.example.com/output/job/f00/artifacts/0/report.txt'),
+                ('https://example.com/0/a/b/report.txt', 'https://example.com/0/a/report.txt'),
+        ]:
+            self.assertNotEqual(self.cache.url_key(first), self.cache.url_key(second))
+
+    def test_failed_download_is_not_cached(self):
+        self.c._session.request = MagicMock(return_value=mock_response(status_code=404))
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.c.download_artifact('https://example.com/0/report.txt', self.destdir)
+
+        self.assertEqual(self.cache.size(), 0)
+        self.assertEqual(os.listdir(self.destdir), [])
+        for _, _, files in os.walk(self.cache.path):
+            self.assertEqual([f for f in files if f.endswith('.tmp')], [])
+
+    def test_lru_eviction(self):
+        def fill(body):
+            return lambda f: f.write(body)
+
+        dest = os.path.join(self.destdir, 'file')
+        self.cache.retrieve('aa1', dest, fill(b'x' * 40))
+        self.cache.retrieve('bb2', dest, fill(b'x' * 40))
+
+        # make aa1 the most recently used
+        past = time.time() - 60
+        os.utime(os.path.join(self.cache.path, 'bb', 'bb2'), (past, past))
+        self.cache.retrieve('aa1', dest, fill(b''))
+
+        self.cache.retrieve('cc3', dest, fill(b'x' * 40))
+
+        self.assertIn('aa1', self.cache)
+        self.assertNotIn('bb2', self.cache)
+        self.assertIn('cc3', self.cache)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_concurrent_misses_download_once(self):
+        calls = []
+
+        def fill(f):
+            calls.append(1)
+            time.sleep(0.05)
+            f.write(b'body')
+
+        def retrieve(n):
+            return self.cache.retrieve('dd4', os.path.join(self.destdir, str(n)), fill)
+
+        with ThreadPoolExecutor(4) as pool:
+            hits = list(pool.map(retrieve, range(4)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(hits), [False, True, True, True])
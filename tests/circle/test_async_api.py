@@ -0,0 +1,5 @@
+# pylint: disable-all
+import sys
+
+if sys.version_info >= (3, 8):
+    from tests.circle.async_api_cases import TestCircleCIAsyncApi  # noqa: F401
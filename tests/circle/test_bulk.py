@@ -0,0 +1,92 @@
+# pylint: disable-all
+import threading
+import time
+import unittest
+
+from circleci.bulk import BulkResult, run_bulk, stream_bulk
+
+
+class TestCircleCIBulk(unittest.TestCase):
+
+    def test_ordered(self):
+
+        def fetch(n):
+            # later items finish first
+            time.sleep((5 - n) * 0.01)
+            return n * 2
+
+        results = list(run_bulk(fetch, range(5), max_workers=5))
+
+        self.assertEqual([r.item for r in results], [0, 1, 2, 3, 4])
+        self.assertEqual([r.result for r in results], [0, 2, 4, 6, 8])
+
+    def test_as_completed(self):
+
+        def fetch(n):
+            time.sleep((5 - n) * 0.02)
+            return n
+
+        results = list(run_bulk(fetch, range(5), max_workers=5, ordered=False))
+
+        self.assertEqual(results[0].item, 4)
+        self.assertEqual(sorted(r.item for r in results), [0, 1, 2, 3, 4])
+
+    def test_errors_are_per_item(self):
+
+        def fetch(n):
+            if n == 1:
+                raise ValueError('bad build')
+            return n
+
+        results = list(run_bulk(fetch, range(3)))
+
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertIsNone(results[1].result)
+        self.assertEqual(results[2], BulkResult(2, 2, None))
+
+    def test_max_workers(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def fetch(n):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        list(run_bulk(fetch, range(20), max_workers=3))
+
+        self.assertLessEqual(running[1], 3)
+
+    def test_stream_bulk(self):
+
+        def produce(n):
+            if n == 2:
+                raise ValueError('bad')
+            for i in range(n):
+                yield (n, i)
+
+        results = list(stream_bulk(produce, [3, 2, 4], max_workers=2, buffer=2))
+
+        values = [r.result for r in results if r.ok]
+        self.assertEqual(sorted(values), sorted([(3, 0), (3, 1), (3, 2), (4, 0), (4, 1), (4, 2), (4, 3)]))
+        self.assertEqual([v for v in values if v[0] == 4], [(4, 0), (4, 1), (4, 2), (4, 3)])
+        self.assertEqual([r.item for r in results if not r.ok], [2])
+
+    def test_stream_bulk_close_stops_workers(self):
+        produced = []
+
+        def produce(n):
+            for i in range(10000):
+                produced.append(i)
+                yield i
+
+        results = stream_bulk(produce, [1, 2], max_workers=2, buffer=4)
+        next(results)
+        results.close()
+
+        self.assertLess(len(produced), 100)
@@ -0,0 +1,95 @@
+# pylint: disable-all
+import unittest
+from unittest.mock import MagicMock
+
+from circleci.api import Api
+from circleci.cache import ResponseCache
+from tests.circle import mock_response
+
+
+class TestCircleCICache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(maxsize=2, ttl=60, ttls={'project/*/*/*/envvar': 0})
+        self.c = Api('token', cache=self.cache)
+        self.c._session.request = MagicMock()
+
+    def test_ttl_for(self):
+        self.assertEqual(self.cache.ttl_for('project/github/levlaz/circleci.py/envvar'), 0)
+        self.assertEqual(self.cache.ttl_for('projects'), 60)
+        self.assertEqual(self.cache.ttl_for('recent-builds?limit=30&offset=0'), 60)
+
+    def test_fresh_hit(self):
+        self.c._session.request.return_value = mock_response(data=[{'reponame': 'testing'}])
+
+        first = self.c.get_projects()
+        second = self.c.get_projects()
+
+        self.assertIs(first, second)
+        self.assertEqual(self.c._session.request.call_count, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_revalidate(self):
+        self.c._session.request.return_value = mock_response(
+            data=[{'name': 'FOO'}], headers={'ETag': '"abc"', 'Last-Modified': 'Sun, 18 Oct 2026 00:00:00 GMT'})
+        first = self.c.list_envvars('levlaz', 'circleci.py')
+
+        self.c._session.request.return_value = mock_response(status_code=304)
+        second = self.c.list_envvars('levlaz', 'circleci.py')
+
+        self.assertIs(first, second)
+        _, kwargs = self.c._session.request.call_args
+        self.assertEqual(kwargs['headers']['If-None-Match'], '"abc"')
+        self.assertEqual(kwargs['headers']['If-Modified-Since'], 'Sun, 18 Oct 2026 00:00:00 GMT')
+        self.assertNotIn('If-None-Match', self.c._headers)
+        self.assertEqual(self.cache.stats()['revalidations'], 1)
+
+    def test_expired_without_validators(self):
+        self.c._session.request.return_value = mock_response(data=[])
+        self.c.list_envvars('levlaz', 'circleci.py')
+        self.c.list_envvars('levlaz', 'circleci.py')
+
+        self.assertEqual(self.c._session.request.call_count, 2)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+    def test_lru_eviction(self):
+        self.c._session.request.return_value = mock_response(data={})
+        self.c.get_user_info()
+        self.c.get_projects()
+        self.c.get_user_info()
+        self.c.get_recent_builds()
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNotNone(self.cache.get(self.c._cache_key('https://circleci.com/api/v1.1/me')))
+        self.assertIsNone(self.cache.get(self.c._cache_key('https://circleci.com/api/v1.1/projects')))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_write_invalidates_project(self):
+        self.cache.maxsize = 10
+        self.c._session.request.return_value = mock_response(data={})
+        self.c.get_checkout_key('levlaz', 'circleci.py', 'abc')
+        self.c.get_checkout_key('levlaz', 'circleci.py2', 'abc')
+        self.c.delete_checkout_key('levlaz', 'circleci.py', 'abc')
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertIsNotNone(self.cache.get(self.c._cache_key(
+            'https://circleci.com/api/v1.1/project/github/levlaz/circleci.py2/checkout-key/abc')))
+
+    def test_tokens_do_not_share_entries(self):
+        other = Api('other-token', cache=self.cache)
+        other._session.request = MagicMock(return_value=mock_response(data={'login': 'other'}))
+        self.c._session.request.return_value = mock_response(data={'login': 'mine'})
+
+        self.assertEqual(self.c.get_user_info(), {'login': 'mine'})
+        self.assertEqual(other.get_user_info(), {'login': 'other'})
+        self.assertEqual(self.c.get_user_info(), {'login': 'mine'})
+        self.assertEqual(other._session.request.call_count, 1)
+        self.assertEqual(self.c._session.request.call_count, 1)
+
+        # a write by either drops the project for both
+        self.cache.maxsize = 10
+        self.c.get_checkout_key('levlaz', 'circleci.py', 'abc')
+        other.get_checkout_key('levlaz', 'circleci.py', 'abc')
+        other.delete_checkout_key('levlaz', 'circleci.py', 'abc')
+        self.assertEqual(len(self.cache), 2)
@@ -0,0 +1,98 @@
+# pylint: disable-all
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import requests
+
+from circleci.api import Api
+from circleci.coalesce import RequestCoalescer, canonical_url
+from tests.circle import mock_response
+
+
+class TestCircleCICoalesce(unittest.TestCase):
+
+    def setUp(self):
+        self.coalescer = RequestCoalescer()
+        self.c = Api('token', coalescer=self.coalescer)
+        self.release = threading.Event()
+        self.responses = []
+
+        def request(*args, **kwargs):
+            self.release.wait(5)
+            return self.responses.pop(0)
+
+        self.c._session.request = MagicMock(side_effect=request)
+
+    def run_concurrently(self, func, count=8):
+        with ThreadPoolExecutor(count) as pool:
+            futures = [pool.submit(func) for _ in range(count)]
+            # wait until every call has joined the flight
+            while self.coalescer.stats()['calls'] < count:
+                threading.Event().wait(0.001)
+            self.release.set()
+            return [f.exception() or f.result() for f in futures]
+
+    def test_canonical_url(self):
+        self.assertEqual(
+            canonical_url('https://circleci.com/api/v1.1/recent-builds?offset=0&limit=30'),
+            'https://circleci.com/api/v1.1/recent-builds?limit=30&offset=0')
+        self.assertEqual(canonical_url('https://circleci.com/api/v1.1/me'), 'https://circleci.com/api/v1.1/me')
+
+    def test_concurrent_gets_share_one_request(self):
+        self.responses.append(mock_response(data={'build_num': 1}))
+
+        results = self.run_concurrently(lambda: self.c.get_build_info('levlaz', 'circleci.py', 1))
+
+        self.assertEqual(self.c._session.request.call_count, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(self.coalescer.stats(), {'calls': 8, 'flights': 1, 'collapsed': 7, 'in_flight': 0})
+
+    def test_errors_reach_every_waiter(self):
+        self.responses.append(mock_response(status_code=500))
+
+        results = self.run_concurrently(lambda: self.c.get_build_info('levlaz', 'circleci.py', 1))
+
+        self.assertEqual(self.c._session.request.call_count, 1)
+        self.assertTrue(all(isinstance(r, requests.exceptions.HTTPError) for r in results))
+
+        # the failed flight is not remembered
+        self.responses.append(mock_response(data={'build_num': 1}))
+        self.assertEqual(self.c.get_build_info('levlaz', 'circleci.py', 1), {'build_num': 1})
+        self.assertEqual(len(self.coalescer), 0)
+
+    def test_different_requests_are_not_coalesced(self):
+        self.release.set()
+        self.responses.extend([mock_response(data={'build_num': 1}), mock_response(data={'build_num': 2})])
+
+        self.c.get_build_info('levlaz', 'circleci.py', 1)
+        self.c.get_build_info('levlaz', 'circleci.py', 2)
+
+        self.assertEqual(self.coalescer.stats()['flights'], 2)
+
+    def test_tokens_are_not_coalesced(self):
+        other = Api('other-token', coalescer=self.coalescer)
+        other._session.request = self.c._session.request
+        self.responses.extend([mock_response(data={'login': 'mine'}), mock_response(data={'login': 'other'})])
+
+        with ThreadPoolExecutor(2) as pool:
+            futures = [pool.submit(self.c.get_user_info), pool.submit(other.get_user_info)]
+            while self.coalescer.stats()['calls'] < 2:
+                threading.Event().wait(0.001)
+            self.release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(self.c._session.request.call_count, 2)
+        self.assertEqual(self.coalescer.stats()['flights'], 2)
+        self.assertEqual(sorted(r['login'] for r in results), ['mine', 'other'])
+
+    def test_posts_are_not_coalesced(self):
+        self.release.set()
+        self.responses.extend([mock_response(data={}), mock_response(data={})])
+
+        self.c.retry_build('levlaz', 'circleci.py', 1)
+        self.c.retry_build('levlaz', 'circleci.py', 1)
+
+        self.assertEqual(self.c._session.request.call_count, 2)
+        self.assertEqual(self.coalescer.stats()['calls'], 0)
@@ -0,0 +1,113 @@
+# pylint: disable-all
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from circleci.api import Api
+from circleci.envvars import masked, plan
+
+
+class TestCircleCIEnvvars(unittest.TestCase):
+
+    def setUp(self):
+        self.current = [
+            {'name': 'KEEP', 'value': 'xxxx1234'},
+            {'name': 'CHANGE', 'value': 'xxxxaaaa'},
+            {'name': 'OLD', 'value': 'xxxxzzzz'},
+        ]
+        self.desired = {'KEEP': 'secret1234', 'CHANGE': 'secretbbbb', 'NEW': 'value'}
+
+    def test_masked(self):
+        self.assertEqual(masked('secret1234'), 'xxxx1234')
+        self.assertEqual(masked('ab'), 'xxxxab')
+
+    def test_plan(self):
+        todo = plan(self.current, self.desired)
+
+        self.assertEqual(todo.add, {'NEW': 'value'})
+        self.assertEqual(todo.update, {'CHANGE': 'secretbbbb'})
+        self.assertEqual(todo.delete, [])
+        self.assertEqual(todo.unchanged, ['KEEP'])
+        self.assertEqual(todo.changes, 2)
+
+    def test_plan_prune_and_force(self):
+        todo = plan(self.current, self.desired, prune=True, force=True)
+
+        self.assertEqual(sorted(todo.update), ['CHANGE', 'KEEP'])
+        self.assertEqual(todo.delete, ['OLD'])
+        self.assertEqual(todo.unchanged, [])
+
+    def test_sync_envvars(self):
+        c = Api('token')
+        c.list_envvars = MagicMock(return_value=self.current)
+        c.add_envvar = MagicMock()
+        c.delete_envvar = MagicMock()
+
+        report = c.sync_envvars('levlaz', 'circleci.py', self.desired, prune=True)
+
+        self.assertEqual(report['added'], ['NEW'])
+        self.assertEqual(report['updated'], ['CHANGE'])
+        self.assertEqual(report['deleted'], ['OLD'])
+        self.assertEqual(report['unchanged'], ['KEEP'])
+        self.assertEqual(report['errors'], {})
+        self.assertEqual(c.add_envvar.call_count, 2)
+        c.add_envvar.assert_any_call('levlaz', 'circleci.py', 'NEW', 'value', 'github')
+        c.delete_envvar.assert_called_once_with('levlaz', 'circleci.py', 'OLD', 'github')
+
+    def test_sync_envvars_dry_run(self):
+        c = Api('token')
+        c.list_envvars = MagicMock(return_value=self.current)
+        c.add_envvar = MagicMock()
+        c.delete_envvar = MagicMock()
+
+        report = c.sync_envvars('levlaz', 'circleci.py', self.desired, prune=True, dry_run=True)
+
+        self.assertEqual(report['deleted'], ['OLD'])
+        c.add_envvar.assert_not_called()
+        c.delete_envvar.assert_not_called()
+
+    def test_sync_envvars_list_error(self):
+        c = Api('token')
+        c.list_envvars = MagicMock(side_effect=requests.exceptions.HTTPError('403'))
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            c.sync_envvars('levlaz', 'circleci.py', self.desired)
+
+    def test_sync_projects_envvars(self):
+        c = Api('token')
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def list_envvars(username, project, vcs_type):
+            if project == 'broken':
+                raise requests.exceptions.HTTPError('404')
+            return [{'name': 'A', 'value': 'xxxx1111'}]
+
+        def add_envvar(username, project, name, value, vcs_type):
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            if project == 'p3' and name == 'B':
+                with lock:
+                    active[0] -= 1
+                raise requests.exceptions.HTTPError('500')
+            with lock:
+                active[0] -= 1
+
+        c.list_envvars = MagicMock(side_effect=list_envvars)
+        c.add_envvar = MagicMock(side_effect=add_envvar)
+
+        projects = ['p{0}'.format(n) for n in range(10)] + ['broken']
+        reports = c.sync_projects_envvars('levlaz', projects, {'A': '1111', 'B': '2'}, max_workers=3)
+
+        self.assertEqual(set(reports), set(projects))
+        self.assertEqual(reports['p0']['added'], ['B'])
+        self.assertEqual(reports['p0']['unchanged'], ['A'])
+        self.assertIsNone(reports['p0']['error'])
+        self.assertIn('B', reports['p3']['errors'])
+        self.assertEqual(reports['p3']['added'], [])
+        self.assertIsInstance(reports['broken']['error'], requests.exceptions.HTTPError)
+        self.assertEqual(c.add_envvar.call_count, 10)
+        self.assertLessEqual(active[1], 3)
@@ -1,7 +1,7 @@
 # pylint: disable-all
 import unittest
 
-from circleci.error import CircleCIException, BadKeyError, BadVerbError, InvalidFilterError
+from circleci.error import CircleCIException, BadKeyError, BadVerbError, BuildTimeoutError, InvalidFilterError
 
 
 class TestCircleCIError(unittest.TestCase):
@@ -12,6 +12,7 @@ class TestCircleCIError(unittest.TestCase):
         self.verb = BadVerbError('fake')
         self.filter = InvalidFilterError('fake', 'status')
         self.afilter = InvalidFilterError('fake', 'artifacts')
+        self.timeout = BuildTimeoutError('fake')
 
     def test_error_implements_str(self):
         self.assertTrue(self.base.__str__ is not object.__str__)
@@ -27,3 +28,7 @@ class TestCircleCIError(unittest.TestCase):
     def test_filter_message(self):
         self.assertIn('running', self.filter.message)
         self.assertIn('completed', self.afilter.message)
+
+    def test_timeout_message(self):
+        self.assertIn('timeout', self.timeout.message)
+        self.assertIsNone(self.timeout.build)
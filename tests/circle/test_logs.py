@@ -0,0 +1,84 @@
+# pylint: disable-all
+import gzip
+import json
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from circleci.api import Api
+from circleci.logs import LogLine, gunzip, iter_log_lines
+
+
+def log(*messages):
+    return json.dumps([{'type': 'out', 'time': None, 'message': m} for m in messages]).encode('utf-8')
+
+
+def chunked(data, size=7):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestCircleCILogs(unittest.TestCase):
+
+    def test_gunzip(self):
+        data = log('hello\r\n')
+
+        self.assertEqual(b''.join(gunzip(chunked(gzip.compress(data), 1))), data)
+        self.assertEqual(b''.join(gunzip(chunked(data, 1))), data)
+        self.assertEqual(list(gunzip([])), [])
+
+    def test_iter_log_lines(self):
+        data = log('make test\r\nok 1\r\nnot ', 'ok 2\r\n', '', 'ERROR: boom')
+
+        self.assertEqual(
+            list(iter_log_lines(chunked(gzip.compress(data)))),
+            [(1, 'make test'), (2, 'ok 1'), (3, 'not ok 2'), (4, 'ERROR: boom')]
+        )
+        self.assertEqual(
+            list(iter_log_lines(chunked(data), pattern=r'not ok|ERROR')),
+            [(3, 'not ok 2'), (4, 'ERROR: boom')]
+        )
+
+    def test_iter_build_logs(self):
+        c = Api('token')
+        c.iter_build_actions = MagicMock(return_value=iter([
+            {'step': 0, 'index': 0, 'name': 'checkout', 'status': 'success',
+             'output_url': 'https://logs/0'},
+            {'step': 1, 'index': 0, 'name': 'test', 'status': 'failed',
+             'output_url': 'https://logs/1-0'},
+            {'step': 1, 'index': 1, 'name': 'test', 'status': 'failed',
+             'output_url': 'https://logs/1-1'},
+            {'step': 2, 'index': 0, 'name': 'deploy', 'status': 'not_run'},
+        ]))
+        bodies = {
+            'https://logs/0': log('cloned\n'),
+            'https://logs/1-0': gzip.compress(log('ok\nFAIL: test_a\n')),
+            'https://logs/1-1': log('FAIL: test_b\nok\n'),
+        }
+
+        def request(verb, url, **kwargs):
+            self.assertNotIn('auth', kwargs)
+            resp = MagicMock()
+            resp.iter_content.return_value = iter(chunked(bodies[url]))
+            return resp
+
+        c._session.request = MagicMock(side_effect=request)
+
+        lines = list(c.iter_build_logs('levlaz', 'circleci.py', 1, statuses=['failed'], pattern='FAIL'))
+
+        self.assertEqual(
+            sorted(lines),
+            [LogLine(1, 0, 'test', 2, 'FAIL: test_a'), LogLine(1, 1, 'test', 1, 'FAIL: test_b')]
+        )
+        self.assertEqual(c._session.request.call_count, 2)
+
+    def test_iter_build_logs_error(self):
+        c = Api('token')
+        c.iter_build_actions = MagicMock(return_value=iter([
+            {'step': 0, 'index': 0, 'name': 'checkout', 'output_url': 'https://logs/0'},
+        ]))
+        c._session.request = MagicMock()
+        c._session.request.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError()
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            list(c.iter_build_logs('levlaz', 'circleci.py', 1, steps=['checkout']))
@@ -0,0 +1,88 @@
+# pylint: disable-all
+import json
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from circleci.api import Api
+from circleci.metrics import Histogram, Metrics, endpoint_template
+from tests.circle import mock_response
+
+
+class TestCircleCIMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.c = Api('token', metrics=self.metrics)
+        self.c._session.request = MagicMock(return_value=mock_response(data={'login': 'mock'}))
+
+    def test_endpoint_template(self):
+        self.assertEqual(endpoint_template('me'), 'me')
+        self.assertEqual(endpoint_template('recent-builds?limit=30&offset=0'), 'recent-builds')
+        self.assertEqual(endpoint_template('project/github/levlaz/circleci.py?limit=30'),
+                         'project/:vcs-type/:username/:project')
+        self.assertEqual(endpoint_template('project/github/levlaz/circleci.py/12/artifacts'),
+                         'project/:vcs-type/:username/:project/:build_num/artifacts')
+        self.assertEqual(endpoint_template('project/github/levlaz/circleci.py/tree/feature/x'),
+                         'project/:vcs-type/:username/:project/tree/:branch')
+        self.assertEqual(endpoint_template('project/github/levlaz/circleci.py/envvar/FOO'),
+                         'project/:vcs-type/:username/:project/envvar/:name')
+        self.assertEqual(endpoint_template('project/github/levlaz/circleci.py/checkout-key'),
+                         'project/:vcs-type/:username/:project/checkout-key')
+
+    def test_histogram(self):
+        h = Histogram((0.1, 1))
+        for value in (0.05, 0.1, 0.5, 5):
+            h.observe(value)
+
+        self.assertEqual(h.snapshot(), {'buckets': [0.1, 1], 'counts': [2, 1, 1], 'count': 4, 'sum': 5.65})
+
+    def test_request(self):
+        self.c.get_build_info('levlaz', 'circleci.py', 1)
+        self.c.get_build_info('levlaz', 'circleci.py', 2)
+
+        self.c._session.request.return_value = mock_response(data={'login': 'mock'}, request_body=b'{"name": "FOO"}')
+        self.c.add_envvar('levlaz', 'circleci.py', 'FOO', 'bar')
+
+        snapshot = self.metrics.snapshot()
+        series = snapshot['GET project/:vcs-type/:username/:project/:build_num']
+        self.assertEqual(series['requests'], 2)
+        self.assertEqual(series['bytes_in'], 34)
+        self.assertEqual(series['status'], {200: 2})
+        self.assertEqual(series['network_seconds']['count'], 2)
+        self.assertEqual(series['decode_seconds']['count'], 2)
+
+        series = snapshot['POST project/:vcs-type/:username/:project/envvar']
+        self.assertEqual(series['bytes_out'], 15)
+
+        json.dumps(snapshot)
+
+    def test_errors_and_hooks(self):
+        started, finished = [], []
+        self.metrics.add_request_hook(started.append)
+        self.metrics.add_response_hook(finished.append)
+        self.c._session.request.return_value = mock_response(404)
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.c.get_user_info()
+
+        self.assertEqual(len(started), 1)
+        self.assertIs(started[0], finished[0])
+        self.assertIsInstance(finished[0].error, requests.exceptions.HTTPError)
+        self.assertEqual(self.metrics.snapshot()['GET me']['errors'], 1)
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_stream_and_download(self):
+        list(self.c.iter_build_steps('levlaz', 'circleci.py', 1))
+
+        with tempfile.TemporaryDirectory() as destdir:
+            self.c.download_artifact('https://example.com/0/report.txt', destdir)
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['GET project/:vcs-type/:username/:project/:build_num']['bytes_in'], 17)
+        self.assertEqual(snapshot['GET artifact']['bytes_in'], 17)
+        self.assertEqual(snapshot['GET artifact']['requests'], 1)
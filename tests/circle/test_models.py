@@ -0,0 +1,49 @@
+# pylint: disable-all
+import json
+import unittest
+
+from circleci.models import BuildSummary
+
+
+class TestCircleCIModels(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/mocks/mock_project_build_summary_response', 'r') as f:
+            self.builds = json.loads(f.read())
+        self.builds[0]['workflows'] = {'workflow_id': 'abc', 'job_name': 'build', 'workflow_name': 'main'}
+
+    def test_from_dict(self):
+        build = BuildSummary.from_dict(self.builds[0])
+
+        self.assertEqual(build.build_num, self.builds[0]['build_num'])
+        self.assertEqual(build.status, self.builds[0]['status'])
+        self.assertEqual(build.workflow_id, 'abc')
+        self.assertEqual(build.job_name, 'build')
+        self.assertEqual(build['username'], 'MOCK+ccie-tester')
+        self.assertFalse(hasattr(build, '__dict__'))
+
+    def test_lazy_fields(self):
+        build = BuildSummary.from_dict(self.builds[0])
+
+        self.assertIsInstance(build._extra, bytes)
+        self.assertEqual(build['vcs_url'], self.builds[0]['vcs_url'])
+        self.assertEqual(build.get('missing', 'default'), 'default')
+        self.assertEqual(build.raw, self.builds[0])
+
+        with self.assertRaises(KeyError):
+            build['missing']
+
+    def test_drop_extra(self):
+        build = BuildSummary.from_dict(self.builds[0], keep_extra=False)
+
+        self.assertIsNone(build._extra)
+        self.assertIsNone(build.get('vcs_url'))
+        self.assertEqual(build.build_num, self.builds[0]['build_num'])
+
+    def test_interned(self):
+        first = BuildSummary.from_dict(json.loads(json.dumps(self.builds[0])))
+        second = BuildSummary.from_dict(json.loads(json.dumps(self.builds[0])))
+
+        self.assertIs(first.status, second.status)
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second}), 1)
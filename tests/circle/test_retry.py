@@ -0,0 +1,104 @@
+# pylint: disable-all
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from circleci.api import Api
+from circleci.retry import RateLimiter, Retry
+from tests.circle import mock_response
+
+
+class TestCircleCIRetry(unittest.TestCase):
+
+    def test_backoff(self):
+        retry = Retry(backoff_factor=1, max_backoff=5)
+
+        for n in range(10):
+            delay = retry.backoff(n)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5, 2 ** n))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(Retry.parse_retry_after('12'), 12)
+        self.assertIsNone(Retry.parse_retry_after('soon'))
+        self.assertIsNone(Retry.parse_retry_after(None))
+
+        delay = Retry.parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+        self.assertTrue(25 < delay <= 30)
+
+    def test_next_delay(self):
+        retry = Retry(total=2, deadline=10)
+
+        self.assertIsNotNone(retry.next_delay('GET', 0, 0, 503))
+        self.assertIsNotNone(retry.next_delay('GET', 0, 0))
+        self.assertIsNone(retry.next_delay('POST', 0, 0, 503))
+        self.assertIsNone(retry.next_delay('GET', 0, 0, 404))
+        self.assertIsNone(retry.next_delay('GET', 2, 0, 503))
+        self.assertEqual(retry.next_delay('GET', 0, 0, 429, {'Retry-After': '3'}), 3)
+        # would overrun the deadline
+        self.assertIsNone(retry.next_delay('GET', 0, 8, 429, {'Retry-After': '3'}))
+
+    def test_retry_after_is_capped(self):
+        retry = Retry(max_retry_after=60)
+
+        self.assertEqual(retry.next_delay('GET', 0, 0, 503, {'Retry-After': '86400'}), 60)
+        far_future = formatdate(time.time() + 7 * 86400, usegmt=True)
+        self.assertEqual(retry.next_delay('GET', 0, 0, 503, {'Retry-After': far_future}), 60)
+        self.assertEqual(Retry().next_delay('GET', 0, 0, 503, {'Retry-After': '86400'}), 120)
+
+    @patch('circleci.api.time.sleep')
+    def test_api_retries(self, sleep):
+        c = Api('token', retry=Retry(total=3))
+        c._session.request = MagicMock(side_effect=[
+            requests.exceptions.ConnectionError(),
+            mock_response(502),
+            mock_response(429, headers={'Retry-After': '7'}),
+            mock_response(200, data={'login': 'levlaz'}),
+        ])
+
+        self.assertEqual(c.get_user_info(), {'login': 'levlaz'})
+        self.assertEqual(c._session.request.call_count, 4)
+        self.assertEqual(sleep.call_args_list[-1][0][0], 7)
+
+    @patch('circleci.api.time.sleep')
+    def test_api_gives_up(self, sleep):
+        c = Api('token', retry=Retry(total=1))
+        c._session.request = MagicMock(return_value=mock_response(503))
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            c.get_user_info()
+        self.assertEqual(c._session.request.call_count, 2)
+
+        # POST is not idempotent
+        c._session.request.reset_mock()
+        with self.assertRaises(requests.exceptions.HTTPError):
+            c.follow_project('levlaz', 'circleci.py')
+        self.assertEqual(c._session.request.call_count, 1)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(rate=100, burst=5)
+        start = time.monotonic()
+
+        threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(5)]) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # 15 tokens, 5 available immediately, 10 more at 100/s
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_api_rate_limited(self):
+        limiter = RateLimiter(rate=1000)
+        limiter.acquire = MagicMock(return_value=0)
+        c = Api('token', rate_limiter=limiter)
+        c._session.request = MagicMock(return_value=mock_response())
+
+        c.get_user_info()
+        c.get_projects()
+
+        self.assertEqual(limiter.acquire.call_count, 2)
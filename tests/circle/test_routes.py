@@ -0,0 +1,88 @@
+# pylint: disable-all
+import unittest
+from unittest.mock import MagicMock
+
+from circleci.api import Api
+from circleci.cache import ResponseCache
+from circleci.metrics import Metrics
+from circleci.routes import ROUTES, Route
+
+
+class TestCircleCIRoutes(unittest.TestCase):
+
+    def test_endpoint(self):
+        route = Route('GET', 'project/:vcs-type/:username/:project/:build_num')
+
+        self.assertEqual(
+            route.endpoint(vcs_type='github', username='levlaz', project='circleci.py', build_num=12),
+            'project/github/levlaz/circleci.py/12'
+        )
+
+    def test_path_parameters_are_encoded(self):
+        endpoint = ROUTES['trigger_build'].endpoint(
+            vcs_type='github',
+            username='levlaz',
+            project='circleci.py',
+            branch='feature/a b?c'
+        )
+
+        self.assertEqual(endpoint, 'project/github/levlaz/circleci.py/tree/feature%2Fa%20b%3Fc')
+
+    def test_query_parameters(self):
+        route = ROUTES['get_project_build_summary']
+
+        self.assertEqual(
+            route.endpoint(vcs_type='github', username='u', project='p', limit=30, offset=0, filter=None),
+            'project/github/u/p?limit=30&offset=0'
+        )
+        self.assertEqual(
+            route.endpoint(vcs_type='github', username='u', project='p', filter='failed', limit=5),
+            'project/github/u/p?limit=5&filter=failed'
+        )
+        self.assertEqual(
+            ROUTES['get_latest_artifact'].endpoint(
+                vcs_type='github', username='u', project='p', branch='a&b', filter='completed'),
+            'project/github/u/p/latest/artifacts?branch=a%26b&filter=completed'
+        )
+
+    def test_missing_parameter(self):
+        with self.assertRaises(TypeError):
+            ROUTES['get_build_info'].endpoint(vcs_type='github', username='u', project='p')
+
+    def test_api_uses_routes(self):
+        c = Api('token')
+        c._request = MagicMock(return_value=[])
+
+        c.get_project_build_summary('levlaz', 'circleci.py', branch='release/2.0')
+        c._request.assert_called_once_with(
+            'GET',
+            'project/github/levlaz/circleci.py/tree/release%2F2.0?limit=30&offset=0',
+            data=None,
+            template='project/:vcs-type/:username/:project/tree/:branch'
+        )
+
+        c._request.reset_mock()
+        c.get_envvar('levlaz', 'circleci.py', 'FOO')
+        args, kwargs = c._request.call_args
+        self.assertEqual(args, ('GET', 'project/github/levlaz/circleci.py/envvar/FOO'))
+
+    def test_cache_keys_and_metrics(self):
+        metrics = Metrics()
+        c = Api('token', cache=ResponseCache(), metrics=metrics)
+        c._session.request = MagicMock()
+        c._session.request.return_value.status_code = 200
+        c._session.request.return_value.ok = True
+        c._session.request.return_value.content = b'[]'
+        c._session.request.return_value.request.body = None
+        c._session.request.return_value.headers = {}
+        c._session.request.return_value.json.return_value = []
+
+        c.get_project_build_summary('levlaz', 'circleci.py', limit=10)
+        c.get_project_build_summary('levlaz', 'circleci.py', limit=10, status_filter=None)
+
+        self.assertEqual(c._session.request.call_count, 1)
+        self.assertEqual(
+            c._session.request.call_args[0][1],
+            'https://circleci.com/api/v1.1/project/github/levlaz/circleci.py?limit=10&offset=0'
+        )
+        self.assertIn('GET project/:vcs-type/:username/:project', metrics.snapshot())
@@ -0,0 +1,108 @@
+# pylint: disable-all
+import random
+import unittest
+from unittest.mock import patch
+
+from circleci import analytics
+from circleci.stats import BuildHistory
+
+
+def build(num, branch='master', status='success', queued=0, start=10, stop=100, job='build'):
+    def time(seconds):
+        if seconds is None:
+            return None
+        return '2018-01-01T00:{0:02d}:{1:02d}Z'.format(seconds // 60, seconds % 60)
+
+    return {
+        'username': 'levlaz',
+        'reponame': 'circleci.py',
+        'build_num': num,
+        'branch': branch,
+        'status': status,
+        'queued_at': time(queued),
+        'start_time': time(start),
+        'stop_time': time(stop),
+        'workflows': {'job_name': job, 'workflow_name': 'main'},
+    }
+
+
+class TestCircleCIStats(unittest.TestCase):
+
+    def setUp(self):
+        self.history = BuildHistory()
+        self.history.extend([
+            build(4, stop=50),
+            build(1, stop=20),
+            build(3, branch='dev', status='failed', queued=5, stop=40, job='test'),
+            build(2, stop=30),
+            build(5, status='running', stop=None),
+        ])
+
+    def check_queries(self):
+        stats = self.history.percentiles('build', q=(50, 100), by='branch')
+        self.assertEqual(stats['master'], {'count': 3, 'p50': 20.0, 'p100': 40.0})
+        self.assertEqual(stats['dev'], {'count': 1, 'p50': 30.0, 'p100': 30.0})
+
+        stats = self.history.percentiles('queue', q=(50,), by='job', statuses=['success', 'running'])
+        self.assertEqual(stats, {'build': {'count': 4, 'p50': 10.0}})
+
+        rolling = self.history.rolling('build', window=2, q=50, by='branch')
+        self.assertEqual(rolling['master'], [(2, 15.0), (4, 30.0)])
+        self.assertEqual(rolling['dev'], [])
+
+        trend = self.history.trend('build')
+        self.assertEqual(trend[None]['count'], 4)
+        self.assertEqual(trend[None]['mean'], 25.0)
+        self.assertAlmostEqual(trend[None]['slope'], 10.0)
+        self.assertIsNone(self.history.trend(by='branch')['dev']['slope'])
+
+    @unittest.skipIf(analytics.numpy is None, 'numpy is not installed')
+    def test_queries_numpy(self):
+        self.check_queries()
+
+    def test_queries_python(self):
+        with patch.object(analytics, 'numpy', None):
+            self.check_queries()
+
+    @unittest.skipIf(analytics.numpy is None, 'numpy is not installed')
+    def test_numpy_matches_python(self):
+        rng = random.Random(7)
+        history = BuildHistory()
+        history.extend(
+            build(n, branch=rng.choice(['a', 'b', 'c']), start=rng.randrange(60), stop=rng.randrange(60, 3600))
+            for n in rng.sample(range(1000), 300)
+        )
+
+        for query in (history.percentiles, history.rolling, history.trend):
+            fast = query(by='branch')
+            with patch.object(analytics, 'numpy', None):
+                slow = query(by='branch')
+            self.assertEqual(sorted(fast), sorted(slow))
+            for group in fast:
+                if isinstance(fast[group], dict):
+                    for key in fast[group]:
+                        self.assertAlmostEqual(fast[group][key], slow[group][key])
+                else:
+                    self.assertEqual([n for n, _ in fast[group]], [n for n, _ in slow[group]])
+                    for (_, x), (_, y) in zip(fast[group], slow[group]):
+                        self.assertAlmostEqual(x, y)
+
+    def test_adding_a_build_again_replaces_it(self):
+        self.history.add(build(5, stop=60))
+
+        self.assertEqual(len(self.history), 5)
+        self.assertEqual(self.history.percentiles(q=(100,))[None], {'count': 5, 'p100': 50.0})
+
+    def test_unknown_statuses_match_nothing(self):
+        known = len(self.history.statuses)
+
+        self.assertEqual(self.history.percentiles(statuses=['timedout']), {})
+        with patch.object(analytics, 'numpy', None):
+            self.assertEqual(self.history.percentiles(statuses=['timedout']), {})
+        self.assertEqual(len(self.history.statuses), known)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            self.history.percentiles('deploy')
+        with self.assertRaises(ValueError):
+            self.history.percentiles(by='author')
@@ -0,0 +1,120 @@
+# pylint: disable-all
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from circleci.api import Api
+from circleci.store import BuildStore, is_terminal
+
+
+class TestCircleCIStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'builds.db')
+        self.store = BuildStore(self.path)
+        self.c = Api('token', store=self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_is_terminal(self):
+        self.assertTrue(is_terminal({'status': 'success'}))
+        self.assertTrue(is_terminal({'status': 'canceled'}))
+        self.assertFalse(is_terminal({'status': 'running'}))
+        self.assertFalse(is_terminal({}))
+
+    def test_put_get(self):
+        self.assertIsNone(self.store.get('build', 'github', 'levlaz', 'circleci.py', 1))
+
+        self.store.put('build', 'github', 'levlaz', 'circleci.py', '1', {'status': 'success'})
+
+        self.assertEqual(self.store.get('build', 'github', 'levlaz', 'circleci.py', 1), {'status': 'success'})
+        self.assertIn(('build', 'github', 'levlaz', 'circleci.py', 1), self.store)
+        self.assertNotIn(('tests', 'github', 'levlaz', 'circleci.py', 1), self.store)
+
+        # shared between connections
+        other = BuildStore(self.path)
+        self.assertEqual(len(other), 1)
+        other.close()
+
+    def test_wal_mode(self):
+        mode = self.store._connect().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_threads(self):
+        def put(n):
+            self.store.put('build', 'github', 'levlaz', 'circleci.py', n, {'build_num': n})
+            self.store.close()
+
+        threads = [threading.Thread(target=put, args=(n,)) for n in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(self.store), 10)
+
+    def test_get_build_info(self):
+        self.c._request = MagicMock(side_effect=[
+            {'build_num': 1, 'status': 'running'},
+            {'build_num': 1, 'status': 'success'},
+        ])
+
+        self.assertEqual(self.c.get_build_info('levlaz', 'circleci.py', 1)['status'], 'running')
+        self.assertEqual(self.c.get_build_info('levlaz', 'circleci.py', 1)['status'], 'success')
+        self.assertEqual(self.c.get_build_info('levlaz', 'circleci.py', 1)['status'], 'success')
+        self.assertEqual(self.c._request.call_count, 2)
+
+    def test_get_test_metadata(self):
+        self.c._request = MagicMock(return_value={'tests': []})
+        self.c.get_build_fields = MagicMock(side_effect=[{'status': 'running'}, {'status': 'failed'}])
+
+        self.c.get_test_metadata('levlaz', 'circleci.py', 1)
+        self.assertEqual(len(self.store), 0)
+
+        self.c.get_test_metadata('levlaz', 'circleci.py', 1)
+        self.c.get_test_metadata('levlaz', 'circleci.py', 1)
+
+        self.assertEqual(self.c._request.call_count, 2)
+        self.assertEqual(self.c.get_build_fields.call_count, 2)
+        self.assertIn(('tests', 'github', 'levlaz', 'circleci.py', 1), self.store)
+
+    def test_get_test_metadata_cold_store(self):
+        def request(verb, url, **kwargs):
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.json.return_value = {'tests': [{'name': 'test_foo'}]}
+            resp.iter_content.return_value = iter([b'{"build_num": 1, "status": "success"}'])
+            return resp
+
+        self.c._session.request = MagicMock(side_effect=request)
+
+        for _ in range(2):
+            self.assertEqual(
+                self.c.get_test_metadata('levlaz', 'circleci.py', 1),
+                {'tests': [{'name': 'test_foo'}]})
+
+        urls = [call[0][1] for call in self.c._session.request.call_args_list]
+        self.assertEqual(urls, [
+            'https://circleci.com/api/v1.1/project/github/levlaz/circleci.py/1',
+            'https://circleci.com/api/v1.1/project/github/levlaz/circleci.py/1/tests',
+        ])
+
+    def test_compact(self):
+        for n in range(5):
+            self.store.put('build', 'github', 'levlaz', 'circleci.py', n, {'build_num': n})
+
+        # touch the oldest build so it survives
+        self.store._connect().execute('UPDATE builds SET accessed_at = accessed_at - 1000')
+        self.store.get('build', 'github', 'levlaz', 'circleci.py', 0)
+
+        self.assertEqual(self.store.compact(max_entries=3), 2)
+        self.assertEqual(len(self.store), 3)
+        self.assertIsNotNone(self.store.get('build', 'github', 'levlaz', 'circleci.py', 0))
+
+        self.assertEqual(self.store.compact(max_age=500), 2)
+        self.assertEqual(len(self.store), 1)
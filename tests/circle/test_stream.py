@@ -0,0 +1,86 @@
+# pylint: disable-all
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from circleci.api import Api
+from circleci.stream import JSONStream, extract, iter_path
+
+
+def chunked(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestCircleCIStream(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/mocks/mock_get_build_info_response', 'r') as f:
+            self.text = f.read()
+        self.build = json.loads(self.text)
+
+    def test_iter_path(self):
+        for size in (1, 7, 4096):
+            steps = list(iter_path(chunked(self.text, size), ('steps', '*')))
+            self.assertEqual(steps, self.build['steps'])
+
+            actions = list(iter_path(chunked(self.text, size), ('steps', '*', 'actions', '*')))
+            self.assertEqual(actions, [a for s in self.build['steps'] for a in s['actions']])
+
+    def test_iter_path_edge_cases(self):
+        doc = '{"a": "x\\\\\\"]}{", "b": null, "c": [1, -2.5e3, true, {"d": "é中"}], "e": []}'
+
+        for size in (1, 2, 3, 100):
+            self.assertEqual(list(iter_path(chunked(doc, size), ('c', '*'))), [1, -2500.0, True, {'d': 'é中'}])
+            self.assertEqual(list(iter_path(chunked(doc, size), ('b', '*'))), [])
+            self.assertEqual(list(iter_path(chunked(doc, size), ('e', '*'))), [])
+            self.assertEqual(list(iter_path(chunked(doc, size), ('a',))), ['x\\"]}{'])
+
+    def test_numbers_split_across_chunks(self):
+        doc = '{"a": [1.5, 2, -0.25e-2, 12.0E+3], "build_time": 1e3, "n": 123456}'
+        data = doc.encode('utf-8')
+
+        for offset in range(1, len(data)):
+            chunks = [data[:offset], data[offset:]]
+            self.assertEqual(list(iter_path(chunks, ('a', '*'))), [1.5, 2, -0.0025, 12000.0])
+            self.assertEqual(extract(chunks, ['build_time', 'n']), {'build_time': 1000.0, 'n': 123456})
+
+        for size in range(1, 8):
+            self.assertEqual(list(iter_path(chunked(doc, size), ('a', '*'))), [1.5, 2, -0.0025, 12000.0])
+            self.assertEqual(extract(chunked(doc, size), ['build_time']), {'build_time': 1000.0})
+
+        self.assertEqual(extract([b'{"build_time": 1e', b'3}'], ['build_time']), {'build_time': 1000.0})
+
+    def test_extract(self):
+        fields = extract(chunked(self.text, 64), ['status', 'build_num', 'missing'])
+
+        self.assertEqual(fields, {'status': self.build['status'], 'build_num': self.build['build_num']})
+
+    def test_extract_stops_early(self):
+        chunks = iter(chunked('{"a": 1, "b": [' + '1,' * 1000 + '1]}', 8))
+        self.assertEqual(extract(chunks, ['a']), {'a': 1})
+        self.assertTrue(next(chunks, None))
+
+    def test_malformed(self):
+        with self.assertRaises(ValueError):
+            list(iter_path(chunked('{"steps": [{"a": 1', 4), ('steps', '*')))
+
+        with self.assertRaises(ValueError):
+            JSONStream([b'[1, 2]']).begin('{')
+
+    def test_api_streaming(self):
+        c = Api('token')
+        resp = MagicMock()
+        resp.iter_content.side_effect = lambda chunk_size: iter(chunked(self.text, chunk_size))
+        c._session.request = MagicMock(return_value=resp)
+
+        steps = list(c.iter_build_steps('ccie-tester', 'testing', 1))
+        self.assertEqual(len(steps), 6)
+        _, kwargs = c._session.request.call_args
+        self.assertTrue(kwargs['stream'])
+        resp.close.assert_called_once_with()
+
+        actions = list(c.iter_build_actions('ccie-tester', 'testing', 1))
+        self.assertEqual(actions[-1]['step'], self.build['steps'][-1]['actions'][-1]['step'])
+
+        self.assertEqual(c.get_build_fields('ccie-tester', 'testing', 1, ['reponame']), {'reponame': 'MOCK+testing'})
@@ -0,0 +1,147 @@
+# pylint: disable-all
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from circleci.api import Api
+from circleci.bulk import BulkResult
+from circleci.sync import HistorySync
+
+
+def error(status_code):
+    resp = MagicMock()
+    resp.status_code = status_code
+    return requests.exceptions.HTTPError(str(status_code), response=resp)
+
+
+class TestCircleCISync(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'builds.state')
+        self.builds = {n: {'build_num': n, 'status': 'success'} for n in range(1, 251)}
+
+        self.api = Api('token')
+        self.api.get_project_build_summary = MagicMock(side_effect=self.summary)
+        self.api.get_build_infos = MagicMock(side_effect=self.build_infos)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def summary(self, username, project, limit, offset, **kwargs):
+        nums = sorted(self.builds, reverse=True)[offset:offset + limit]
+        return [dict(self.builds[n]) for n in nums]
+
+    def build_infos(self, username, project, build_nums, **kwargs):
+        return [BulkResult(n, dict(self.builds[n]), None) for n in build_nums]
+
+    def test_first_sync(self):
+        self.builds[250]['status'] = 'running'
+        history = HistorySync(self.api, self.path)
+
+        changes = history.sync('levlaz', 'circleci.py')
+
+        self.assertEqual(len(changes['new']), 250)
+        self.assertEqual(changes['new'][0]['build_num'], 250)
+        self.assertEqual(changes['pending'], [250])
+        self.assertEqual(history.high_water('levlaz', 'circleci.py'), 250)
+
+        with open(self.path) as f:
+            state = json.load(f)
+        self.assertEqual(state['projects']['github/levlaz/circleci.py']['pending'], [250])
+
+    def test_first_sync_max_builds(self):
+        history = HistorySync(self.api, self.path)
+
+        changes = history.sync('levlaz', 'circleci.py', max_builds=10)
+
+        self.assertEqual(len(changes['new']), 10)
+        self.assertEqual(history.high_water('levlaz', 'circleci.py'), 250)
+
+    def test_incremental_sync(self):
+        self.builds[249]['status'] = 'running'
+        HistorySync(self.api, self.path).sync('levlaz', 'circleci.py')
+
+        # two new builds, one still running, and 249 finished
+        self.builds[249]['status'] = 'failed'
+        self.builds[251] = {'build_num': 251, 'status': 'success'}
+        self.builds[252] = {'build_num': 252, 'status': 'queued'}
+        self.api.get_project_build_summary.reset_mock()
+
+        history = HistorySync(self.api, self.path)
+        changes = history.sync('levlaz', 'circleci.py')
+
+        self.assertEqual([b['build_num'] for b in changes['new']], [252, 251])
+        self.assertEqual([b['build_num'] for b in changes['finished']], [249])
+        self.assertEqual(changes['finished'][0]['status'], 'failed')
+        self.assertEqual(changes['pending'], [252])
+        self.assertEqual(self.api.get_project_build_summary.call_count, 1)
+        self.api.get_build_infos.assert_not_called()
+
+        # nothing changed
+        changes = history.sync('levlaz', 'circleci.py')
+        self.assertEqual(changes['new'], [])
+        self.assertEqual(changes['pending'], [252])
+
+    def test_old_pending_builds_are_fetched(self):
+        self.builds[3]['status'] = 'running'
+        history = HistorySync(self.api, self.path)
+        history.sync('levlaz', 'circleci.py')
+
+        self.builds[3]['status'] = 'success'
+        self.api.get_project_build_summary.reset_mock()
+
+        changes = history.sync('levlaz', 'circleci.py')
+
+        self.assertEqual([b['build_num'] for b in changes['finished']], [3])
+        self.assertEqual(changes['pending'], [])
+        self.assertEqual(self.api.get_project_build_summary.call_count, 1)
+        self.api.get_build_infos.assert_called_with(
+            'levlaz', 'circleci.py', [3], max_workers=8, vcs_type='github')
+
+    def test_deleted_pending_builds_are_dropped(self):
+        self.builds[3]['status'] = 'running'
+        self.builds[4]['status'] = 'running'
+        history = HistorySync(self.api, self.path)
+        history.sync('levlaz', 'circleci.py')
+
+        def build_infos(username, project, build_nums, **kwargs):
+            return [BulkResult(3, None, error(404)), BulkResult(4, {'build_num': 4, 'status': 'running'}, None)]
+
+        self.api.get_build_infos.side_effect = build_infos
+        changes = history.sync('levlaz', 'circleci.py')
+
+        self.assertEqual(changes['deleted'], [3])
+        self.assertEqual(changes['pending'], [4])
+        self.assertEqual(history.pending('levlaz', 'circleci.py'), [4])
+
+        # other errors still fail the sync
+        self.api.get_build_infos.side_effect = lambda *args, **kwargs: [BulkResult(4, None, error(502))]
+        with self.assertRaises(requests.exceptions.HTTPError):
+            history.sync('levlaz', 'circleci.py')
+        self.assertEqual(history.pending('levlaz', 'circleci.py'), [4])
+
+    def test_failed_sync_keeps_state(self):
+        history = HistorySync(self.api, self.path)
+        history.sync('levlaz', 'circleci.py', max_builds=5)
+
+        self.builds[251] = {'build_num': 251, 'status': 'success'}
+        self.api.get_project_build_summary.side_effect = Exception('boom')
+
+        with self.assertRaises(Exception):
+            history.sync('levlaz', 'circleci.py')
+
+        self.assertEqual(HistorySync(self.api, self.path).high_water('levlaz', 'circleci.py'), 250)
+
+    def test_reset(self):
+        history = HistorySync(self.api, self.path)
+        history.sync('levlaz', 'circleci.py', max_builds=5)
+        history.reset('levlaz', 'circleci.py')
+
+        self.assertIsNone(history.high_water('levlaz', 'circleci.py'))
+        self.assertEqual(history.pending('levlaz', 'circleci.py'), [])
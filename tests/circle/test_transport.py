@@ -0,0 +1,222 @@
+# pylint: disable-all
+import json
+import socket
+import subprocess
+import sys
+import threading
+import unittest
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import requests
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import httpx
+
+    from circleci.http2 import HTTP2Transport
+except ImportError:
+    httpx = None
+
+from circleci.api import Api
+from circleci.retry import Retry
+from circleci.transport import HTTPError, RequestsTransport, Urllib3Transport
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body, content_type='application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/v1.1/me':
+            self.reply(200, json.dumps({'auth': self.headers['Authorization']}).encode())
+        elif self.path.startswith('/0/report.txt'):
+            self.reply(200, b'x' * 100000, 'text/plain')
+        elif self.path.startswith('/moved'):
+            self.send_response(302)
+            self.send_header('Location', '/0/report.txt')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.reply(404, b'{"message": "not found"}')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.reply(201, json.dumps({'received': json.loads(body.decode())}).encode())
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class H2Server():
+    """A cleartext HTTP/2 server, answering every request with its path.
+
+    Requests which arrive together are held back until the connection goes
+    quiet, so that multiplexed streams can be counted.
+    """
+
+    def __init__(self, idle=0.05):
+        self.idle = idle
+        self.connections = 0
+        self.max_streams = 0
+
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen()
+        self.url = 'http://127.0.0.1:{0}'.format(self.sock.getsockname()[1])
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        h2conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        h2conn.initiate_connection()
+        conn.sendall(h2conn.data_to_send())
+        conn.settimeout(self.idle)
+        pending = {}
+
+        with conn:
+            while True:
+                try:
+                    data = conn.recv(65535)
+                except socket.timeout:
+                    self.max_streams = max(self.max_streams, len(pending))
+                    for stream_id, path in pending.items():
+                        status = '404' if path.endswith('/missing') else '200'
+                        body = json.dumps({'path': path}).encode()
+                        h2conn.send_headers(stream_id, [
+                            (':status', status),
+                            ('content-type', 'application/json'),
+                            ('content-length', str(len(body))),
+                        ])
+                        h2conn.send_data(stream_id, body, end_stream=True)
+                    pending = {}
+                    conn.sendall(h2conn.data_to_send())
+                    continue
+                except OSError:
+                    return
+
+                if not data:
+                    return
+                for event in h2conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        pending[event.stream_id] = dict(event.headers)[':path']
+                conn.sendall(h2conn.data_to_send())
+
+    def close(self):
+        self.sock.close()
+
+
+class TestCircleCITransport(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = Server(('127.0.0.1', 0), Handler)
+        cls.url = 'http://127.0.0.1:{0}'.format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def check_transport(self, transport, http_error):
+        with Api('token', url=self.url + '/api/v1.1', transport=transport) as c:
+            self.assertEqual(c.get_user_info(), {'auth': 'Basic dG9rZW46'})
+            self.assertEqual(
+                c._request('POST', 'project/github/levlaz/circleci.py/envvar', data={'name': 'foo'}),
+                {'received': {'name': 'foo'}})
+
+            with self.assertRaises(http_error) as e:
+                c._request('GET', 'missing')
+            self.assertEqual(e.exception.response.status_code, 404)
+
+            # a partly read stream does not spoil the next request
+            with c.open_artifact(self.url + '/0/report.txt', chunk_size=1024) as f:
+                self.assertEqual(f.read(10), b'x' * 10)
+            self.assertEqual(b''.join(c.iter_artifact(self.url + '/moved')), b'x' * 100000)
+            self.assertEqual(c.get_user_info(), {'auth': 'Basic dG9rZW46'})
+
+    def test_requests_transport(self):
+        self.check_transport(RequestsTransport(), requests.exceptions.HTTPError)
+
+    def test_urllib3_transport(self):
+        self.check_transport(Urllib3Transport(), HTTPError)
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_http2_falls_back_to_http11(self):
+        transport = HTTP2Transport()
+        self.check_transport(transport, httpx.HTTPStatusError)
+        self.assertEqual(transport.request('GET', self.url + '/api/v1.1/me').http_version, 'HTTP/1.1')
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_http2_multiplexes_one_connection(self):
+        server = H2Server()
+        self.addCleanup(server.close)
+
+        with Api('token', url=server.url + '/api/v1.1', transport=HTTP2Transport(prior_knowledge=True)) as c:
+            results = c.get_build_infos('levlaz', 'circleci.py', range(1, 33), max_workers=16)
+
+            self.assertTrue(all(item.ok for item in results))
+            self.assertEqual(results[4].result, {'path': '/api/v1.1/project/github/levlaz/circleci.py/5'})
+            self.assertEqual(server.connections, 1)
+            self.assertGreater(server.max_streams, 1)
+
+            with self.assertRaises(httpx.HTTPStatusError):
+                c._request('GET', 'missing')
+            self.assertEqual(c.transport.request('GET', server.url + '/me').http_version, 'HTTP/2')
+
+    def test_urllib3_connection_errors_are_retried(self):
+        c = Api('token', url='http://127.0.0.1:9/api/v1.1', transport=Urllib3Transport(),
+                retry=Retry(total=1, backoff_factor=0))
+
+        with self.assertRaises(c.transport.connection_errors):
+            c.get_user_info()
+
+    def test_transport_names(self):
+        self.assertIsInstance(Api('token').transport, RequestsTransport)
+        self.assertIsInstance(Api('token', transport='urllib3', pool_maxsize=4).transport, Urllib3Transport)
+        if httpx is not None:
+            self.assertIsInstance(Api('token', transport='http2').transport, HTTP2Transport)
+
+        with self.assertRaises(ValueError):
+            Api('token', transport='carrier-pigeon')
+
+    def test_http2_requirements(self):
+        with patch('circleci.api.sys.version_info', (3, 7, 0)):
+            with self.assertRaises(RuntimeError) as e:
+                Api('token', transport='http2')
+        self.assertIn('Python 3.8', str(e.exception))
+
+        if httpx is not None:
+            with patch('importlib.util.find_spec', return_value=None):
+                with self.assertRaises(ImportError) as e:
+                    HTTP2Transport()
+            self.assertIn('circleci[http2]', str(e.exception))
+
+    def test_heavy_imports_are_deferred(self):
+        code = ('import sys, circleci.api; '
+                'print(any(m in sys.modules for m in ("requests", "urllib3", "sqlite3", "circleci.http2")))')
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.strip(), b'False')
@@ -0,0 +1,129 @@
+# pylint: disable-all
+import unittest
+from unittest.mock import MagicMock, patch
+
+from circleci.api import Api
+from circleci.error import BuildTimeoutError
+from circleci.watcher import BuildWatcher, parse_time, poll_interval
+
+
+class TestCircleCIWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.now = parse_time('2017-10-23T03:00:00.000Z')
+
+    def test_parse_time(self):
+        self.assertEqual(parse_time('2017-10-23T03:00:10Z') - self.now, 10)
+        self.assertIsNone(parse_time(None))
+        self.assertIsNone(parse_time('yesterday'))
+
+    def test_poll_interval_queued(self):
+        build = {'status': 'queued', 'queued_at': '2017-10-23T02:59:20.000Z'}
+
+        self.assertEqual(poll_interval(build, now=self.now), 10)
+        self.assertEqual(poll_interval(build, max_interval=5, now=self.now), 5)
+
+    def test_poll_interval_running(self):
+        build = {'status': 'running', 'start_time': '2017-10-23T02:55:00.000Z'}
+
+        self.assertEqual(poll_interval(build, now=self.now), 30)
+        self.assertEqual(poll_interval(build, typical_duration=400, now=self.now), 50)
+        # overdue
+        self.assertEqual(poll_interval(build, typical_duration=200, now=self.now), 2)
+        # just started
+        self.assertEqual(poll_interval({'status': 'running'}, now=self.now), 2)
+
+    def test_watcher(self):
+        api = Api('token')
+        api.get_project_build_summary = MagicMock(side_effect=[
+            [
+                {'build_num': 12, 'status': 'running'},
+                {'build_num': 11, 'status': 'queued'},
+                {'build_num': 10, 'status': 'success', 'build_time_millis': 60000},
+                {'build_num': 9, 'status': 'failed', 'build_time_millis': 120000},
+            ],
+            [
+                {'build_num': 12, 'status': 'success', 'build_time_millis': 90000},
+                {'build_num': 11, 'status': 'running'},
+            ],
+        ])
+
+        on_change = MagicMock()
+        callback = MagicMock()
+        watcher = BuildWatcher(api, on_change=on_change)
+        watcher.watch('levlaz', 'circleci.py', 11, callback=callback)
+        watcher.watch('levlaz', 'circleci.py', 12)
+
+        changes = watcher.poll()
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(api.get_project_build_summary.call_count, 1)
+        # older builds are not fetched
+        self.assertIsNone(watcher.typical_duration('levlaz', 'circleci.py'))
+        callback.assert_called_once_with({'build_num': 11, 'status': 'queued'}, None)
+
+        # not due yet
+        self.assertEqual(watcher.poll(), [])
+        self.assertGreater(watcher.next_poll(), 0)
+
+        watcher._due = {k: 0 for k in watcher._due}
+        changes = watcher.poll()
+        self.assertEqual([(b['build_num'], old) for b, old in changes], [(12, 'running'), (11, 'queued')])
+        self.assertEqual(len(watcher), 1)
+        self.assertEqual(on_change.call_count, 4)
+        self.assertEqual(watcher.typical_duration('levlaz', 'circleci.py'), 90)
+
+    def test_watcher_gives_up_on_missing_builds(self):
+        api = Api('token')
+        api.get_project_build_summary = MagicMock(return_value=[
+            {'build_num': 12, 'status': 'running'},
+            {'build_num': 10, 'status': 'success'},
+        ])
+
+        watcher = BuildWatcher(api, max_misses=3)
+        watcher.watch('levlaz', 'circleci.py', 11)
+        watcher.watch('levlaz', 'circleci.py', 12)
+        watcher.watch('levlaz', 'circleci.py', 13)
+
+        for _ in range(2):
+            watcher._due = {k: 0 for k in watcher._due}
+            watcher.poll()
+        self.assertEqual(len(watcher), 3)
+
+        watcher._due = {k: 0 for k in watcher._due}
+        with self.assertRaises(BuildTimeoutError) as e:
+            watcher.poll()
+        self.assertEqual(e.exception.argument, 11)
+        self.assertIsNone(e.exception.build)
+
+        # the other missing build is raised next, without polling
+        calls = api.get_project_build_summary.call_count
+        with self.assertRaises(BuildTimeoutError) as e:
+            watcher.poll()
+        self.assertEqual(e.exception.argument, 13)
+        self.assertEqual(api.get_project_build_summary.call_count, calls)
+
+        self.assertEqual(len(watcher), 1)
+        watcher._due = {k: 0 for k in watcher._due}
+        self.assertEqual(watcher.poll(), [])
+
+    @patch('circleci.api.time.sleep')
+    def test_wait_for_build(self, sleep):
+        api = Api('token')
+        api.get_build_info = MagicMock(side_effect=[
+            {'build_num': 1, 'status': 'queued'},
+            {'build_num': 1, 'status': 'running'},
+            {'build_num': 1, 'status': 'fixed'},
+        ])
+
+        self.assertEqual(api.wait_for_build('levlaz', 'circleci.py', 1)['status'], 'fixed')
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_wait_for_build_timeout(self):
+        api = Api('token')
+        api.get_build_info = MagicMock(return_value={'build_num': 1, 'status': 'running'})
+
+        with self.assertRaises(BuildTimeoutError) as e:
+            api.wait_for_build('levlaz', 'circleci.py', 1, timeout=0.01, min_interval=0.005)
+
+        self.assertEqual(e.exception.argument, 1)
+        self.assertEqual(e.exception.build['status'], 'running')